@@ -1,20 +1,27 @@
 from flask import Flask
 from app.config.config import get_config_by_name
-from app.initialize_functions import initialize_route, initialize_db, initialize_swagger
+from app.initialize_functions import (initialize_db, initialize_metrics, initialize_profiler, initialize_proxy,
+                                      initialize_route, initialize_site, initialize_swagger)
 
 def create_app(config=None) -> Flask:
     """
     Create a Flask application.
 
+    Nothing heavy happens here: storage, uploads, jobs, Google sign-in and
+    Swagger are set up on first use (see ``app.site.site``).
+
     Args:
-        config: The configuration object to use.
+        config: The configuration object to use (development if not given).
 
     Returns:
         A Flask application instance.
     """
-    app = Flask(__name__)
-    if config:
-        app.config.from_object(get_config_by_name(config))
+    # Pages and static files are served by the pages blueprint, not Flask's static route
+    app = Flask(__name__, static_folder=None)
+    app.config.from_object(get_config_by_name(config))
+
+    # Site services, built lazily
+    initialize_site(app)
 
     # Initialize extensions
     initialize_db(app)
@@ -25,4 +32,13 @@ def create_app(config=None) -> Flask:
     # Initialize Swagger
     initialize_swagger(app)
 
+    # Client IP from X-Forwarded-For behind TRUSTED_PROXIES
+    initialize_proxy(app)
+
+    # Request and storage metrics at /metrics
+    initialize_metrics(app)
+
+    # Profiles of slow or admin-flagged requests
+    initialize_profiler(app)
+
     return app
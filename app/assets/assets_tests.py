@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+
+from app.assets.pipeline import AssetPipeline, build, rewrite_refs
+
+
+def _site(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_text('body{color:red}\n' * 200)
+    (tmp_path / 'index.html').write_text('<link href="css/style.css"><a href="https://x/css/style.css">')
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'secret.html').write_text('<p>not public</p>')
+    return str(tmp_path), str(tmp_path / 'dist')
+
+
+def test_build_fingerprints_rewrites_and_precompresses(tmp_path):
+    base, out = _site(tmp_path)
+    manifest = build(base, out)
+    hashed = manifest['assets']['css/style.css']
+    assert hashed.startswith('css/style.') and hashed != 'css/style.css'
+    assert manifest['files'][hashed]['immutable'] is True
+    with open(os.path.join(out, 'index.html')) as fh:
+        assert fh.read() == f'<link href="{hashed}"><a href="https://x/css/style.css">'
+    with open(os.path.join(out, hashed + '.gz'), 'rb') as fh:
+        assert gzip.decompress(fh.read()) == (tmp_path / 'css' / 'style.css').read_bytes()
+    assert 'data/secret.html' not in manifest['files']
+    assert 'gzip' not in manifest['files']['index.html']['encodings']  # too small to bother
+
+
+def test_rewrite_handles_absolute_and_nested_pages():
+    hashed = {'css/style.css': 'css/style.abc.css'}
+    assert rewrite_refs('<link href="/css/style.css">', 'index.html', hashed) == '<link href="/css/style.abc.css">'
+    assert rewrite_refs('<link href="../css/style.css">', 'sub/p.html', hashed) == '<link href="../css/style.abc.css">'
+    assert rewrite_refs('<link href="css/other.css">', 'index.html', hashed) == '<link href="css/other.css">'
+
+
+def test_ensure_rebuilds_only_when_sources_change(tmp_path):
+    base, out = _site(tmp_path)
+    pipeline = AssetPipeline(base, out)
+    first = pipeline.ensure()
+    assert pipeline.ensure() == first
+    (tmp_path / 'css' / 'style.css').write_text('body{color:blue}')
+    second = pipeline.ensure()
+    assert second['assets']['css/style.css'] != first['assets']['css/style.css']
+    with open(os.path.join(out, 'manifest.json')) as fh:
+        assert json.load(fh) == second
+
+
+def test_static_index_is_allow_listed_and_serves_ranges(tmp_path):
+    from flask import Flask
+
+    from app.assets.static_index import StaticIndex
+
+    for name in ('index.html', 'big.pdf', '.env', 'server.log', 'server.pid', 'app.py'):
+        (tmp_path / name).write_bytes(b'0123456789' * 10)
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'photo.png').write_bytes(b'png')
+    index = StaticIndex(str(tmp_path))
+    assert sorted(index.files) == ['big.pdf', 'index.html']
+
+    app = Flask(__name__)
+    with app.test_request_context('/big.pdf', headers={'Range': 'bytes=10-19'}):
+        resp = index.send('big.pdf')
+        assert resp.status_code == 206
+        assert resp.headers['Content-Range'] == 'bytes 10-19/100'
+    with app.test_request_context('/index.html'):
+        etag = index.send('index.html').get_etag()[0]
+        assert index.send('.env') is None
+    with app.test_request_context('/index.html', headers={'If-None-Match': f'"{etag}"'}):
+        assert index.send('index.html').status_code == 304
+
+    (tmp_path / 'new.css').write_text('a{}')
+    assert index.refresh() is True
+    assert 'new.css' in index.files
+    assert index.refresh() is False
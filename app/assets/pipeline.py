@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import request
+
+from app.assets.static_index import SKIP_DIRS, FileEntry, send_entry
+from app.storage.files import FileLock, atomic_write_bytes, atomic_write_json, load_json
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+# Sources the pipeline builds: fingerprinted assets plus the pages that link them.
+FINGERPRINT_EXT = {'.css', '.js'}
+TEXT_EXT = {'.css', '.js', '.html', '.svg'}
+# Below this compression saves less than the extra request header costs.
+MIN_COMPRESS = 1024
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+_REF_RE = re.compile(r'''(\b(?:href|src)\s*=\s*["'])([^"'?#:]+)''')
+
+
+def _sources(base_dir: str):
+    for dirpath, dirs, names in os.walk(base_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith('.'))
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in TEXT_EXT and not name.startswith('.'):
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, base_dir).replace(os.sep, '/'), path
+
+
+def _stamp(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def hashed_name(rel: str, data: bytes) -> str:
+    stem, ext = posixpath.splitext(rel)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+
+def rewrite_refs(html: str, page_rel: str, hashed: dict) -> str:
+    """Point href/src attributes that name a fingerprinted asset at its hashed name."""
+    page_dir = posixpath.dirname(page_rel)
+
+    def sub(m):
+        ref = m.group(2)
+        absolute = ref.startswith('/')
+        target = posixpath.normpath(ref.lstrip('/') if absolute else posixpath.join(page_dir, ref))
+        if target not in hashed:
+            return m.group(0)
+        new = hashed[target]
+        if absolute:
+            new = '/' + new
+        elif page_dir:
+            new = posixpath.relpath(new, page_dir)
+        return m.group(1) + new
+    return _REF_RE.sub(sub, html)
+
+
+def _write(out_dir: str, rel: str, data: bytes) -> list:
+    """Write ``rel`` plus its precompressed variants; returns the encodings built."""
+    path = os.path.join(out_dir, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write_bytes(path, data)
+    encodings = []
+    if len(data) < MIN_COMPRESS:
+        return encodings
+    if brotli is not None:
+        atomic_write_bytes(path + '.br', brotli.compress(data, quality=11))
+        encodings.append('br')
+    atomic_write_bytes(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append('gzip')
+    return encodings
+
+
+def build(base_dir: str, out_dir: str) -> dict:
+    """Build ``out_dir`` from the site sources and return the manifest.
+
+    CSS/JS get a content hash in their name (``css/style.3fa1c2d9e0.css``),
+    HTML pages are rewritten to link the hashed names, and every text file
+    gets ``.gz`` (and ``.br`` with the brotli module) siblings. Unhashed
+    copies are kept so old links still work.
+    """
+    sources = dict(_sources(base_dir))
+    hashed = {}
+    files = {}
+    for rel, path in sources.items():
+        if posixpath.splitext(rel)[1].lower() in FINGERPRINT_EXT:
+            with open(path, 'rb') as fh:
+                data = fh.read()
+            hashed[rel] = hashed_name(rel, data)
+            files[hashed[rel]] = {'encodings': _write(out_dir, hashed[rel], data), 'immutable': True}
+    for rel, path in sources.items():
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        if rel.endswith('.html'):
+            data = rewrite_refs(data.decode('utf-8'), rel, hashed).encode('utf-8')
+        files[rel] = {'encodings': _write(out_dir, rel, data), 'immutable': False}
+    for rel, entry in files.items():
+        with open(os.path.join(out_dir, rel), 'rb') as fh:
+            entry['etag'] = hashlib.sha256(fh.read()).hexdigest()[:32]
+        entry['mimetype'] = mimetypes.guess_type(rel)[0] or 'application/octet-stream'
+    manifest = {
+        'assets': hashed,
+        'files': files,
+        'sources': {rel: _stamp(path) for rel, path in sources.items()},
+    }
+    atomic_write_json(os.path.join(out_dir, 'manifest.json'), manifest)
+    return manifest
+
+
+class AssetPipeline:
+    """Serves the built copy of the site's pages, CSS and JS from ``out_dir``."""
+
+    def __init__(self, base_dir: str, out_dir: str):
+        self.base_dir = base_dir
+        self.out_dir = out_dir
+        self.manifest_path = os.path.join(out_dir, 'manifest.json')
+        self.files = {}
+        self.entries = {}
+
+    def stale(self, manifest) -> bool:
+        if not manifest:
+            return True
+        current = {rel: _stamp(path) for rel, path in _sources(self.base_dir)}
+        return current != manifest.get('sources')
+
+    def ensure(self) -> dict:
+        """Load the manifest, rebuilding first if any source changed since the last build."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Gunicorn workers start together; only one of them rebuilds.
+        with FileLock(self.manifest_path):
+            manifest = load_json(self.manifest_path, None)
+            if self.stale(manifest):
+                manifest = build(self.base_dir, self.out_dir)
+        entries = {}
+        for rel, entry in manifest['files'].items():
+            path = os.path.join(self.out_dir, rel)
+            entries[rel, None] = FileEntry(path, entry['mimetype'], entry['etag'])
+            for encoding, suffix in ENCODINGS:
+                if encoding in entry['encodings']:
+                    entries[rel, encoding] = FileEntry(path + suffix, entry['mimetype'], f"{entry['etag']}-{encoding}")
+        self.files, self.entries = manifest['files'], entries
+        return manifest
+
+    def send(self, rel: str):
+        """Response for a built file with Accept-Encoding negotiation, or None."""
+        entry = self.files.get(rel)
+        if entry is None:
+            return None
+        for encoding, _suffix in ENCODINGS:
+            if encoding in entry['encodings'] and request.accept_encodings[encoding]:
+                break
+        else:
+            encoding = None
+        resp = send_entry(self.entries[rel, encoding], IMMUTABLE if entry['immutable'] else REVALIDATE,
+                          {'Content-Encoding': encoding} if encoding else None)
+        resp.vary.add('Accept-Encoding')
+        return resp
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress the site assets.')
+    parser.add_argument('--base-dir', default=os.getcwd())
+    parser.add_argument('--out-dir', default=None, help='default: <base-dir>/dist')
+    args = parser.parse_args(argv)
+    out_dir = args.out_dir or os.path.join(args.base_dir, 'dist')
+    manifest = build(args.base_dir, out_dir)
+    print(json.dumps(manifest['assets'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
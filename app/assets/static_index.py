@@ -0,0 +1,116 @@
+import logging
+import mimetypes
+import os
+import threading
+from datetime import datetime, timezone
+
+from flask import Response, abort, request
+from werkzeug.wsgi import wrap_file
+
+log = logging.getLogger(__name__)
+
+SKIP_DIRS = {'app', 'data', 'uploads', 'dist', 'instance', 'storage', 'venv', '.venv', 'node_modules', '__pycache__'}
+# Only these are ever served from the site folder; .env, *.pid, logs, .py, .pages etc. are not.
+PUBLIC_EXT = {'.html', '.css', '.js', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico',
+              '.pdf', '.woff', '.woff2', '.ttf'}
+
+
+class FileEntry:
+    """Everything needed to answer a request for a file, gathered by one stat."""
+
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'mimetype')
+
+    def __init__(self, path: str, mimetype: str = None, etag: str = None, st=None):
+        st = st or os.stat(path)
+        self.path = path
+        self.size = st.st_size
+        self.mtime = datetime.fromtimestamp(int(st.st_mtime), tz=timezone.utc)
+        self.etag = etag or f'{st.st_mtime_ns:x}-{st.st_size:x}'
+        self.mimetype = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    def key(self) -> tuple:
+        return (self.path, self.size, self.etag)
+
+
+def send_entry(entry: FileEntry, cache_control: str = None, headers: dict = None) -> Response:
+    """Stream ``entry`` via ``wsgi.file_wrapper`` (sendfile under gunicorn).
+
+    Uses the precomputed size, mtime and ETag, so the only filesystem call is
+    the ``open``. Handles If-None-Match/If-Modified-Since and Range.
+    """
+    try:
+        fh = open(entry.path, 'rb')
+    except FileNotFoundError:
+        abort(404)
+    resp = Response(wrap_file(request.environ, fh), mimetype=entry.mimetype, direct_passthrough=True)
+    resp.content_length = entry.size
+    resp.last_modified = entry.mtime
+    resp.set_etag(entry.etag)
+    if cache_control:
+        resp.headers['Cache-Control'] = cache_control
+    for name, value in (headers or {}).items():
+        resp.headers[name] = value
+    return resp.make_conditional(request, accept_ranges=True, complete_length=entry.size)
+
+
+def scan(base_dir: str) -> dict:
+    """``{url path: FileEntry}`` for every public file under ``base_dir``."""
+    files = {}
+    for dirpath, dirs, names in os.walk(base_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in names:
+            if name.startswith('.') or os.path.splitext(name)[1].lower() not in PUBLIC_EXT:
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                entry = FileEntry(path)
+            except FileNotFoundError:
+                continue
+            files[os.path.relpath(path, base_dir).replace(os.sep, '/')] = entry
+    return files
+
+
+class StaticIndex:
+    """Allow-listed, in-memory index of the site's static files.
+
+    Built once at startup; lookups are a dict hit, so serving a file never
+    joins paths or stats the disk, and anything outside the index is a 404.
+    ``start_watcher`` rescans in the background so edits show up without a
+    restart.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self.files = scan(base_dir)
+        self._watcher = None
+
+    def send(self, rel: str):
+        entry = self.files.get(rel)
+        if entry is None:
+            return None
+        return send_entry(entry)
+
+    def refresh(self) -> bool:
+        """Rescan; returns True if any file was added, removed or changed."""
+        files = scan(self.base_dir)
+        old = self.files
+        changed = files.keys() != old.keys() or any(e.key() != old[k].key() for k, e in files.items())
+        if changed:
+            self.files = files
+        return changed
+
+    def start_watcher(self, interval: float, on_change=None):
+        """Poll for changes every ``interval`` seconds in a daemon thread."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def run():
+            stop = threading.Event()
+            while not stop.wait(interval):
+                try:
+                    if self.refresh() and on_change is not None:
+                        on_change()
+                except Exception:
+                    log.exception('static index refresh failed')
+        self._watcher = threading.Thread(target=run, name='static-index', daemon=True)
+        self._watcher.start()
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+
+from app.auth.google import CLOCK_SKEW, GoogleTokenVerifier, LocalIssuer, StaticJwksSource
+
+CLIENT_ID = 'test-client.apps.googleusercontent.com'
+
+
+class CountingSource(StaticJwksSource):
+    def __init__(self, jwks, max_age=3600):
+        super().__init__(jwks, max_age)
+        self.fetches = 0
+
+    def fetch(self):
+        self.fetches += 1
+        return super().fetch()
+
+
+def test_verify_caches_keys_and_memoizes_tokens():
+    issuer = LocalIssuer()
+    source = CountingSource(issuer.jwks())
+    verifier = GoogleTokenVerifier(CLIENT_ID, source)
+    token = issuer.token(CLIENT_ID, 'admin@example.com', 'Admin')
+    assert verifier.verify(token)['email'] == 'admin@example.com'
+    assert verifier.verify(token)['name'] == 'Admin'
+    assert verifier.verify(issuer.token(CLIENT_ID, 'other@example.com'))['email'] == 'other@example.com'
+    assert source.fetches == 1
+    assert len(verifier._memo) == 2
+
+
+def test_verify_rejects_bad_tokens():
+    issuer = LocalIssuer()
+    verifier = GoogleTokenVerifier(CLIENT_ID, issuer.source())
+    good = issuer.token(CLIENT_ID, 'a@example.com')
+    for token in (
+        issuer.token('someone-else', 'a@example.com'),
+        issuer.token(CLIENT_ID, 'a@example.com', iss='https://evil.example.com'),
+        issuer.token(CLIENT_ID, 'a@example.com', exp=int(time.time()) - 3600),
+        LocalIssuer().token(CLIENT_ID, 'a@example.com'),  # same kid, different key
+        good[:-4] + ('AAAA' if not good.endswith('AAAA') else 'BBBB'),
+        'not-a-token',
+    ):
+        with pytest.raises(ValueError):
+            verifier.verify(token)
+
+
+def test_key_rotation_and_expiry():
+    old, new = LocalIssuer('old'), LocalIssuer('new')
+    source = CountingSource(old.jwks(), max_age=60)
+    now = [time.time()]
+    verifier = GoogleTokenVerifier(CLIENT_ID, source, clock=lambda: now[0])
+    verifier.verify(old.token(CLIENT_ID, 'a@example.com'))
+    source.jwks = new.jwks()
+    # Unknown kid: refetched straight away instead of waiting out max-age.
+    now[0] += 31
+    assert verifier.verify(new.token(CLIENT_ID, 'a@example.com'))['email'] == 'a@example.com'
+    assert source.fetches == 2
+    # Memoized tokens are dropped once they expire.
+    token = new.token(CLIENT_ID, 'b@example.com', ttl=120)
+    verifier.verify(token)
+    now[0] += 3600
+    with pytest.raises(ValueError):
+        verifier.verify(token)
+
+
+@pytest.mark.parametrize('claims, message', [
+    ({'aud': 'someone-else'}, 'not issued for this client'),
+    ({'aud': ['someone-else', 'another']}, 'not issued for this client'),
+    ({'iss': 'https://evil.example.com'}, 'issuer'),
+    ({'exp': 1000 - CLOCK_SKEW - 1}, 'expired'),
+    ({'iat': 1000 + CLOCK_SKEW + 1}, 'too early'),
+])
+def test_verify_rejects_wrong_claims(claims, message):
+    issuer = LocalIssuer()
+    verifier = GoogleTokenVerifier(CLIENT_ID, issuer.source(), clock=lambda: 1000)
+    token = issuer.token(CLIENT_ID, 'a@example.com', **dict({'iat': 900, 'exp': 2000}, **claims))
+    with pytest.raises(ValueError, match=message):
+        verifier.verify(token)
+
+
+def test_verify_tolerates_clock_skew():
+    issuer = LocalIssuer()
+    verifier = GoogleTokenVerifier(CLIENT_ID, issuer.source(), clock=lambda: 1000)
+    # Just expired and not quite issued yet by our clock, both within CLOCK_SKEW.
+    token = issuer.token(CLIENT_ID, 'a@example.com', iat=1000 + CLOCK_SKEW - 1, exp=1000 - CLOCK_SKEW + 1)
+    assert verifier.verify(token)['email'] == 'a@example.com'
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval():
+    source = CountingSource(LocalIssuer('known').jwks())
+    now = [time.time()]
+    verifier = GoogleTokenVerifier(CLIENT_ID, source, clock=lambda: now[0])
+    stranger = LocalIssuer('stranger')
+    for _ in range(3):
+        with pytest.raises(ValueError, match='unknown key'):
+            verifier.verify(stranger.token(CLIENT_ID, 'a@example.com'))
+    assert source.fetches == 1
+    now[0] += 31
+    with pytest.raises(ValueError, match='unknown key'):
+        verifier.verify(stranger.token(CLIENT_ID, 'a@example.com'))
+    assert source.fetches == 2
+
+
+class BlockingSource(CountingSource):
+    def __init__(self, jwks):
+        super().__init__(jwks)
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def fetch(self):
+        self.fetching.set()
+        self.release.wait(5)
+        return super().fetch()
+
+
+def test_key_fetch_is_single_flight_and_blocks_no_cached_sign_in():
+    issuer = LocalIssuer()
+    source = BlockingSource(issuer.jwks())
+    verifier = GoogleTokenVerifier(CLIENT_ID, source)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(verifier.verify(issuer.token(CLIENT_ID, f'{i}@x.org'))))
+               for i in range(4)]
+    for t in threads:
+        t.start()
+    assert source.fetching.wait(5)
+    source.release.set()
+    for t in threads:
+        t.join(5)
+    assert len(results) == 4 and source.fetches == 1
+
+    # A rotated-key refetch in flight does not hold up tokens whose key is cached.
+    source.fetching.clear()
+    source.release.clear()
+    waiting = threading.Thread(target=lambda: pytest.raises(ValueError, verifier.verify,
+                                                            LocalIssuer('rotated').token(CLIENT_ID, 'r@x.org')))
+    verifier._last_fetch -= 60
+    waiting.start()
+    assert source.fetching.wait(5)
+    assert verifier.verify(issuer.token(CLIENT_ID, 'cached@x.org'))['email'] == 'cached@x.org'
+    source.release.set()
+    waiting.join(5)
+    assert source.fetches == 2
@@ -0,0 +1,206 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+GOOGLE_JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+# Used when the certs response has no max-age; Google normally sends ~6 hours.
+DEFAULT_MAX_AGE = 3600
+# Tolerated clock difference between us and Google when checking iat/exp.
+CLOCK_SKEW = 60
+# A kid we do not know triggers a refetch, but not more often than this.
+MIN_REFRESH_INTERVAL = 30
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _b64int(data: str) -> int:
+    return int.from_bytes(_b64decode(data), 'big')
+
+
+class HttpJwksSource:
+    """Google's published keys, fetched over a pooled ``requests`` session."""
+
+    def __init__(self, url: str = GOOGLE_JWKS_URL, session=None, timeout: float = 5.0):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+
+    def fetch(self):
+        """``(jwks, max_age_seconds)`` honouring the response's Cache-Control."""
+        resp = self.session.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+        m = _MAX_AGE_RE.search(resp.headers.get('Cache-Control', ''))
+        return resp.json(), int(m.group(1)) if m else DEFAULT_MAX_AGE
+
+
+class StaticJwksSource:
+    """Fixed key set, e.g. from a file, for tests, benchmarks and offline development."""
+
+    def __init__(self, jwks: dict, max_age: int = DEFAULT_MAX_AGE):
+        self.jwks = jwks
+        self.max_age = max_age
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path, 'r', encoding='utf-8') as fh:
+            return cls(json.load(fh))
+
+    def fetch(self):
+        return self.jwks, self.max_age
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens (RS256) with cached keys and memoized results.
+
+    Keys are kept until the max-age the source reported; an unknown ``kid``
+    (Google rotated keys) forces one early refetch. Only one thread fetches
+    at a time, without holding up sign-ins whose key is cached. Tokens that verified are
+    remembered until their ``exp`` so a repeated sign-in costs a dict lookup.
+    Errors raise ``ValueError`` like ``google.oauth2.id_token`` does.
+    """
+
+    def __init__(self, client_id: str, source=None, issuers=GOOGLE_ISSUERS, memo_size: int = 256,
+                 clock=time.time):
+        self.client_id = client_id
+        self.source = source or HttpJwksSource()
+        self.issuers = issuers
+        self.memo_size = memo_size
+        self.clock = clock
+        self._keys = {}
+        self._keys_expire = 0.0
+        self._last_fetch = None
+        self._generation = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        # Held across the HTTP fetch instead of _lock: sign-ins with cached
+        # keys go on, and concurrent misses wait for the one fetch in flight.
+        self._fetch_lock = threading.Lock()
+
+    def _cached(self, kid: str) -> tuple:
+        with self._lock:
+            return self._keys.get(kid), self._generation, self.clock() >= self._keys_expire
+
+    def _fetch(self):
+        jwks, max_age = self.source.fetch()
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            if jwk.get('kty') == 'RSA' and jwk.get('kid'):
+                keys[jwk['kid']] = rsa.RSAPublicNumbers(_b64int(jwk['e']), _b64int(jwk['n'])).public_key()
+        now = self.clock()
+        with self._lock:
+            self._keys = keys
+            self._keys_expire = now + max_age
+            self._last_fetch = now
+            self._generation += 1
+
+    def _key(self, kid: str):
+        key, generation, due = self._cached(kid)
+        if key is None or due:
+            with self._fetch_lock:
+                key, current, due = self._cached(kid)
+                # Another thread fetched while we waited: use its keys as they are.
+                if current == generation and (due or self._last_fetch is None
+                                              or self.clock() - self._last_fetch >= MIN_REFRESH_INTERVAL):
+                    self._fetch()
+                    key = self._cached(kid)[0]
+        if key is None:
+            raise ValueError('Token signed with an unknown key')
+        return key
+
+    def verify(self, token: str) -> dict:
+        """Return the token's claims, or raise ``ValueError``."""
+        if not isinstance(token, str) or token.count('.') != 2:
+            raise ValueError('Malformed token')
+        now = self.clock()
+        memo_key = hashlib.sha256(token.encode('utf-8')).digest()
+        with self._lock:
+            hit = self._memo.get(memo_key)
+            if hit is not None:
+                if hit['exp'] + CLOCK_SKEW > now:
+                    self._memo.move_to_end(memo_key)
+                    return dict(hit)
+                del self._memo[memo_key]
+        header_b64, payload_b64, sig_b64 = token.split('.')
+        try:
+            header = json.loads(_b64decode(header_b64))
+            claims = json.loads(_b64decode(payload_b64))
+            signature = _b64decode(sig_b64)
+        except ValueError:
+            raise ValueError('Malformed token')
+        if header.get('alg') != 'RS256':
+            raise ValueError('Unsupported token algorithm')
+        key = self._key(header.get('kid'))
+        try:
+            key.verify(signature, f'{header_b64}.{payload_b64}'.encode('ascii'), padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            raise ValueError('Invalid token signature')
+        self._check_claims(claims, now)
+        with self._lock:
+            self._memo[memo_key] = claims
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return dict(claims)
+
+    def _check_claims(self, claims: dict, now: float):
+        if claims.get('iss') not in self.issuers:
+            raise ValueError('Wrong token issuer')
+        aud = claims.get('aud')
+        if self.client_id not in (aud if isinstance(aud, list) else [aud]):
+            raise ValueError('Token was not issued for this client')
+        exp = claims.get('exp')
+        if not isinstance(exp, (int, float)) or exp + CLOCK_SKEW < now:
+            raise ValueError('Token expired')
+        iat = claims.get('iat')
+        if isinstance(iat, (int, float)) and iat - CLOCK_SKEW > now:
+            raise ValueError('Token used too early')
+
+
+class LocalIssuer:
+    """Signs Google-shaped ID tokens with a throwaway key (tests, benchmarks, offline dev).
+
+    ``source()`` gives the matching key set for ``GoogleTokenVerifier``.
+    """
+
+    def __init__(self, kid: str = 'local-test-key'):
+        self.kid = kid
+        self._private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwks(self) -> dict:
+        numbers = self._private.public_key().public_numbers()
+
+        def enc(n: int) -> str:
+            return base64.urlsafe_b64encode(n.to_bytes((n.bit_length() + 7) // 8, 'big')).rstrip(b'=').decode('ascii')
+        return {'keys': [{'kty': 'RSA', 'alg': 'RS256', 'use': 'sig', 'kid': self.kid,
+                          'n': enc(numbers.n), 'e': enc(numbers.e)}]}
+
+    def source(self) -> StaticJwksSource:
+        return StaticJwksSource(self.jwks())
+
+    def token(self, client_id: str, email: str, name: str = '', ttl: int = 3600, **claims) -> str:
+        now = int(time.time())
+        payload = {'iss': 'https://accounts.google.com', 'aud': client_id, 'sub': hashlib.sha1(email.encode()).hexdigest(),
+                   'email': email, 'email_verified': True, 'name': name, 'iat': now, 'exp': now + ttl}
+        payload.update(claims)
+
+        def part(obj) -> str:
+            raw = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+            return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+        signing_input = f"{part({'alg': 'RS256', 'kid': self.kid, 'typ': 'JWT'})}.{part(payload)}"
+        sig = self._private.sign(signing_input.encode('ascii'), padding.PKCS1v15(), hashes.SHA256())
+        return signing_input + '.' + base64.urlsafe_b64encode(sig).rstrip(b'=').decode('ascii')
@@ -0,0 +1,344 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.bench import datasets
+from app.bench.serve import BASE_DIR, load_site_app, start_server, stop_server
+
+ADMIN_TOKEN = 'bench-admin-token'
+# Environment the site runs under: scratch data/uploads, no rate limits or watchers.
+SITE_ENV = {
+    'ADMIN_TOKEN': ADMIN_TOKEN,
+    'RATE_LIMIT_PRAYER': 'off',
+    'RATE_LIMIT_MEMBERSHIP': 'off',
+    'STATIC_WATCH_SECONDS': '0',
+    'MEMBERS_SHEET_REFRESH': '0',
+}
+DEFAULT_SCALES = (1000, 10000, 100000)
+# A run is flagged when p95 latency or peak RSS grows, or throughput drops, by more than this.
+DEFAULT_THRESHOLD = 0.25
+# Latency changes smaller than this are noise whatever the ratio.
+MIN_LATENCY_DELTA_MS = 2.0
+
+# ``share`` scales the request count: whole-collection lists are few, single writes many.
+Scenario = namedtuple('Scenario', 'name method share make')
+
+
+def _admin(path, **kw):
+    return path, dict(kw, headers={'X-Admin-Token': ADMIN_TOKEN})
+
+
+def _photo() -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return b''
+    buf = io.BytesIO()
+    Image.new('RGB', (320, 240), (120, 80, 40)).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def _membership_form(ctx, i):
+    form = datasets.membership_form(ctx['rng'], ctx['scale'] + i)
+    if ctx['photo'] and i % 4 == 0:
+        # Every fourth applicant attaches a family photo (blob store + thumbnail job).
+        return '/api/memberships', {'data': form, 'files': {'familyPhoto': ('family.jpg', ctx['photo'])}}
+    return '/api/memberships', {'data': form}
+
+
+def _pending(ctx, scenario, i):
+    """The ``i``-th seeded pending id reserved for ``scenario`` (approve and reject get disjoint halves)."""
+    ids = ctx['pending'][scenario]
+    return ids[i % len(ids)]
+
+
+SCENARIOS = (
+    Scenario('list_memberships', 'GET', 0.05, lambda ctx, i: _admin('/api/memberships')),
+    Scenario('page_memberships', 'GET', 1.0, lambda ctx, i: _admin('/api/memberships?limit=50&baptized=yes')),
+    Scenario('list_pending_memberships', 'GET', 0.05, lambda ctx, i: _admin('/api/pending-memberships')),
+    Scenario('list_prayers', 'GET', 0.05, lambda ctx, i: _admin('/api/prayers')),
+    Scenario('page_pending_prayers', 'GET', 1.0, lambda ctx, i: _admin('/api/pending-prayers?limit=50')),
+    Scenario('login_stats', 'GET', 0.25, lambda ctx, i: _admin('/api/admin/login-stats')),
+    Scenario('submit_prayer', 'POST', 1.0,
+             lambda ctx, i: ('/submit/prayer', {'json': datasets.prayer(ctx['rng'], ctx['scale'] + i)})),
+    Scenario('submit_membership', 'POST', 1.0, _membership_form),
+    Scenario('approve_prayer', 'POST', 0.5,
+             lambda ctx, i: _admin(f"/api/pending-prayers/{_pending(ctx, 'approve_prayer', i)}/approve")),
+    Scenario('reject_prayer', 'POST', 0.5,
+             lambda ctx, i: _admin(f"/api/pending-prayers/{_pending(ctx, 'reject_prayer', i)}/reject")),
+    Scenario('approve_membership', 'POST', 0.5,
+             lambda ctx, i: _admin(f"/api/pending-memberships/{_pending(ctx, 'approve_membership', i)}/approve")),
+    Scenario('reject_membership', 'POST', 0.5,
+             lambda ctx, i: _admin(f"/api/pending-memberships/{_pending(ctx, 'reject_membership', i)}/reject")),
+)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies: list, wall: float, errors: int) -> dict:
+    ms = sorted(x * 1000.0 for x in latencies)
+    return {
+        'count': len(ms),
+        'errors': errors,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'rps': round(len(ms) / wall, 1) if wall > 0 else 0.0,
+    }
+
+
+def run_scenarios(send, counts: dict, requests: int, concurrency: int, seed: int = 0, only=None) -> dict:
+    """Drive every scenario through ``send(method, path, **kw) -> status``.
+
+    ``counts`` is what ``datasets.seed`` created; each approve/reject scenario
+    gets its own slice of the seeded pending ids so none hits a 404.
+    """
+    pending = {}
+    for kind, key in (('membership', 'pending_members'), ('prayer', 'pending_prayers')):
+        ids = list(range(1, counts[key] + 1))
+        half = len(ids) // 2 or 1
+        pending['approve_' + kind] = ids[:half]
+        pending['reject_' + kind] = ids[half:] or ids
+    ctx = {'rng': random.Random(seed), 'scale': counts['memberships'], 'photo': _photo(), 'pending': pending}
+    results = {}
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        n = max(3, int(requests * scenario.share))
+        if scenario.name in pending:
+            n = min(n, len(pending[scenario.name]))
+        calls = [scenario.make(ctx, i) for i in range(n)]
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+
+        def one(call):
+            path, kw = call
+            start = time.perf_counter()
+            status = send(scenario.method, path, **kw)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status >= 400:
+                    errors[0] += 1
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, calls))
+        results[scenario.name] = summarize(latencies, time.perf_counter() - wall_start, errors[0])
+    return results
+
+
+class ClientTarget:
+    """``send`` through Flask's test client (one client per thread): the app without HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def __call__(self, method, path, data=None, files=None, json=None, headers=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        if files:
+            data = dict(data or {})
+            for field, (filename, content) in files.items():
+                data[field] = (io.BytesIO(content), filename)
+        resp = client.open(path, method=method, data=data, json=json, headers=headers)
+        resp.get_data()
+        return resp.status_code
+
+
+class HttpTarget:
+    """``send`` over HTTP to a running server, one keep-alive session per thread."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._local = threading.local()
+
+    def __call__(self, method, path, **kw):
+        import requests
+
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        resp = session.request(method, self.base_url + path, timeout=300, **kw)
+        return resp.status_code
+
+
+def _site_env(root: str) -> dict:
+    return dict(SITE_ENV, DATA_DIR=os.path.join(root, 'data'), UPLOAD_DIR=os.path.join(root, 'uploads'))
+
+
+def run_client(root: str, counts: dict, requests: int, concurrency: int, only=None) -> dict:
+    """Client mode, in a child process so startup cost and peak RSS are per scale."""
+    cmd = [sys.executable, '-m', 'app.bench.bench', '_client', '--root', root,
+           '--counts', json.dumps(counts), '--requests', str(requests), '--concurrency', str(concurrency)]
+    if only:
+        cmd += ['--only', ','.join(only)]
+    out = subprocess.run(cmd, cwd=BASE_DIR, env=dict(os.environ, **_site_env(root)),
+                         check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+def _client_main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--root')
+    parser.add_argument('--counts')
+    parser.add_argument('--requests', type=int)
+    parser.add_argument('--concurrency', type=int)
+    parser.add_argument('--only', type=lambda s: s.split(','))
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    app = load_site_app()
+    startup = time.perf_counter() - start
+    try:
+        scenarios = run_scenarios(ClientTarget(app), json.loads(args.counts), args.requests,
+                                  args.concurrency, only=args.only)
+    finally:
+        app.extensions['site'].stop()
+    print(json.dumps({'startup_s': round(startup, 3), 'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      'scenarios': scenarios}))
+
+
+def run_server(root: str, counts: dict, requests: int, concurrency: int, workers: int = 0, only=None) -> dict:
+    start = time.perf_counter()
+    proc, base = start_server(_site_env(root), workers=workers)
+    startup = time.perf_counter() - start
+    try:
+        scenarios = run_scenarios(HttpTarget(base), counts, requests, concurrency, only=only)
+    finally:
+        # With gunicorn this is the arbiter; workers are its children and report through it.
+        rss = stop_server(proc)
+    return {'startup_s': round(startup, 3), 'peak_rss_kb': rss, 'scenarios': scenarios}
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Regressions of ``current`` against ``baseline`` as readable strings."""
+    found = []
+    for mode, scales in current.get('results', {}).items():
+        for scale, run in scales.items():
+            base = baseline.get('results', {}).get(mode, {}).get(scale)
+            if not base:
+                continue
+            where = f'{mode} {scale}'
+            if base.get('peak_rss_kb') and run['peak_rss_kb'] > base['peak_rss_kb'] * (1 + threshold):
+                found.append(f"{where}: peak RSS {base['peak_rss_kb'] // 1024} -> {run['peak_rss_kb'] // 1024} MB")
+            for name, now in run['scenarios'].items():
+                was = base['scenarios'].get(name)
+                if not was:
+                    continue
+                if (now['p95_ms'] > was['p95_ms'] * (1 + threshold)
+                        and now['p95_ms'] - was['p95_ms'] > MIN_LATENCY_DELTA_MS):
+                    found.append(f"{where} {name}: p95 {was['p95_ms']:.1f} -> {now['p95_ms']:.1f} ms")
+                if was['rps'] and now['rps'] < was['rps'] * (1 - threshold):
+                    found.append(f"{where} {name}: throughput {was['rps']:.0f} -> {now['rps']:.0f} req/s")
+                if now['errors'] > was['errors']:
+                    found.append(f"{where} {name}: {now['errors']} errors (baseline {was['errors']})")
+    return found
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    for mode, scales in report['results'].items():
+        for scale, run in scales.items():
+            lines.append(f"\n{mode} @ {scale} records: startup {run['startup_s']:.2f}s, "
+                         f"peak RSS {run['peak_rss_kb'] / 1024:.0f} MB")
+            lines.append(f"  {'scenario':<26}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+            for name, s in run['scenarios'].items():
+                lines.append(f"  {name:<26}{s['count']:>6}{s['errors']:>5}{s['p50_ms']:>10.2f}"
+                             f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['rps']:>10.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the site's endpoints on synthetic data sets.")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='records per collection, comma separated (default %(default)s)')
+    parser.add_argument('--modes', default='client,server', help='client (Flask test client), server (HTTP) or both')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario before its share')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=0, help='gunicorn workers for server mode (0: threaded Werkzeug)')
+    parser.add_argument('--only', default='', help='comma separated scenario names')
+    parser.add_argument('--out', default=os.path.join('data', 'bench', 'latest.json'))
+    parser.add_argument('--baseline', default=os.path.join('data', 'bench', 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--keep', action='store_true', help='keep the generated data directories')
+    args = parser.parse_args(argv)
+    only = [s for s in args.only.split(',') if s] or None
+
+    report = {
+        'meta': {'time': datetime.utcnow().isoformat() + 'Z', 'python': platform.python_version(),
+                 'machine': platform.machine(), 'cpus': os.cpu_count(), 'requests': args.requests,
+                 'concurrency': args.concurrency, 'workers': args.workers},
+        'results': {},
+    }
+    for scale in [int(s) for s in args.scales.split(',') if s]:
+        for mode in [m for m in args.modes.split(',') if m]:
+            root = tempfile.mkdtemp(prefix=f'cabc-bench-{scale}-')
+            try:
+                start = time.perf_counter()
+                counts = datasets.seed(os.path.join(root, 'data'), scale)
+                print(f'{mode} @ {scale}: seeded in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+                if mode == 'client':
+                    run = run_client(root, counts, args.requests, args.concurrency, only)
+                elif mode == 'server':
+                    run = run_server(root, counts, args.requests, args.concurrency, args.workers, only)
+                else:
+                    parser.error(f'unknown mode {mode!r}')
+                report['results'].setdefault(mode, {})[str(scale)] = run
+            finally:
+                if args.keep:
+                    print(f'data kept in {root}', file=sys.stderr)
+                else:
+                    shutil.rmtree(root, ignore_errors=True)
+    print(format_report(report))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+    if args.save_baseline:
+        shutil.copyfile(args.out, args.baseline)
+        print(f'\nbaseline saved to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'\nno baseline at {args.baseline}; run with --save-baseline to create one')
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as fh:
+        regressions = compare(report, json.load(fh), args.threshold)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) against {args.baseline}:')
+        for line in regressions:
+            print('  ' + line)
+        return 1
+    print(f'\nno regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['_client']:
+        _client_main(sys.argv[2:])
+    else:
+        sys.exit(main())
@@ -0,0 +1,56 @@
+from app.bench import datasets
+from app.bench.bench import SCENARIOS, compare, percentile, run_scenarios
+from app.bench.stress import check_files, check_invariants
+from app.storage.repository import Store
+
+
+def test_percentile_interpolates():
+    assert percentile([], 95) == 0.0
+    assert percentile([10.0], 99) == 10.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile(list(range(101)), 95) == 95
+
+
+def test_seed_and_scenarios_use_distinct_pending_ids(tmp_path):
+    counts = datasets.seed(str(tmp_path), 40)
+    store = Store(str(tmp_path))
+    assert len(store.memberships) == 40 and len(store.pending_prayers) == 10
+    assert any(r['children'] for r in store.memberships.iter())
+    calls = []
+    results = run_scenarios(lambda method, path, **kw: calls.append((method, path)) or 200,
+                            counts, requests=8, concurrency=2)
+    assert list(results) == [s.name for s in SCENARIOS]
+    approved = {p for m, p in calls if p.startswith('/api/pending-prayers/') and p.endswith('/approve')}
+    rejected = {p.replace('/reject', '/approve') for m, p in calls if p.endswith('/reject') and 'prayers' in p}
+    assert approved and rejected and not approved & rejected
+    assert all(r['errors'] == 0 for r in results.values())
+
+
+def test_compare_flags_slower_and_bigger_runs():
+    def run(p95, rps, rss):
+        stats = {'count': 50, 'errors': 0, 'p50_ms': 1, 'p95_ms': p95, 'p99_ms': p95, 'rps': rps}
+        return {'results': {'client': {'1000': {'peak_rss_kb': rss, 'scenarios': {'submit_prayer': stats}}}}}
+    base = run(10.0, 500.0, 100000)
+    assert compare(run(11.0, 480.0, 110000), base) == []
+    found = compare(run(20.0, 200.0, 200000), base)
+    assert len(found) == 3 and all(line.startswith('client 1000') for line in found)
+
+
+def test_stress_invariants_spot_lost_and_doubled_records():
+    tally = {'members': {'m1': {'pending_id': 1, 'state': 'approved', 'approved_ids': [7]},
+                         'm2': {'pending_id': 2, 'state': 'pending', 'approved_ids': []},
+                         'm3': {'pending_id': 3, 'state': 'rejected', 'approved_ids': []}},
+             'prayers': {'p1': {'pending_id': 1, 'state': 'approved'}}}
+    good = check_invariants([tally], pending=[{'id': 2, 'name': 'm2'}], approved=[{'id': 7, 'name': 'm1'}],
+                            pending_prayers=[], prayers=[{'id': 1, 'text': 'p1'}])
+    assert good == []
+    bad = check_invariants([tally], pending=[], approved=[{'id': 7, 'name': 'm1'}, {'id': 8, 'name': 'm1'}],
+                           pending_prayers=[], prayers=[{'id': 1, 'text': 'p1'}, {'id': 1, 'text': 'p1'}])
+    assert any('lost' in p for p in bad) and any('more than once' in p for p in bad)
+    assert any('duplicated ids' in p for p in bad)
+
+
+def test_stress_file_check_reports_torn_lines(tmp_path):
+    (tmp_path / 'prayers.jsonl').write_bytes(b'{"op":"put","id":1,"rec":{}}\n{"op":"pu')
+    (tmp_path / 'sermons.json').write_text('[]')
+    assert check_files(str(tmp_path)) == ['prayers.jsonl:2 is not valid JSON']
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from app.storage.repository import Store
+
+FIRST_NAMES = ('Ravi', 'Sita', 'Suresh', 'Lakshmi', 'Prasad', 'Mary', 'John', 'Grace', 'Daniel', 'Ruth',
+               'Joseph', 'Esther', 'Samuel', 'Hannah', 'Kiran', 'Anitha', 'David', 'Sarah', 'Paul', 'Priya')
+SURNAMES = ('Kumar', 'Rao', 'Reddy', 'Babu', 'Devi', 'Raju', 'Naidu', 'Prakash', 'Chowdary', 'Varma')
+TELUGU_NAMES = ('రవి', 'సీత', 'సురేష్', 'లక్ష్మి', 'ప్రసాద్', 'మేరీ', 'యోహాను', 'కృప', 'దానియేలు', 'రూతు')
+PLACES = ('Kakinada', 'Rajahmundry', 'Samalkot', 'Pithapuram', 'Peddapuram', 'Tuni', 'Amalapuram')
+OCCUPATIONS = ('Teacher', 'Farmer', 'Engineer', 'Nurse', 'Driver', 'Business', 'Student', 'Homemaker', 'Clerk')
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')
+PRAYER_TEXTS = (
+    'Please pray for my mother\'s health and a quick recovery after surgery.',
+    'Pray for my son\'s exams next month and for peace in our family.',
+    'Thanking God for a new job; pray that I serve faithfully.',
+    'మా కుటుంబం కోసం ప్రార్థించండి, నా తండ్రి ఆరోగ్యం బాగుండాలి.',
+    'Pray for rain for our fields this season.',
+    'దేవుని కృప మా పిల్లల మీద ఉండాలని ప్రార్థించండి.',
+)
+EPOCH = datetime(2024, 1, 1)
+
+
+def _date(rng: random.Random, first: int, last: int) -> str:
+    return f'{rng.randrange(first, last)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}'
+
+
+def _name(rng: random.Random) -> str:
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}'
+
+
+def _blob_ref(rng: random.Random) -> str:
+    digest = hashlib.sha256(str(rng.random()).encode()).hexdigest()
+    return f'blobs/{digest[:2]}/{digest}.jpg'
+
+
+def membership(rng: random.Random, i: int, files: bool = True) -> dict:
+    """A record shaped like ``receive_membership`` stores, with children and upload references."""
+    when = EPOCH + timedelta(minutes=i * 7 + rng.randrange(7))
+    children = [{'name': rng.choice(FIRST_NAMES), 'dob': _date(rng, 2000, 2022), 'baptized': rng.choice(('yes', 'no'))}
+                for _ in range(rng.choice((0, 0, 1, 2, 3, 4)))]
+    rec = {
+        'name': _name(rng),
+        'dob': _date(rng, 1950, 2005),
+        'phone': f'9{rng.randrange(10 ** 9):09d}',
+        'email': f'member{i}@example.com' if rng.random() < 0.7 else '',
+        'address': f'{rng.randrange(1, 400)}-{rng.randrange(1, 60)}, {rng.choice(PLACES)}',
+        'baptized': rng.choice(('yes', 'no')),
+        'previous_church': rng.choice(('', 'CSI Church', 'Baptist Church ' + rng.choice(PLACES))),
+        'why': 'Joining the fellowship with my family.',
+        'birth_place': rng.choice(PLACES),
+        'blood_group': rng.choice(BLOOD_GROUPS),
+        'christian_status': rng.choice(('Born Christian', 'Convert')),
+        'baptism_pastor': 'Rev. ' + _name(rng),
+        'baptism_year': str(rng.randrange(1970, 2024)),
+        'education': rng.choice(('SSC', 'Intermediate', 'B.Sc', 'B.Tech', 'M.A')),
+        'other_qualifications': '',
+        'occupation': rng.choice(OCCUPATIONS),
+        'aadhar': f'{rng.randrange(10 ** 12):012d}' if rng.random() < 0.5 else '',
+        'father_name': rng.choice(TELUGU_NAMES),
+        'father_occupation': rng.choice(OCCUPATIONS),
+        'mother_name': rng.choice(TELUGU_NAMES),
+        'mother_occupation': rng.choice(OCCUPATIONS),
+        'spouse_name': _name(rng) if rng.random() < 0.6 else '',
+        'spouse_occupation': rng.choice(OCCUPATIONS),
+        'children': children,
+        'declaration': 'on',
+        'declaration_date': when.strftime('%Y-%m-%d'),
+        'declaration_place': rng.choice(PLACES),
+        'files': {},
+        'upload_names': {},
+        'timestamp': when.isoformat() + 'Z',
+    }
+    if files:
+        for field in ('familyPhoto', 'memberSignature'):
+            if rng.random() < 0.8:
+                rec['files'][field] = _blob_ref(rng)
+    return rec
+
+
+def membership_form(rng: random.Random, i: int) -> dict:
+    """Form fields for ``POST /api/memberships`` (the public membership form)."""
+    rec = membership(rng, i, files=False)
+    return {
+        'memberName': rec['name'], 'memberDob': rec['dob'], 'memberPhone': rec['phone'],
+        'memberEmail': rec['email'], 'memberAddress': rec['address'], 'memberBaptized': rec['baptized'],
+        'memberPrevChurch': rec['previous_church'], 'memberWhy': rec['why'],
+        'memberBirthPlace': rec['birth_place'], 'memberBloodGroup': rec['blood_group'],
+        'memberOccupation': rec['occupation'], 'memberAadhar': rec['aadhar'],
+        'memberFatherName': rec['father_name'], 'memberMotherName': rec['mother_name'],
+        'memberSpouseName': rec['spouse_name'], 'children': json.dumps(rec['children'], ensure_ascii=False),
+        'memberDeclaration': 'on', 'memberDeclarationDate': rec['declaration_date'],
+        'memberDeclarationPlace': rec['declaration_place'],
+    }
+
+
+def prayer(rng: random.Random, i: int) -> dict:
+    anon = rng.random() < 0.3
+    return {
+        'ts': int((EPOCH + timedelta(minutes=i * 3)).timestamp()),
+        'name': '' if anon else _name(rng),
+        'anon': anon,
+        'text': rng.choice(PRAYER_TEXTS),
+    }
+
+
+def login_log(rng: random.Random, i: int) -> dict:
+    """An entry of the old ``login_logs.json`` list, which the event log imports on first run."""
+    login = EPOCH + timedelta(hours=i * 2, minutes=rng.randrange(60))
+    entry = {'email': f'admin{rng.randrange(5)}@example.com', 'name': 'Admin',
+             'login_time': login.isoformat() + 'Z'}
+    if rng.random() < 0.9:
+        entry['logout_time'] = (login + timedelta(minutes=rng.randrange(1, 90))).isoformat() + 'Z'
+    return entry
+
+
+def seed(data_dir: str, scale: int, seed: int = 0, batch: int = 5000) -> dict:
+    """Fill an empty ``data_dir`` with ``scale`` approved memberships and prayers.
+
+    The pending queues get a quarter of that each (enough for the approve and
+    reject runs), and the login log ``scale // 10`` sessions. Returns the
+    counts per collection.
+    """
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    store = Store(data_dir)
+    counts = {
+        'memberships': (store.memberships, scale, membership),
+        'pending_members': (store.pending_members, max(1, scale // 4), lambda r, i: membership(r, i, files=False)),
+        'prayers': (store.prayers, scale, prayer),
+        'pending_prayers': (store.pending_prayers, max(1, scale // 4), prayer),
+    }
+    for name, (repo, n, make) in counts.items():
+        for start in range(0, n, batch):
+            repo.add_many([make(rng, i) for i in range(start, min(n, start + batch))])
+    logins = [login_log(rng, i) for i in range(max(1, scale // 10))]
+    with open(os.path.join(data_dir, 'login_logs.json'), 'w', encoding='utf-8') as fh:
+        json.dump(logins, fh)
+    result = {name: n for name, (_repo, n, _make) in counts.items()}
+    result['login_logs'] = len(logins)
+    return result
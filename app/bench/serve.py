@@ -0,0 +1,91 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_site_app():
+    """The site's Flask app as ``wsgi.py`` builds it (production config, shared data warmed)."""
+    from app.app import create_app
+    from app.initialize_functions import warm
+    return warm(create_app('production'))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(env: dict, port: int = None, workers: int = 0, timeout: float = 60.0):
+    """Run the site in a child process on ``port``; returns ``(process, base_url)`` once it answers.
+
+    ``workers`` > 0 uses gunicorn with that many worker processes (if it is
+    installed); otherwise a threaded Werkzeug server in one process.
+    """
+    port = port or free_port()
+    child_env = dict(os.environ, **env)
+    if workers:
+        cmd = [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', '4',
+               '--bind', f'127.0.0.1:{port}', '--chdir', BASE_DIR, 'app.bench.serve:application()']
+    else:
+        cmd = [sys.executable, '-m', 'app.bench.serve', '--port', str(port)]
+    # The request log goes to a file: an unread pipe fills up and stalls the server.
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=child_env, stdout=subprocess.DEVNULL, stderr=log)
+    base = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError('server exited: ' + log.read().decode('utf-8', 'replace')[-2000:])
+        try:
+            requests.get(base + '/config', timeout=1)
+            return proc, base
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f'server did not answer on {base} within {timeout:.0f}s')
+
+
+def stop_server(proc) -> int:
+    """Stop a server from ``start_server``; returns its peak RSS in KB."""
+    proc.terminate()
+    try:
+        _pid, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        proc.wait()
+        return 0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage.ru_maxrss
+
+
+def application():
+    """gunicorn entry point: ``app.bench.serve:application()``."""
+    return load_site_app()
+
+
+def main(argv=None):
+    from werkzeug.serving import make_server
+
+    parser = argparse.ArgumentParser(description='Serve the site with a threaded WSGI server (benchmarks, stress runs).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args(argv)
+    app = load_site_app()
+    server = make_server(args.host, args.port, app, threaded=True)
+    try:
+        server.serve_forever()
+    finally:
+        app.extensions['site'].stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Cold-start and first-request times of the site, checked against a budget.
+
+Each run is a fresh interpreter that imports the app factory, builds the
+production app, warms it (as ``wsgi.py`` does in the gunicorn master) and
+then sends the first request to each of ``FIRST_REQUESTS`` through the test
+client, i.e. what a new worker pays before it answers at full speed. The
+first run only primes the data directory (songbook index, built pages) the
+way the image build does, and is not counted.
+
+Usage:
+    python -m app.bench.startup [--runs 5] [--scale 1000]
+
+Exits with status 1 when a median is over its budget.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Modules that create_app must not import: they belong to services built on first use.
+HEAVY_MODULES = ('pypdf', 'flask_sqlalchemy', 'flasgger', 'requests', 'cryptography')
+FIRST_REQUESTS = ('/', '/config', '/api/pending-prayers', '/api/memberships?limit=20', '/api/songs/1')
+# Milliseconds, for the median run. first_request is per path.
+DEFAULT_BUDGET = {'import': 800, 'create_app': 150, 'warm': 1500, 'first_request': 300}
+
+
+def _child_main():
+    # Only the app is imported here: the bench modules would pull in requests and skew the numbers.
+    timings = {}
+    start = time.perf_counter()
+    from app.app import create_app
+    from app.initialize_functions import warm
+    timings['import'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = create_app('production')
+    timings['create_app'] = time.perf_counter() - start
+    heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    start = time.perf_counter()
+    warm(app)
+    timings['warm'] = time.perf_counter() - start
+
+    client = app.test_client()
+    first = {}
+    try:
+        for path in FIRST_REQUESTS:
+            start = time.perf_counter()
+            resp = client.get(path, headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']})
+            resp.get_data()
+            first[path] = time.perf_counter() - start
+            if resp.status_code >= 500:
+                raise RuntimeError(f'{path}: {resp.status_code}')
+    finally:
+        app.extensions['site'].stop()
+    result = {k: round(v * 1000, 2) for k, v in timings.items()}
+    result['first_request'] = {k: round(v * 1000, 2) for k, v in first.items()}
+    result['heavy_modules'] = heavy
+    print(json.dumps(result))
+
+
+def run_once(env: dict) -> dict:
+    out = subprocess.run([sys.executable, '-m', 'app.bench.startup', '_child'], cwd=BASE_DIR,
+                         env=dict(os.environ, **env), check=True, stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL).stdout
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+def measure(root: str, runs: int = 5) -> dict:
+    """Median timings (ms) over ``runs`` cold starts against the data in ``root``."""
+    from app.bench.bench import SITE_ENV
+    env = dict(SITE_ENV, DATA_DIR=os.path.join(root, 'data'), UPLOAD_DIR=os.path.join(root, 'uploads'),
+               METRICS_FLUSH_SECONDS='0')
+    run_once(env)  # primes the songbook index and built pages
+    samples = [run_once(env) for _ in range(runs)]
+    report = {k: statistics.median(s[k] for s in samples) for k in ('import', 'create_app', 'warm')}
+    report['first_request'] = {path: statistics.median(s['first_request'][path] for s in samples)
+                               for path in FIRST_REQUESTS}
+    report['heavy_modules'] = sorted({m for s in samples for m in s['heavy_modules']})
+    return report
+
+
+def over_budget(report: dict, budget: dict = DEFAULT_BUDGET) -> list:
+    """Budget overruns of a ``measure`` report as readable strings."""
+    found = [f'{k}: {report[k]:.0f} ms (budget {budget[k]} ms)'
+             for k in ('import', 'create_app', 'warm') if report[k] > budget[k]]
+    found += [f'first request {path}: {ms:.0f} ms (budget {budget["first_request"]} ms)'
+              for path, ms in report['first_request'].items() if ms > budget['first_request']]
+    if report['heavy_modules']:
+        found.append(f"create_app imported {', '.join(report['heavy_modules'])}")
+    return found
+
+
+def main(argv=None):
+    from app.bench import datasets
+
+    parser = argparse.ArgumentParser(description='Measure cold start and first requests against a budget.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--scale', type=int, default=1000, help='records per collection in the scratch data')
+    for key, ms in DEFAULT_BUDGET.items():
+        parser.add_argument(f"--budget-{key.replace('_', '-')}", type=float, default=ms, metavar='MS')
+    args = parser.parse_args(argv)
+    budget = {key: getattr(args, f'budget_{key}') for key in DEFAULT_BUDGET}
+
+    root = tempfile.mkdtemp(prefix='cabc-startup-')
+    try:
+        datasets.seed(os.path.join(root, 'data'), args.scale)
+        report = measure(root, args.runs)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print(f"import {report['import']:.0f} ms, create_app {report['create_app']:.0f} ms, "
+          f"warm {report['warm']:.0f} ms (median of {args.runs})")
+    for path, ms in report['first_request'].items():
+        print(f'  first {path:<28}{ms:>8.1f} ms')
+    problems = over_budget(report, budget)
+    for line in problems:
+        print('over budget: ' + line)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['_child']:
+        _child_main()
+    else:
+        sys.exit(main())
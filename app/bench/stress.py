@@ -0,0 +1,309 @@
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+from app.bench.bench import ADMIN_TOKEN, SITE_ENV
+from app.bench.datasets import membership_form
+from app.bench.serve import start_server, stop_server
+
+ADMIN = {'X-Admin-Token': ADMIN_TOKEN}
+
+
+class _Tally:
+    """What one client process was told by the server, to check the data against afterwards."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.members = {}   # marker -> {'pending_id', 'state', 'approved_ids'}
+        self.prayers = {}   # marker -> {'pending_id', 'state'}
+        self.writes = Counter()
+        self.errors = Counter()
+
+    def to_dict(self) -> dict:
+        return {'members': self.members, 'prayers': self.prayers,
+                'writes': dict(self.writes), 'errors': dict(self.errors)}
+
+
+def _post(session, url, tally, kind, **kw):
+    try:
+        resp = session.post(url, timeout=60, **kw)
+    except requests.RequestException as e:
+        with tally.lock:
+            tally.errors[f'{kind}: {type(e).__name__}'] += 1
+        return None
+    with tally.lock:
+        if resp.status_code == 200:
+            tally.writes[kind] += 1
+        elif not (resp.status_code == 404 and kind.startswith(('approve', 'reject'))):
+            # A 404 on approve/reject is the expected loser of a double click.
+            tally.errors[f'{kind}: HTTP {resp.status_code}'] += 1
+    return resp
+
+
+def _moderate(bases, rng, tally, path, kind, double: bool):
+    """POST ``path`` (approve/reject) once, or twice at the same moment to two servers."""
+    results = []
+
+    def send(base):
+        with requests.Session() as session:
+            session.headers.update(ADMIN)
+            resp = _post(session, base + path, tally, kind)
+            if resp is not None and resp.status_code == 200:
+                results.append(resp.json())
+    if not double:
+        send(rng.choice(bases))
+        return results
+    threads = [threading.Thread(target=send, args=(base,)) for base in rng.sample(bases * 2, 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _client_thread(cfg, proc_no, thread_no, tally):
+    rng = random.Random(f"{cfg['run']}-{proc_no}-{thread_no}")
+    session = requests.Session()
+    bases = cfg['bases']
+    deadline = time.time() + cfg['duration']
+    n = 0
+    while time.time() < deadline:
+        n += 1
+        marker = f"stress-{cfg['run']}-{proc_no}-{thread_no}-{n}"
+        action = rng.random()
+        double = rng.random() < cfg['double_approve']
+        if rng.random() < cfg['prayer_share']:
+            resp = _post(session, rng.choice(bases) + '/submit/prayer', tally, 'submit_prayer',
+                         json={'name': 'Stress', 'text': marker})
+            if resp is None or resp.status_code != 200:
+                continue
+            entry = tally.prayers[marker] = {'pending_id': resp.json()['id'], 'state': 'pending'}
+            if action < 0.4:
+                if _moderate(bases, rng, tally, f"/api/pending-prayers/{entry['pending_id']}/approve",
+                             'approve_prayer', double):
+                    entry['state'] = 'approved'
+            elif action < 0.6:
+                if _moderate(bases, rng, tally, f"/api/pending-prayers/{entry['pending_id']}/reject",
+                             'reject_prayer', False):
+                    entry['state'] = 'rejected'
+        else:
+            form = membership_form(rng, n)
+            form['memberName'] = marker
+            resp = _post(session, rng.choice(bases) + '/api/memberships', tally, 'submit_membership', data=form)
+            if resp is None or resp.status_code != 200:
+                continue
+            entry = tally.members[marker] = {'pending_id': resp.json()['pending_id'], 'state': 'pending',
+                                             'approved_ids': []}
+            if action < 0.4:
+                results = _moderate(bases, rng, tally, f"/api/pending-memberships/{entry['pending_id']}/approve",
+                                    'approve_membership', double)
+                if results:
+                    entry['state'] = 'approved'
+                    entry['approved_ids'] = [r['id'] for r in results]
+            elif action < 0.6:
+                if _moderate(bases, rng, tally, f"/api/pending-memberships/{entry['pending_id']}/reject",
+                             'reject_membership', False):
+                    entry['state'] = 'rejected'
+
+
+def client_process(cfg: dict, proc_no: int) -> dict:
+    """One load-generating process running ``cfg['threads']`` client threads."""
+    tally = _Tally()
+    threads = [threading.Thread(target=_client_thread, args=(cfg, proc_no, t, tally))
+               for t in range(cfg['threads'])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return tally.to_dict()
+
+
+def _fetch_all(base: str, path: str) -> list:
+    resp = requests.get(base + path, headers=ADMIN, timeout=300)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def check_files(data_dir: str, db_path: str = None) -> list:
+    """Problems with the stored files: journal lines that are not JSON, a failed SQLite integrity check."""
+    problems = []
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.jsonl'))):
+        with open(path, 'rb') as fh:
+            for lineno, line in enumerate(fh, 1):
+                try:
+                    json.loads(line)
+                except ValueError:
+                    problems.append(f'{os.path.basename(path)}:{lineno} is not valid JSON')
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.json'))):
+        try:
+            with open(path, 'rb') as fh:
+                json.load(fh)
+        except ValueError:
+            problems.append(f'{os.path.basename(path)} is not valid JSON')
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        finally:
+            conn.close()
+        if result != 'ok':
+            problems.append(f'{os.path.basename(db_path)}: {result}')
+    return problems
+
+
+def check_invariants(tallies: list, pending: list, approved: list, pending_prayers: list, prayers: list) -> list:
+    """Compare what clients were told with what the server now holds."""
+    problems = []
+    members = {}
+    prayer_log = {}
+    for tally in tallies:
+        members.update(tally['members'])
+        prayer_log.update(tally['prayers'])
+
+    for name, rows in (('pending memberships', pending), ('memberships', approved),
+                       ('pending prayers', pending_prayers), ('prayers', prayers)):
+        dup = [rid for rid, n in Counter(r['id'] for r in rows).items() if n > 1]
+        if dup:
+            problems.append(f'{name}: {len(dup)} duplicated ids, e.g. {dup[:5]}')
+
+    pending_ids = Counter(e['pending_id'] for e in members.values())
+    reused = [rid for rid, n in pending_ids.items() if n > 1]
+    if reused:
+        problems.append(f'{len(reused)} pending membership ids were handed out twice, e.g. {reused[:5]}')
+
+    in_pending = Counter(r.get('name') for r in pending)
+    in_approved = Counter(r.get('name') for r in approved)
+    approved_by_id = {r['id']: r.get('name') for r in approved}
+    lost, doubled, wrong = [], [], []
+    for marker, entry in members.items():
+        where = in_pending[marker] + in_approved[marker]
+        expected = 0 if entry['state'] == 'rejected' else 1
+        if where < expected:
+            lost.append(marker)
+        elif where > expected:
+            doubled.append(marker)
+        if entry['state'] == 'approved' and in_pending[marker]:
+            wrong.append(marker)
+        for rid in entry['approved_ids']:
+            if approved_by_id.get(rid) != marker:
+                wrong.append(marker)
+    if lost:
+        problems.append(f'{len(lost)} membership submissions lost, e.g. {lost[:3]}')
+    if doubled:
+        problems.append(f'{len(doubled)} memberships stored more than once, e.g. {doubled[:3]}')
+    if wrong:
+        problems.append(f'{len(wrong)} approved memberships not where the approval said, e.g. {wrong[:3]}')
+
+    in_pending = Counter(r.get('text') for r in pending_prayers)
+    in_approved = Counter(r.get('text') for r in prayers)
+    lost, doubled = [], []
+    for marker, entry in prayer_log.items():
+        where = in_pending[marker] + in_approved[marker]
+        expected = 0 if entry['state'] == 'rejected' else 1
+        if where < expected or (entry['state'] == 'approved' and not in_approved[marker]):
+            lost.append(marker)
+        elif where > expected:
+            doubled.append(marker)
+    if lost:
+        problems.append(f'{len(lost)} prayer submissions lost, e.g. {lost[:3]}')
+    if doubled:
+        problems.append(f'{len(doubled)} prayers stored more than once, e.g. {doubled[:3]}')
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hammer the submit/approve routes from many processes and '
+                                                 'check that no record was lost or duplicated.')
+    parser.add_argument('--processes', type=int, default=4, help='client processes')
+    parser.add_argument('--threads', type=int, default=8, help='client threads per process')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds of load')
+    parser.add_argument('--servers', type=int, default=2,
+                        help='server processes sharing the data directory (stand-ins for gunicorn workers)')
+    parser.add_argument('--workers', type=int, default=0, help='run one gunicorn with N workers instead')
+    parser.add_argument('--backend', choices=('journal', 'sqlite'), default='journal')
+    parser.add_argument('--prayer-share', type=float, default=0.5)
+    parser.add_argument('--double-approve', type=float, default=0.1,
+                        help='share of approvals sent twice at once to different servers')
+    parser.add_argument('--out', help='write the report as JSON here')
+    parser.add_argument('--keep', action='store_true', help='keep the data directory')
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix='cabc-stress-')
+    data_dir = os.path.join(root, 'data')
+    env = dict(SITE_ENV, DATA_DIR=data_dir, UPLOAD_DIR=os.path.join(root, 'uploads'), STORAGE_BACKEND=args.backend)
+    db_path = None
+    if args.backend == 'sqlite':
+        db_path = os.path.join(root, 'stress.db')
+        env['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + db_path
+    servers = []
+    try:
+        count = 1 if args.workers else args.servers
+        for _ in range(count):
+            # Started one by one so only the first creates the files.
+            servers.append(start_server(env, workers=args.workers))
+        bases = [base for _proc, base in servers]
+        cfg = {'run': os.path.basename(root), 'bases': bases, 'threads': args.threads, 'duration': args.duration,
+               'prayer_share': args.prayer_share, 'double_approve': args.double_approve}
+        print(f'{args.processes}x{args.threads} clients against {count} server(s) '
+              f'({args.backend}) for {args.duration:.0f}s...', file=sys.stderr)
+        start = time.time()
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            tallies = list(pool.map(client_process, [cfg] * args.processes, range(args.processes)))
+        elapsed = time.time() - start
+
+        base = bases[0]
+        problems = check_invariants(tallies, _fetch_all(base, '/api/pending-memberships'),
+                                    _fetch_all(base, '/api/memberships'),
+                                    _fetch_all(base, '/api/pending-prayers'),
+                                    _fetch_all(base, '/api/prayers'))
+    finally:
+        rss = [stop_server(proc) for proc, _base in servers]
+    problems += check_files(data_dir, db_path)
+
+    writes = Counter()
+    errors = Counter()
+    for tally in tallies:
+        writes.update(tally['writes'])
+        errors.update(tally['errors'])
+    total = sum(writes.values())
+    report = {
+        'backend': args.backend, 'servers': len(servers), 'workers': args.workers,
+        'clients': args.processes * args.threads, 'seconds': round(elapsed, 2),
+        'writes': dict(writes), 'writes_per_sec': round(total / elapsed, 1) if elapsed else 0.0,
+        'errors': dict(errors), 'server_peak_rss_kb': rss, 'problems': problems,
+    }
+    print(f"{total} writes in {elapsed:.1f}s = {report['writes_per_sec']} writes/s")
+    for kind, n in sorted(writes.items()):
+        print(f'  {kind:<20}{n:>8}{n / elapsed:>10.1f}/s')
+    for kind, n in sorted(errors.items()):
+        print(f'  error {kind}: {n}')
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    if args.keep:
+        print(f'data kept in {root}', file=sys.stderr)
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    if problems:
+        print(f'\n{len(problems)} invariant(s) violated:')
+        for line in problems:
+            print('  ' + line)
+        return 1
+    print('\nall invariants hold: no lost or duplicated records, ids unique, files parse')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,92 @@
+import os
+
+# Repository root: the site's pages, the songbook PDF, data/ and uploads/ live here.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _env(name: str, default: str = '') -> str:
+    return os.getenv(name, default).strip()
+
+
 class BaseConfig:
-    """Base configuration."""
+    """Base configuration.
+
+    The site settings are read from the environment when the config object
+    is created (in ``create_app``), so a ``.env`` loaded before that applies.
+    """
     DEBUG = False
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = 'your-secret-key'
+    STATIC_WATCH_DEFAULT = '0'
+
+    def __init__(self):
+        self.SECRET_KEY = _env('SECRET_KEY') or self.SECRET_KEY
+        self.BASE_DIR = BASE_DIR
+        self.DATA_DIR = _env('DATA_DIR') or os.path.join(BASE_DIR, 'data')
+        self.UPLOAD_DIR = _env('UPLOAD_DIR') or os.path.join(BASE_DIR, 'uploads')
+        self.MAX_UPLOAD_MB = int(_env('MAX_UPLOAD_MB', '5'))
+        self.MAX_CONTENT_LENGTH = self.MAX_UPLOAD_MB * 1024 * 1024
+        # Streaming bulk imports (/upload/memberships, /upload/prayers) have their own cap
+        self.MAX_IMPORT_MB = int(_env('MAX_IMPORT_MB', '200'))
+
+        # Secrets and admin config
+        self.ADMIN_TOKEN = _env('ADMIN_TOKEN')
+        self.ADMIN_EMAILS = [e.strip().lower() for e in _env('ADMIN_EMAILS').split(',') if e.strip()]
+        self.ADMIN_USER = _env('ADMIN_USER')
+        self.ADMIN_PASS = _env('ADMIN_PASS')
+        self.GOOGLE_CLIENT_ID = _env('GOOGLE_CLIENT_ID')
+        # A local key set instead of Google's certs (offline dev, tests, benchmarks)
+        self.GOOGLE_JWKS_FILE = _env('GOOGLE_JWKS_FILE')
+
+        # Storage backend: 'journal' keeps memberships, prayers and both pending queues in
+        # append-only journals (data/<name>.jsonl, the old data/<name>.json arrays are
+        # imported on first run). 'sqlite' uses the app/db models instead; seed the
+        # database once with `python -m app.db.importer`.
+        self.STORAGE_BACKEND = _env('STORAGE_BACKEND', 'journal').lower()
+        if _env('SQLALCHEMY_DATABASE_URI'):
+            self.SQLALCHEMY_DATABASE_URI = _env('SQLALCHEMY_DATABASE_URI')
+        # Resized/WebP copies of uploads, bounded LRU on disk
+        self.DERIVATIVE_CACHE_MB = int(_env('DERIVATIVE_CACHE_MB', '256'))
+        # Servable files are rescanned every STATIC_WATCH_SECONDS (0 disables). Off by
+        # default outside development: a deploy restarts the server or sends it SIGHUP.
+        self.STATIC_WATCH_SECONDS = float(_env('STATIC_WATCH_SECONDS', self.STATIC_WATCH_DEFAULT))
+        # Background work (thumbnails, exports): JOB_WORKERS threads per process;
+        # JOB_PROCESSES > 0 moves image work to a process pool.
+        self.JOB_WORKERS = int(_env('JOB_WORKERS', '2'))
+        self.JOB_PROCESSES = int(_env('JOB_PROCESSES', '0'))
+        self.JOB_RETENTION_HOURS = int(_env('JOB_RETENTION_HOURS', '24'))
+        # Public submissions are rate limited per client IP: '<count>/<second|minute|hour|day>'
+        # or 'off'. Behind a reverse proxy set TRUSTED_PROXIES to the number of hops so the
+        # client IP comes from X-Forwarded-For.
+        self.RATE_LIMIT_PRAYER = _env('RATE_LIMIT_PRAYER', '5/minute')
+        self.RATE_LIMIT_MEMBERSHIP = _env('RATE_LIMIT_MEMBERSHIP', '3/minute')
+        self.TRUSTED_PROXIES = int(_env('TRUSTED_PROXIES', '0'))
+        # Members directory: the public Google Sheet mirrored every MEMBERS_SHEET_REFRESH
+        # seconds; MEMBERS_SHEET_FILE serves a saved GViz response instead (offline dev, tests).
+        self.MEMBERS_SHEET_URL = _env('MEMBERS_SHEET_URL')
+        self.MEMBERS_SHEET_FILE = _env('MEMBERS_SHEET_FILE')
+        self.MEMBERS_SHEET_REFRESH = float(_env('MEMBERS_SHEET_REFRESH', '300'))
+        # Admin login event log rotation
+        self.LOGIN_LOG_MAX_KB = int(_env('LOGIN_LOG_MAX_KB', '1024'))
+        self.LOGIN_LOG_MAX_DAYS = int(_env('LOGIN_LOG_MAX_DAYS', '7'))
+
+        # Prometheus metrics: per-worker files in METRICS_DIR, flushed every METRICS_FLUSH_SECONDS.
+        # With METRICS_TOKEN the scraper must send 'Authorization: Bearer <token>'; without it
+        # only loopback clients (after TRUSTED_PROXIES) may scrape.
+        self.METRICS_DIR = _env('METRICS_DIR') or os.path.join(self.DATA_DIR, 'metrics')
+        self.METRICS_TOKEN = _env('METRICS_TOKEN') or None
+        self.METRICS_FLUSH_SECONDS = float(_env('METRICS_FLUSH_SECONDS', '5'))
+        # Request profiles (newest PROFILE_KEEP) for requests taking PROFILE_SLOW_MS or more
+        # (0 turns sampling off), stack-sampled every PROFILE_INTERVAL_MS.
+        self.PROFILE_KEEP = int(_env('PROFILE_KEEP', '50'))
+        self.PROFILE_SLOW_MS = float(_env('PROFILE_SLOW_MS', '1000'))
+        self.PROFILE_INTERVAL_MS = float(_env('PROFILE_INTERVAL_MS', '10'))
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration."""
     DEBUG = True
+    STATIC_WATCH_DEFAULT = '2'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
 
 class TestingConfig(BaseConfig):
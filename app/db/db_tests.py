@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from flask import Flask
+
+from app.db.db import db
+from app.db.importer import import_json_data
+from app.db.models import Membership
+from app.db.repository import SqlStore, enable_sqlite_wal
+
+
+@pytest.fixture
+def sql_app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    db.init_app(app)
+    with app.app_context():
+        enable_sqlite_wal(db.engine)
+        db.create_all()
+        yield app
+
+
+def test_repository_roundtrip_keeps_unknown_keys(sql_app):
+    store = SqlStore()
+    rec = store.pending_members.add({'name': 'A', 'phone': '1234567890', 'children': [{'name': 'B'}], 'photo': 'p.jpg'})
+    assert store.pending_members.get(rec['id']) == rec
+    assert rec['photo'] == 'p.jpg'
+    approved = store.memberships.add(store.pending_members.remove(rec['id']))
+    assert len(store.pending_members) == 0
+    assert store.memberships.list() == [approved]
+    assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+
+
+def test_batch_move_and_remove(sql_app):
+    store = SqlStore()
+    recs = store.pending_prayers.add_many([{'ts': i, 'text': str(i)} for i in range(3)])
+    moved = store.pending_prayers.move_many([recs[0]['id'], recs[2]['id'], 99], store.prayers)
+    assert moved[99] is None and moved[recs[2]['id']]['text'] == '2'
+    assert sorted(r['text'] for r in store.prayers.list()) == ['0', '2']
+    assert store.pending_prayers.remove_many([recs[1]['id']])[recs[1]['id']]['text'] == '1'
+    assert len(store.pending_prayers) == 0
+
+
+def test_importer_is_one_shot(sql_app, tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    (data_dir / 'memberships.json').write_text(json.dumps([{'id': 3, 'name': 'x'}, {'name': 'y'}]))
+    (data_dir / 'login_logs.json').write_text(json.dumps([{'email': 'a@b.c', 'login_time': '2025-01-01T00:00:00Z'}]))
+    assert import_json_data(str(data_dir)) == {'memberships': 2, 'pending_members': 0, 'prayers': 0,
+                                              'pending_prayers': 0, 'login_logs': 1}
+    assert sorted(m.id for m in db.session.scalars(db.select(Membership))) == [3, 4]
+    assert import_json_data(str(data_dir))['memberships'] == 0
+
+
+def test_login_log_closes_by_session_and_aggregates(sql_app):
+    log = SqlStore().login_logs
+    first = log.append('A@x.com', 'A')
+    log.append('a@x.com', 'A')
+    log.close_last('a@x.com', first)
+    report = log.stats_report()
+    assert report['admins'] == [{'email': 'a@x.com', 'name': 'A', 'sessions': 2, 'closed': 1, 'open': 1,
+                                 'total_seconds': 0, 'avg_seconds': 0}]
+    assert [d['logins'] for d in report['days']] == [2]
@@ -0,0 +1,103 @@
+"""One-shot import of the flat-file data into the SQLite database.
+
+Usage:
+    python -m app.db.importer [--data-dir data] [--config development]
+
+Reads each collection from its journal (``data/<name>.jsonl``) when present and
+from the legacy ``data/<name>.json`` array otherwise. Tables that already hold
+rows are skipped, so running the importer twice does not duplicate data.
+"""
+import argparse
+import json
+import os
+
+from sqlalchemy import func, select
+
+from app.db.db import db
+from app.db.models import LoginLog, Membership, PendingMembership, PendingPrayer, Prayer
+from app.storage.journal import Journal
+
+COLLECTIONS = {
+    'memberships': Membership,
+    'pending_members': PendingMembership,
+    'prayers': Prayer,
+    'pending_prayers': PendingPrayer,
+}
+
+
+def load_collection(data_dir: str, name: str) -> list:
+    journal_path = os.path.join(data_dir, name + '.jsonl')
+    if os.path.exists(journal_path):
+        journal = Journal(journal_path)
+        try:
+            return list(journal.iter_records())
+        finally:
+            journal.close()
+    try:
+        with open(os.path.join(data_dir, name + '.json'), 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+    except Exception:
+        return []
+    return [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+
+
+def _is_empty(model) -> bool:
+    return not db.session.scalar(select(func.count()).select_from(model))
+
+
+def import_json_data(data_dir: str) -> dict:
+    """Copy every collection into its table. Must run inside an app context."""
+    counts = {}
+    for name, model in COLLECTIONS.items():
+        if not _is_empty(model):
+            counts[name] = 0
+            continue
+        seen = set()
+        kept, renumbered = [], []
+        for rec in load_collection(data_dir, name):
+            rid = rec.get('id')
+            if isinstance(rid, int) and rid > 0 and rid not in seen:
+                seen.add(rid)
+                kept.append(model.from_dict(rec, keep_id=True))
+            else:
+                renumbered.append(model.from_dict(rec))
+        # Explicit ids go in first so generated ones cannot collide with them.
+        db.session.add_all(kept)
+        db.session.flush()
+        db.session.add_all(renumbered)
+        counts[name] = len(kept) + len(renumbered)
+    if _is_empty(LoginLog):
+        try:
+            with open(os.path.join(data_dir, 'login_logs.json'), 'r', encoding='utf-8') as fh:
+                logs = json.load(fh)
+        except Exception:
+            logs = []
+        cols = {'email', 'name', 'login_time', 'logout_time', 'duration_seconds'}
+        rows = [LoginLog(**{k: v for k, v in e.items() if k in cols})
+                for e in logs if isinstance(e, dict) and e.get('login_time')]
+        db.session.add_all(rows)
+        counts['login_logs'] = len(rows)
+    else:
+        counts['login_logs'] = 0
+    db.session.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import data/*.json into the SQLite database')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV') or 'development')
+    args = parser.parse_args()
+
+    from app.app import create_app
+    from app.db.repository import create_tables
+    app = create_app(args.config)
+    with app.app_context():
+        create_tables(app)
+        counts = import_json_data(args.data_dir)
+    for name, n in counts.items():
+        print(f'{name}: {n} imported')
+
+
+if __name__ == '__main__':
+    main()
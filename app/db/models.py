@@ -0,0 +1,115 @@
+from typing import Optional
+
+from sqlalchemy import BigInteger, Boolean, Integer, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.db import db
+
+
+class RecordMixin:
+    """Shared dict conversion for models that mirror the JSON records.
+
+    Keys that have no column of their own (e.g. ``photo`` on early membership
+    records) are kept in ``extra`` so a record round-trips unchanged.
+    """
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    extra: Mapped[Optional[dict]] = mapped_column(JSON)
+
+    @classmethod
+    def columns(cls) -> list:
+        return [c.key for c in cls.__table__.columns if c.key != 'extra']
+
+    @classmethod
+    def from_dict(cls, data: dict, keep_id: bool = False):
+        cols = cls.columns()
+        values = {k: v for k, v in data.items() if k in cols and (keep_id or k != 'id')}
+        extra = {k: v for k, v in data.items() if k not in cols and k != 'id'}
+        return cls(**values, extra=extra or None)
+
+    def to_dict(self) -> dict:
+        out = {}
+        for c in self.columns():
+            value = getattr(self, c)
+            if value is not None:
+                out[c] = value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+
+class MembershipMixin(RecordMixin):
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    dob: Mapped[Optional[str]] = mapped_column(String(20))
+    phone: Mapped[Optional[str]] = mapped_column(String(20), index=True)
+    email: Mapped[Optional[str]] = mapped_column(String(254), index=True)
+    address: Mapped[Optional[str]] = mapped_column(Text)
+    baptized: Mapped[Optional[str]] = mapped_column(String(20))
+    previous_church: Mapped[Optional[str]] = mapped_column(String(200))
+    why: Mapped[Optional[str]] = mapped_column(Text)
+    birth_place: Mapped[Optional[str]] = mapped_column(String(200))
+    blood_group: Mapped[Optional[str]] = mapped_column(String(10))
+    christian_status: Mapped[Optional[str]] = mapped_column(String(50))
+    baptism_pastor: Mapped[Optional[str]] = mapped_column(String(200))
+    baptism_year: Mapped[Optional[str]] = mapped_column(String(10))
+    education: Mapped[Optional[str]] = mapped_column(String(200))
+    other_qualifications: Mapped[Optional[str]] = mapped_column(String(200))
+    occupation: Mapped[Optional[str]] = mapped_column(String(200))
+    aadhar: Mapped[Optional[str]] = mapped_column(String(12))
+    father_name: Mapped[Optional[str]] = mapped_column(String(200))
+    father_occupation: Mapped[Optional[str]] = mapped_column(String(200))
+    mother_name: Mapped[Optional[str]] = mapped_column(String(200))
+    mother_occupation: Mapped[Optional[str]] = mapped_column(String(200))
+    spouse_name: Mapped[Optional[str]] = mapped_column(String(200))
+    spouse_occupation: Mapped[Optional[str]] = mapped_column(String(200))
+    children: Mapped[Optional[list]] = mapped_column(JSON)
+    declaration: Mapped[Optional[str]] = mapped_column(String(20))
+    declaration_date: Mapped[Optional[str]] = mapped_column(String(20))
+    declaration_place: Mapped[Optional[str]] = mapped_column(String(200))
+    files: Mapped[Optional[dict]] = mapped_column(JSON)
+    timestamp: Mapped[Optional[str]] = mapped_column(String(40), index=True)
+
+
+class Membership(MembershipMixin, db.Model):
+    __tablename__ = 'memberships'
+
+
+class PendingMembership(MembershipMixin, db.Model):
+    __tablename__ = 'pending_memberships'
+
+
+class PrayerMixin(RecordMixin):
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ts: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    anon: Mapped[bool] = mapped_column(Boolean, default=False)
+    text: Mapped[Optional[str]] = mapped_column(Text)
+
+
+class Prayer(PrayerMixin, db.Model):
+    __tablename__ = 'prayers'
+
+
+class PendingPrayer(PrayerMixin, db.Model):
+    __tablename__ = 'pending_prayers'
+
+
+class LoginLog(db.Model):
+    __tablename__ = 'login_logs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    email: Mapped[str] = mapped_column(String(254), index=True)
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    login_time: Mapped[str] = mapped_column(String(40), index=True)
+    logout_time: Mapped[Optional[str]] = mapped_column(String(40))
+    duration_seconds: Mapped[Optional[int]] = mapped_column(Integer)
+
+    def to_dict(self) -> dict:
+        return {
+            'email': self.email,
+            'name': self.name,
+            'login_time': self.login_time,
+            'logout_time': self.logout_time,
+            'duration_seconds': self.duration_seconds,
+        }
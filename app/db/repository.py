@@ -0,0 +1,225 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import delete, event, func, select, tuple_
+
+from app.db.db import db
+from app.db.models import LoginLog, Membership, PendingMembership, PendingPrayer, Prayer
+
+
+def _set_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute('PRAGMA journal_mode=WAL')
+    cur.execute('PRAGMA synchronous=NORMAL')
+    cur.execute('PRAGMA busy_timeout=5000')
+    cur.close()
+
+
+def enable_sqlite_wal(engine):
+    """Put every new SQLite connection of ``engine`` into WAL mode (once per engine)."""
+    if engine.dialect.name != 'sqlite' or event.contains(engine, 'connect', _set_pragmas):
+        return
+    event.listen(engine, 'connect', _set_pragmas)
+
+
+def create_tables(app):
+    """Bind ``db`` to ``app`` if that was not done yet, enable WAL and create the tables.
+
+    Must be used inside an application context.
+    """
+    if 'sqlalchemy' not in app.extensions:
+        db.init_app(app)
+    enable_sqlite_wal(db.engine)
+    db.create_all()
+
+
+class SqlRepository:
+    """Same interface as ``app.storage.repository.Repository``, backed by a table.
+
+    Must be used inside an application context.
+    """
+
+    def __init__(self, model, order_by: str = None):
+        self.model = model
+        self.order_by = order_by
+
+    def __len__(self):
+        return db.session.scalar(select(func.count()).select_from(self.model))
+
+    def version(self) -> tuple:
+        """Cache version: table name plus the stat of the database and its WAL file."""
+        parts = [self.model.__tablename__]
+        path = db.engine.url.database
+        for p in (path, path + '-wal') if path else ():
+            try:
+                st = os.stat(p)
+                parts.extend((st.st_ino, st.st_mtime_ns, st.st_size))
+            except OSError:
+                parts.append(None)
+        return tuple(parts)
+
+    def get(self, rid: int):
+        row = db.session.get(self.model, rid)
+        return row.to_dict() if row else None
+
+    def ids(self) -> list:
+        return list(db.session.scalars(select(self.model.id)))
+
+    def iter(self):
+        stmt = select(self.model).order_by(self.model.id).execution_options(yield_per=500)
+        for row in db.session.scalars(stmt):
+            yield row.to_dict()
+
+    def iter_ordered(self, lo=None, hi=None, after=None, descending: bool = False, eq=None, chunk: int = 256):
+        """Keyset scan by ``(order column, id)`` with filters pushed into SQL."""
+        col = getattr(self.model, self.order_by)
+        key = (col.desc(), self.model.id.desc()) if descending else (col, self.model.id)
+        base = select(self.model)
+        if lo is not None:
+            base = base.where(col >= lo)
+        if hi is not None:
+            base = base.where(col <= hi)
+        for field, value in (eq or {}).items():
+            base = base.where(func.lower(getattr(self.model, field)) == value)
+        while True:
+            stmt = base
+            if after is not None:
+                value, rid = after
+                if descending:
+                    stmt = stmt.where(tuple_(col, self.model.id) < tuple_(value, rid))
+                else:
+                    stmt = stmt.where(tuple_(col, self.model.id) > tuple_(value, rid))
+            rows = db.session.scalars(stmt.order_by(*key).limit(chunk)).all()
+            for row in rows:
+                yield row.to_dict()
+            if len(rows) < chunk:
+                return
+            after = (getattr(rows[-1], self.order_by), rows[-1].id)
+
+    def list(self) -> list:
+        return [row.to_dict() for row in db.session.scalars(select(self.model).order_by(self.model.id))]
+
+    def add(self, record: dict) -> dict:
+        return self.add_many([record])[0]
+
+    def add_many(self, records: list) -> list:
+        rows = [self.model.from_dict(r) for r in records]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.to_dict() for row in rows]
+
+    def remove(self, rid: int):
+        row = db.session.get(self.model, rid)
+        if row is None:
+            return None
+        rec = row.to_dict()
+        db.session.delete(row)
+        db.session.commit()
+        return rec
+
+    def remove_many(self, ids) -> dict:
+        removed = {}
+        for rid in dict.fromkeys(ids):
+            row = db.session.get(self.model, rid)
+            removed[rid] = row.to_dict() if row else None
+            if row is not None:
+                db.session.delete(row)
+        db.session.commit()
+        return removed
+
+    def move_many(self, ids, target: 'SqlRepository') -> dict:
+        """Insert into ``target`` and delete here in a single transaction.
+
+        A row is only moved if this transaction's DELETE removed it, so two
+        workers moving the same id at once cannot both copy it.
+        """
+        moved, rows = {}, {}
+        for rid in dict.fromkeys(ids):
+            row = db.session.get(self.model, rid)
+            moved[rid] = None
+            if row is None:
+                continue
+            data = row.to_dict()
+            db.session.expunge(row)
+            if db.session.execute(delete(self.model).where(self.model.id == rid)).rowcount:
+                rows[rid] = target.model.from_dict(data)
+        db.session.add_all(rows.values())
+        db.session.commit()
+        moved.update((rid, row.to_dict()) for rid, row in rows.items())
+        return moved
+
+    def replace_all(self, records) -> list:
+        db.session.execute(delete(self.model))
+        rows = [self.model.from_dict(r) for r in records]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.to_dict() for row in rows]
+
+
+class SqlLoginLog:
+    """Admin login/logout bookkeeping stored in the ``login_logs`` table.
+
+    Same interface as ``app.storage.eventlog.LoginEventLog``; the row id is the
+    session id and the report is aggregated by SQL.
+    """
+
+    def append(self, email: str, name: str) -> str:
+        entry = LoginLog(email=email, name=name, login_time=datetime.utcnow().isoformat() + 'Z')
+        db.session.add(entry)
+        db.session.commit()
+        return str(entry.id)
+
+    def close_last(self, email: str, sid: str = None):
+        entry = None
+        if sid and str(sid).isdigit():
+            entry = db.session.get(LoginLog, int(sid))
+            if entry is not None and entry.logout_time is not None:
+                entry = None
+        if entry is None:
+            stmt = (select(LoginLog)
+                    .where(func.lower(LoginLog.email) == (email or '').lower(), LoginLog.logout_time.is_(None))
+                    .order_by(LoginLog.id.desc())
+                    .limit(1))
+            entry = db.session.scalars(stmt).first()
+        if entry is None:
+            return
+        entry.logout_time = datetime.utcnow().isoformat() + 'Z'
+        try:
+            t1 = datetime.fromisoformat(entry.login_time.replace('Z', ''))
+            t2 = datetime.fromisoformat(entry.logout_time.replace('Z', ''))
+            entry.duration_seconds = int((t2 - t1).total_seconds())
+        except Exception:
+            entry.duration_seconds = None
+        db.session.commit()
+
+    def stats_report(self, date_from: str = None, date_to: str = None) -> dict:
+        closed = func.count(LoginLog.logout_time)
+        total = func.coalesce(func.sum(LoginLog.duration_seconds), 0)
+        email = func.lower(LoginLog.email)
+        admins = []
+        rows = db.session.execute(select(email, func.max(LoginLog.name), func.count(), closed, total)
+                                  .group_by(email).order_by(email))
+        for em, name, sessions, n_closed, seconds in rows:
+            admins.append({'email': em, 'name': name or '', 'sessions': sessions, 'closed': n_closed,
+                           'open': sessions - n_closed, 'total_seconds': int(seconds),
+                           'avg_seconds': int(seconds) // n_closed if n_closed else None})
+        day = func.substr(LoginLog.login_time, 1, 10)
+        stmt = select(day, func.count(), closed, total).group_by(day).order_by(day)
+        if date_from:
+            stmt = stmt.where(day >= date_from)
+        if date_to:
+            stmt = stmt.where(day <= date_to)
+        days = [{'logins': n, 'closed': c, 'total_seconds': int(t), 'date': d}
+                for d, n, c, t in db.session.execute(stmt)]
+        return {'admins': admins, 'days': days}
+
+
+class SqlStore:
+    """SQLite counterpart of ``app.storage.repository.Store``."""
+
+    def __init__(self):
+        self.memberships = SqlRepository(Membership, order_by='timestamp')
+        self.pending_members = SqlRepository(PendingMembership, order_by='timestamp')
+        self.prayers = SqlRepository(Prayer, order_by='ts')
+        self.pending_prayers = SqlRepository(PendingPrayer, order_by='ts')
+        self.login_logs = SqlLoginLog()
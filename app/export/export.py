@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+MEMBERSHIP_FIELDS = [
+    'id', 'timestamp', 'name', 'dob', 'phone', 'email', 'address', 'baptized', 'previous_church', 'why',
+    'birth_place', 'blood_group', 'christian_status', 'baptism_pastor', 'baptism_year', 'education',
+    'other_qualifications', 'occupation', 'aadhar', 'father_name', 'father_occupation', 'mother_name',
+    'mother_occupation', 'spouse_name', 'spouse_occupation', 'children_count', 'children',
+    'declaration', 'declaration_date', 'declaration_place', 'file_familyPhoto', 'file_memberSignature',
+]
+PRAYER_FIELDS = ['id', 'ts', 'name', 'anon', 'text']
+FORMATS = ('csv', 'xlsx', 'ndjson')
+# Rows are buffered up to roughly this many bytes before a chunk is yielded.
+CHUNK_BYTES = 64 * 1024
+
+
+def _child_summary(child) -> str:
+    if not isinstance(child, dict):
+        return str(child)
+    parts = [child.get(k) for k in ('name', 'age', 'phone', 'eduocc', 'address')]
+    return ' / '.join(str(p) for p in parts if p)
+
+
+def flatten(rec: dict) -> dict:
+    """One flat row per record: ``children`` and ``files`` become plain columns."""
+    row = {k: v for k, v in rec.items() if k not in ('children', 'files')}
+    children = rec.get('children')
+    if isinstance(children, str):
+        try:
+            children = json.loads(children)
+        except ValueError:
+            children = [children] if children else []
+    children = children if isinstance(children, list) else []
+    row['children_count'] = len(children)
+    row['children'] = ' | '.join(_child_summary(c) for c in children)
+    files = rec.get('files') if isinstance(rec.get('files'), dict) else {}
+    if rec.get('photo') and 'familyPhoto' not in files:
+        files = dict(files, familyPhoto=rec['photo'])
+    for key, name in files.items():
+        row['file_' + key] = '/uploads/' + name if name else ''
+    return row
+
+
+def _excel_safe(value: str) -> str:
+    # Spreadsheet apps treat these prefixes as formulas; force text instead.
+    if value and value[0] in '=+-@\t\r':
+        return "'" + value
+    return value
+
+
+def _cell(value, excel: bool) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        text = 'yes' if value else 'no'
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value, ensure_ascii=False)
+    else:
+        text = str(value)
+    return _excel_safe(text) if excel else text
+
+
+def stream_csv(records, fields: list, excel: bool = False):
+    """Yield CSV text in ~64 KB chunks; memory use does not grow with the record count.
+
+    ``excel`` adds a UTF-8 BOM, CRLF line endings and formula escaping so the
+    file opens cleanly (including Telugu text) in Excel.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\r\n' if excel else '\n')
+    if excel:
+        buf.write('\ufeff')
+    writer.writerow(fields)
+    for rec in records:
+        row = flatten(rec)
+        writer.writerow([_cell(row.get(f), excel) for f in fields])
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def stream_ndjson(records, fields: list = None):
+    """Yield one JSON object per line, keeping nested ``children``/``files`` intact."""
+    buf = []
+    size = 0
+    for rec in records:
+        if fields:
+            rec = {f: rec.get(f) for f in fields}
+        line = json.dumps(rec, ensure_ascii=False) + '\n'
+        buf.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(buf)
+            buf, size = [], 0
+    yield ''.join(buf)
@@ -0,0 +1,52 @@
+import csv
+import io
+
+from app.export.export import flatten, stream_csv, stream_ndjson
+
+
+def test_flatten_children_and_files():
+    row = flatten({'id': 1, 'children': [{'name': 'Ruth', 'age': '7'}, {'name': 'Eli'}],
+                   'files': {'familyPhoto': 'a.png'}})
+    assert row['children_count'] == 2
+    assert row['children'] == 'Ruth / 7 | Eli'
+    assert row['file_familyPhoto'] == '/uploads/a.png'
+
+
+def test_stream_csv_chunks_and_excel_escaping():
+    records = ({'id': i, 'name': '=cmd' if i == 0 else f'n{i}'} for i in range(20000))
+    chunks = list(stream_csv(records, ['id', 'name'], excel=True))
+    assert len(chunks) > 1
+    text = ''.join(chunks)
+    assert text.startswith('\ufeffid,name\r\n')
+    rows = list(csv.reader(io.StringIO(text.lstrip('\ufeff'))))
+    assert rows[1] == ['0', "'=cmd"]
+    assert len(rows) == 20001
+
+
+def test_stream_ndjson_projection():
+    out = ''.join(stream_ndjson([{'id': 1, 'name': 'A', 'phone': 'x'}], ['id', 'name']))
+    assert out == '{"id": 1, "name": "A"}\n'
+
+
+def test_prayer_export_is_bounded_by_ts(monkeypatch, tmp_path):
+    import json
+    from datetime import datetime
+
+    from app.app import create_app
+
+    for key, value in {'DATA_DIR': str(tmp_path / 'data'), 'UPLOAD_DIR': str(tmp_path / 'uploads'),
+                       'STATIC_WATCH_SECONDS': '0', 'MEMBERS_SHEET_REFRESH': '0',
+                       'METRICS_FLUSH_SECONDS': '0', 'ADMIN_TOKEN': 'tok'}.items():
+        monkeypatch.setenv(key, value)
+    app = create_app('testing')
+    client = app.test_client()
+    headers = {'X-Admin-Token': 'tok'}
+    day = lambda d: datetime(2025, 1, d, 12).timestamp()  # noqa: E731
+    prayers = [{'ts': day(1), 'text': 'a'}, {'ts': day(2) * 1000, 'text': 'b'}, {'ts': day(3), 'text': 'c'}]
+    try:
+        client.post('/upload/prayers', headers=headers, json=prayers)
+        resp = client.get('/export/prayers?format=ndjson&from=2025-01-02&to=2025-01-03', headers=headers)
+        assert sorted(json.loads(line)['text'] for line in resp.get_data(as_text=True).splitlines()) == ['b', 'c']
+        assert client.get('/export/prayers?from=soon', headers=headers).status_code == 400
+    finally:
+        app.extensions['site'].stop()
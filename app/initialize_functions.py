@@ -1,20 +1,85 @@
-from flask import Flask
-from flasgger import Swagger
+import os
+
+from flask import Flask, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app.metrics.middleware import install as install_metrics
+from app.metrics.registry import Registry
+from app.modules.admin.route import admin_bp
+from app.modules.auth.route import auth_bp
+from app.modules.content.route import content_bp
+from app.modules.exports.route import exports_bp
 from app.modules.main.route import main_bp
-from app.db.db import db
+from app.modules.memberships.route import memberships_bp
+from app.modules.pages.route import pages_bp
+from app.modules.prayers.route import prayers_bp
+from app.modules.uploads.route import uploads_bp
+from app.profiling.profiler import ProfileRing, SamplingProfiler, install as install_profiler
+from app.site.docs import LazyDocs
+from app.site.helpers import is_admin_request
+from app.site.site import Site
+
+
+def initialize_site(app: Flask) -> Site:
+    """Attach the (lazily built) site services; background work starts with each process's first request."""
+    site = app.extensions['site'] = Site(app)
+    app.before_request(site.start)
+    return site
 
 
 def initialize_route(app: Flask):
     with app.app_context():
         app.register_blueprint(main_bp, url_prefix='/api/v1/main')
+        for bp in (auth_bp, admin_bp, prayers_bp, memberships_bp, uploads_bp, exports_bp, content_bp):
+            app.register_blueprint(bp)
+        # Last: its /<path:filename> catch-all serves the site's pages and static files.
+        app.register_blueprint(pages_bp)
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_file_too_large(e):
+        return jsonify(success=False, message=f"File too large. Limit is {app.config['MAX_UPLOAD_MB']} MB"), 413
 
 
 def initialize_db(app: Flask):
-    with app.app_context():
-        db.init_app(app)
-        db.create_all()
+    """Bind SQLAlchemy when the sqlite backend is used; tables are created on first use."""
+    if app.config.get('STORAGE_BACKEND') != 'sqlite':
+        return
+    from app.db.db import db
+    db.init_app(app)
+
 
 def initialize_swagger(app: Flask):
-    with app.app_context():
-        swagger = Swagger(app)
-        return swagger
\ No newline at end of file
+    # Swagger UI at /apidocs, set up on its first request.
+    app.wsgi_app = LazyDocs(app, app.wsgi_app)
+    return app.wsgi_app
+
+
+def initialize_proxy(app: Flask):
+    # Behind a reverse proxy the client IP and scheme come from TRUSTED_PROXIES hops of X-Forwarded-*.
+    hops = app.config.get('TRUSTED_PROXIES', 0)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+
+def initialize_metrics(app: Flask):
+    registry = Registry(app.config.get('METRICS_DIR') or os.path.join(app.instance_path, 'metrics'))
+    install_metrics(app, registry, token=app.config.get('METRICS_TOKEN'))
+    app.extensions['site'].metrics = registry
+    return registry
+
+
+def initialize_profiler(app: Flask):
+    # Slow requests (or an admin's 'X-Profile: 1') are profiled into data/profiles/.
+    ring = ProfileRing(os.path.join(app.config['DATA_DIR'], 'profiles'), keep=app.config['PROFILE_KEEP'])
+    profiler = SamplingProfiler(ring, threshold=app.config['PROFILE_SLOW_MS'] / 1000,
+                                interval=app.config['PROFILE_INTERVAL_MS'] / 1000)
+    install_profiler(app, profiler, allow=is_admin_request)
+    app.extensions['site'].profiler = profiler
+    return profiler
+
+
+def warm(app: Flask) -> Flask:
+    """Build the shared site data now (call before gunicorn forks its workers)."""
+    app.extensions['site'].warm()
+    return app
@@ -0,0 +1,89 @@
+import socket
+import threading
+import time
+
+from app.jobs.queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+def _double(n):
+    return n * 2
+
+
+def test_submit_run_and_failure(tmp_path):
+    q = JobQueue(str(tmp_path / 'jobs.jsonl'))
+    q.register('double', _double)
+    q.register('boom', lambda: 1 / 0)
+    ok = q.submit('double', n=21)
+    bad = q.submit('boom')
+    assert q.get(ok['id'])['status'] == QUEUED
+    assert q.run_pending() == 2
+    assert (q.get(ok['id'])['status'], q.get(ok['id'])['result']) == (DONE, 42)
+    assert q.get(bad['id'])['status'] == FAILED and 'division' in q.get(bad['id'])['error']
+
+
+def test_jobs_run_once_across_queues_and_threads(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    ran = []
+    lock = threading.Lock()
+
+    def record(i):
+        with lock:
+            ran.append(i)
+    queues = [JobQueue(path, workers=2, poll_interval=0.05) for _ in range(2)]
+    for q in queues:
+        q.register('record', record)
+    for i in range(40):
+        queues[i % 2].submit('record', i=i)
+    for q in queues:
+        q.start()
+    try:
+        for _ in range(200):
+            if len(ran) == 40 and all(r['status'] == DONE for r in queues[0].journal.iter_records()):
+                break
+            threading.Event().wait(0.05)
+    finally:
+        for q in queues:
+            q.stop()
+    assert sorted(ran) == list(range(40))
+
+
+def test_recover_requeues_jobs_of_dead_workers(tmp_path):
+    q = JobQueue(str(tmp_path / 'jobs.jsonl'))
+    q.register('double', _double)
+    job = q.submit('double', n=1)
+    q._update(job['id'], QUEUED, status=RUNNING, owner=f'{socket.gethostname()}:999999999', attempts=1)
+    q.recover()
+    assert q.get(job['id'])['status'] == QUEUED
+    q.run_pending()
+    assert q.get(job['id'])['result'] == 2
+
+
+def test_jobs_of_other_hosts_are_recovered_once_their_lease_expires(tmp_path):
+    q = JobQueue(str(tmp_path / 'jobs.jsonl'), lease_seconds=30)
+    q.register('double', _double)
+    fresh, stale = q.submit('double', n=1), q.submit('double', n=2)
+    # The old container of a recreated deployment had a different hostname.
+    for job, beat in ((fresh, time.time() - 5), (stale, time.time() - 31)):
+        q._update(job['id'], QUEUED, status=RUNNING, owner='old-container:7', heartbeat=beat, attempts=1)
+    q.recover()
+    assert (q.get(fresh['id'])['status'], q.get(stale['id'])['status']) == (RUNNING, QUEUED)
+
+
+def test_heartbeat_renews_the_lease_of_running_jobs(tmp_path):
+    q = JobQueue(str(tmp_path / 'jobs.jsonl'), lease_seconds=30)
+    q.register('double', _double)
+    q.submit('double', n=1)
+    job = q._claim()
+    q._update(job['id'], RUNNING, heartbeat=time.time() - 100)
+    q._running.add(job['id'])
+    q.heartbeat()
+    assert time.time() - q.get(job['id'])['heartbeat'] < 5
+
+
+def test_process_pool_handler(tmp_path):
+    q = JobQueue(str(tmp_path / 'jobs.jsonl'), processes=1)
+    q.register('double', _double, process=True)
+    job = q.submit('double', n=5)
+    q.run_pending()
+    q.stop()
+    assert q.get(job['id'])['result'] == 10
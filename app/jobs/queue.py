@@ -0,0 +1,237 @@
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from app.storage.journal import Journal
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+# A job whose worker process died is retried this many times before it is failed.
+MAX_ATTEMPTS = 3
+# Running jobs carry a heartbeat renewed every third of this; a job owned by another
+# host (or a container since recreated under a new hostname) whose heartbeat is older
+# than this is taken to be orphaned.
+LEASE_SECONDS = 60
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + 'Z'
+
+
+def _owner() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _owner_alive(owner: str, heartbeat=None, lease: float = LEASE_SECONDS) -> bool:
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        # Another machine: we cannot see its processes, only whether it keeps renewing the lease.
+        return isinstance(heartbeat, (int, float)) and time.time() - heartbeat < lease
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """Durable in-process job queue on top of a ``Journal``.
+
+    ``submit`` is one journal append; worker threads claim queued jobs with an
+    atomic ``queued -> running`` commit, so several gunicorn workers can share
+    one queue file without running a job twice. Handlers registered with
+    ``process=True`` run in a process pool (CPU-heavy work such as image
+    resizing); the rest run on the worker thread. Running jobs hold a lease
+    their process renews every ``lease_seconds / 3``; jobs left ``running`` by
+    a dead process, or by another host whose lease ran out, are requeued. Finished
+    jobs are dropped after ``retention_seconds``.
+    """
+
+    def __init__(self, path: str, workers: int = 2, processes: int = 0, retention_seconds: int = 86400,
+                 poll_interval: float = 1.0, lease_seconds: float = LEASE_SECONDS):
+        self.journal = Journal(path)
+        self.workers = workers
+        self.processes = processes
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.handlers = {}
+        self._running = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pool = None
+        self._idle_version = None
+        self._last_prune = 0.0
+
+    def register(self, kind: str, fn, process: bool = False):
+        """``fn(**args)`` returns a JSON-serializable result; ``process`` needs a module-level ``fn``."""
+        self.handlers[kind] = (fn, process and self.processes > 0)
+
+    def submit(self, kind: str, **args) -> dict:
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job = {'kind': kind, 'args': args, 'status': QUEUED, 'attempts': 0, 'created': _now()}
+
+        def build(journal):
+            rec = dict(job, id=journal.next_id())
+            return [('put', rec['id'], rec)], rec
+        rec = self.journal.commit(build)
+        self._wake.set()
+        return rec
+
+    def get(self, job_id: int):
+        return self.journal.get(job_id)
+
+    def _update(self, job_id: int, expect: str, **changes):
+        """Apply ``changes`` if the job is still in status ``expect``; returns the new record or None."""
+        def build(journal):
+            rec = journal.get(job_id)
+            if rec is None or rec.get('status') != expect:
+                return [], None
+            rec = dict(rec, **changes)
+            return [('put', job_id, rec)], rec
+        return self.journal.commit(build)
+
+    def _claim(self):
+        version = self.journal.version()
+        if version == self._idle_version:
+            return None
+        for rec in self.journal.iter_records():
+            if rec.get('status') != QUEUED:
+                continue
+            job = self._update(rec['id'], QUEUED, status=RUNNING, owner=_owner(), started=_now(),
+                               heartbeat=time.time(), attempts=rec.get('attempts', 0) + 1)
+            if job is not None:
+                return job
+        # Nothing to do until the file changes again.
+        self._idle_version = version
+        return None
+
+    def _run(self, job: dict):
+        fn, in_process = self.handlers.get(job['kind'], (None, False))
+        self._running.add(job['id'])
+        try:
+            if fn is None:
+                raise ValueError(f'Unknown job kind: {job["kind"]}')
+            if in_process:
+                result = self._process_pool().submit(fn, **job['args']).result()
+            else:
+                result = fn(**job['args'])
+        except Exception as e:
+            log.exception('job %s (%s) failed', job['id'], job['kind'])
+            self._update(job['id'], RUNNING, status=FAILED, error=str(e), finished=_now())
+        else:
+            self._update(job['id'], RUNNING, status=DONE, result=result, finished=_now())
+        finally:
+            self._running.discard(job['id'])
+
+    def _process_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._pool
+
+    def run_pending(self) -> int:
+        """Run queued jobs on the calling thread until none are left; returns how many ran."""
+        n = 0
+        while True:
+            job = self._claim()
+            if job is None:
+                return n
+            self._run(job)
+            n += 1
+
+    def heartbeat(self):
+        """Renew the lease of every job this process is running, in one append."""
+        ids = list(self._running)
+        if not ids:
+            return
+        owner, now = _owner(), time.time()
+
+        def build(journal):
+            ops = []
+            for job_id in ids:
+                rec = journal.get(job_id)
+                if rec is not None and rec.get('status') == RUNNING and rec.get('owner') == owner:
+                    ops.append(('put', job_id, dict(rec, heartbeat=now)))
+            return ops, None
+        self.journal.commit(build)
+
+    def recover(self):
+        """Requeue (or fail, after ``MAX_ATTEMPTS``) jobs whose worker process is gone or whose lease expired."""
+        for rec in self.journal.iter_records():
+            if (rec.get('status') != RUNNING
+                    or _owner_alive(rec.get('owner'), rec.get('heartbeat'), self.lease_seconds)):
+                continue
+            if rec.get('attempts', 0) >= MAX_ATTEMPTS:
+                self._update(rec['id'], RUNNING, status=FAILED, error='worker died', finished=_now())
+            else:
+                self._update(rec['id'], RUNNING, status=QUEUED, owner=None)
+
+    def prune(self):
+        """Delete finished jobs older than ``retention_seconds``."""
+        cutoff = datetime.utcnow().timestamp() - self.retention_seconds
+
+        def build(journal):
+            ops = []
+            for rid in journal.ids():
+                rec = journal.get(rid)
+                finished = rec.get('finished') if rec else None
+                if finished and datetime.fromisoformat(finished.rstrip('Z')).timestamp() < cutoff:
+                    ops.append(('del', rid, None))
+            return ops, len(ops)
+        return self.journal.commit(build)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._last_prune > 600:
+                    self._last_prune = time.monotonic()
+                    self.prune()
+                job = self._claim()
+            except Exception:
+                log.exception('job queue poll failed')
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(job)
+            # Another job may be waiting; let the next _claim rescan.
+            self._idle_version = None
+
+    def _lease_loop(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.heartbeat()
+                self.recover()
+            except Exception:
+                log.exception('job lease renewal failed')
+
+    def start(self):
+        """Recover orphaned jobs and start the worker threads and the lease thread (idempotent)."""
+        if self._threads:
+            return
+        self.recover()
+        targets = [(self._loop, f'job-worker-{i}') for i in range(self.workers)]
+        for target, name in targets + [(self._lease_loop, 'job-lease')]:
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,93 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+# Rows for buckets that have been full this long are deleted.
+IDLE_SECONDS = 86400
+
+
+def parse_rate(spec: str):
+    """``'5/minute'`` -> ``(5, 60)``; ``''``, ``'0'`` or ``'off'`` -> None (no limit)."""
+    spec = (spec or '').strip().lower()
+    if spec in ('', '0', 'off', 'none'):
+        return None
+    count, _, period = spec.partition('/')
+    period = period.rstrip('s') or 'second'
+    if period not in _PERIODS or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f'Bad rate limit {spec!r}; expected e.g. 5/minute')
+    return int(count), _PERIODS[period]
+
+
+class TokenBucketLimiter:
+    """Token buckets shared by every worker process through one SQLite file.
+
+    A bucket holds up to ``count`` tokens and refills at ``count/period`` per
+    second, so short bursts are fine but the sustained rate is capped. Each
+    ``hit`` is a single ``BEGIN IMMEDIATE`` read-modify-write, which serializes
+    gunicorn workers on the file without a separate lock. If the file cannot
+    be used the limiter lets the request through rather than failing it.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        self._last_prune = 0.0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, count: int, period: int, cost: float = 1.0):
+        """Take ``cost`` tokens from ``key``'s bucket.
+
+        Returns ``(allowed, retry_after_seconds)``; ``retry_after`` is 0 when allowed.
+        """
+        rate = count / period
+        now = self.clock()
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = count if row is None else min(count, row[0] + max(0.0, now - row[1]) * rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                             (key, tokens, now))
+                if now - self._last_prune > 600:
+                    self._last_prune = now
+                    conn.execute('DELETE FROM buckets WHERE updated < ?', (now - IDLE_SECONDS,))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            log.exception('rate limiter unavailable; letting request through')
+            return True, 0
+        if allowed:
+            return True, 0
+        return False, max(1, math.ceil((cost - tokens) / rate))
+
+    def reset(self, key: str = None):
+        with self._conn() as conn:
+            if key is None:
+                conn.execute('DELETE FROM buckets')
+            else:
+                conn.execute('DELETE FROM buckets WHERE key = ?', (key,))
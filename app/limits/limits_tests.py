@@ -0,0 +1,31 @@
+import pytest
+
+from app.limits.limiter import TokenBucketLimiter, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate('5/minute') == (5, 60)
+    assert parse_rate('100/hours') == (100, 3600)
+    assert parse_rate('off') is None and parse_rate('') is None
+    with pytest.raises(ValueError):
+        parse_rate('5/fortnight')
+
+
+def test_bucket_bursts_then_refills(tmp_path):
+    now = [1000.0]
+    limiter = TokenBucketLimiter(str(tmp_path / 'rl.sqlite3'), clock=lambda: now[0])
+    assert all(limiter.hit('prayer:1.2.3.4', 3, 60)[0] for _ in range(3))
+    assert limiter.hit('prayer:1.2.3.4', 3, 60) == (False, 20)
+    assert limiter.hit('prayer:5.6.7.8', 3, 60)[0]
+    now[0] += 20
+    assert limiter.hit('prayer:1.2.3.4', 3, 60)[0]
+    assert not limiter.hit('prayer:1.2.3.4', 3, 60)[0]
+
+
+def test_buckets_shared_between_limiters(tmp_path):
+    path = str(tmp_path / 'rl.sqlite3')
+    a, b = TokenBucketLimiter(path), TokenBucketLimiter(path)
+    assert a.hit('k', 2, 3600)[0] and b.hit('k', 2, 3600)[0]
+    assert not a.hit('k', 2, 3600)[0]
+    a.reset('k')
+    assert b.hit('k', 2, 3600)[0]
@@ -0,0 +1,174 @@
+import hashlib
+import io
+import os
+import threading
+
+from app.storage.files import atomic_write_bytes
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing: ?w= falls back to the original file
+    Image = ImageOps = None
+
+# Requested widths snap up to one of these so the cache holds a few files per image.
+WIDTHS = (160, 320, 640, 1280)
+IMAGE_EXT = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+MIMETYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+QUALITY = {'webp': 80, 'jpeg': 82}
+
+
+def snap_width(width: int) -> int:
+    for w in WIDTHS:
+        if width <= w:
+            return w
+    return WIDTHS[-1]
+
+
+def pick_format(requested: str, accept: str, src_ext: str) -> str:
+    """``requested`` (?format=) wins, then WebP if the client accepts it, else a
+    format close to the source (PNG keeps transparency, everything else JPEG)."""
+    requested = (requested or '').lower().replace('jpg', 'jpeg')
+    if requested in MIMETYPES:
+        return requested
+    if 'image/webp' in (accept or ''):
+        return 'webp'
+    return 'png' if src_ext.lower() in ('png', 'gif') else 'jpeg'
+
+
+def render(src_path: str, width: int, fmt: str) -> bytes:
+    """Resize ``src_path`` to at most ``width`` px wide and encode it as ``fmt``.
+
+    The image is rotated according to its EXIF orientation and saved without
+    EXIF, so camera and location metadata never reaches the browser.
+    """
+    with Image.open(src_path) as img:
+        # JPEG can decode straight to a reduced scale, which is much cheaper.
+        img.draft('RGB', (width, width * 4))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((width, width * 4), Image.LANCZOS)
+        if fmt == 'jpeg':
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGBA')
+                bg = Image.new('RGB', img.size, (255, 255, 255))
+                bg.paste(img, mask=img.getchannel('A'))
+                img = bg
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+        elif img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        out = io.BytesIO()
+        opts = {'optimize': True}
+        if fmt in QUALITY:
+            opts['quality'] = QUALITY[fmt]
+        if fmt == 'jpeg':
+            opts['progressive'] = True
+        elif fmt == 'webp':
+            opts['method'] = 4
+        img.save(out, format=fmt.upper(), **opts)
+        return out.getvalue()
+
+
+class DerivativeCache:
+    """Resized/re-encoded copies of uploads kept under ``root``, bounded by size.
+
+    Derivatives are keyed by the source content: a blob's hash, or for other
+    files a hash of path, mtime and size, so a replaced file never serves a
+    stale thumbnail. When the cache grows past ``max_bytes`` the least
+    recently used files are removed. ``warm`` pre-renders the common sizes
+    (run from the job queue right after an upload).
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._locks = {}
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._size = sum(size for _path, size, _atime in self._files())
+
+    @staticmethod
+    def source_key(src_path: str) -> str:
+        stem = os.path.basename(src_path).rsplit('.', 1)[0]
+        if len(stem) == 64 and all(c in '0123456789abcdef' for c in stem):
+            return stem  # content-addressed blob
+        st = os.stat(src_path)
+        raw = f'{os.path.abspath(src_path)}:{st.st_mtime_ns}:{st.st_size}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, width: int, fmt: str) -> str:
+        return os.path.join(self.root, key[:2], f'{key}-w{width}.{fmt}')
+
+    def get(self, src_path: str, width: int, fmt: str) -> str:
+        """Path of the derivative, rendering it now if it is not cached yet."""
+        width = snap_width(width)
+        path = self.path_for(self.source_key(src_path), width, fmt)
+        with self._guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+        try:
+            with lock:
+                if os.path.exists(path):
+                    try:
+                        os.utime(path)  # mark as recently used
+                    except OSError:
+                        pass
+                    return path
+                data = render(src_path, width, fmt)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write_bytes(path, data)
+        finally:
+            with self._guard:
+                self._locks.pop(path, None)
+        with self._guard:
+            self._size += len(data)
+            over = self._size > self.max_bytes
+        if over:
+            self.prune(keep=path)
+        return path
+
+    def _files(self):
+        for dirpath, _dirs, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.tmp') or name.endswith('.lock'):
+                    continue
+                p = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(p)
+                except FileNotFoundError:
+                    continue
+                yield p, st.st_size, st.st_mtime
+
+    def prune(self, keep: str = None):
+        """Drop least recently used derivatives until the cache is at 90% of its bound."""
+        files = sorted((f for f in self._files() if f[0] != keep), key=lambda f: f[2])
+        total = sum(f[1] for f in files)
+        if keep and os.path.exists(keep):
+            total += os.path.getsize(keep)
+        target = self.max_bytes * 0.9
+        for path, size, _mtime in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        with self._guard:
+            self._size = total
+
+    def warm(self, src_path: str, fmts=('webp',)) -> int:
+        """Render every standard width of ``src_path``; returns how many were rendered."""
+        if Image is None or src_path.rsplit('.', 1)[-1].lower() not in IMAGE_EXT:
+            return 0
+        n = 0
+        for fmt in fmts:
+            for width in WIDTHS:
+                self.get(src_path, width, fmt)
+                n += 1
+        return n
+
+
+def warm_derivatives(root: str, max_bytes: int, src_path: str = None, src_paths=()) -> dict:
+    """Job handler: pre-render the standard sizes of new uploads (safe to run in a subprocess)."""
+    cache = DerivativeCache(root, max_bytes=max_bytes)
+    paths = list(src_paths) + ([src_path] if src_path else [])
+    return {'rendered': sum(cache.warm(path) for path in paths)}
@@ -0,0 +1,43 @@
+import os
+
+from PIL import Image
+
+from app.media.derivatives import DerivativeCache, pick_format, snap_width
+
+
+def _jpeg_with_exif(path, size=(900, 600)):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90 degrees when displayed
+    exif[0x010F] = 'PhoneMaker'
+    Image.new('RGB', size, (200, 30, 30)).save(path, 'JPEG', exif=exif)
+
+
+def test_derivative_is_resized_rotated_and_stripped(tmp_path):
+    src = str(tmp_path / 'photo.jpg')
+    _jpeg_with_exif(src)
+    cache = DerivativeCache(str(tmp_path / 'cache'))
+    path = cache.get(src, 150, 'webp')
+    assert path.endswith('-w160.webp')
+    with Image.open(path) as out:
+        assert out.format == 'WEBP'
+        assert out.size == (160, 240)  # portrait after applying the orientation
+        assert not out.getexif()
+    assert cache.get(src, 160, 'webp') == path
+
+
+def test_cache_is_bounded_and_keeps_the_newest(tmp_path):
+    cache = DerivativeCache(str(tmp_path / 'cache'), max_bytes=1)
+    for i in range(3):
+        src = str(tmp_path / f'p{i}.png')
+        Image.new('RGB', (400, 300), (i * 60, 0, 0)).save(src)
+        last = cache.get(src, 320, 'png')
+    remaining = [p for _d, _s, names in os.walk(cache.root) for p in names]
+    assert remaining == [os.path.basename(last)]
+
+
+def test_format_and_width_negotiation():
+    assert snap_width(1) == 160 and snap_width(321) == 640 and snap_width(10 ** 6) == 1280
+    assert pick_format(None, 'image/avif,image/webp,*/*', 'jpg') == 'webp'
+    assert pick_format('jpg', 'image/webp', 'png') == 'jpeg'
+    assert pick_format('', '*/*', 'png') == 'png'
+    assert pick_format('', '', 'jpeg') == 'jpeg'
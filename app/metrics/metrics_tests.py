@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from flask import Flask, jsonify
+
+from app.metrics import probe
+from app.metrics.middleware import install
+from app.metrics.registry import Registry
+from app.storage.files import atomic_write_json, load_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample(text, line_start):
+    """Value of the exposition line starting with ``line_start`` (None if absent)."""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_workers_summed_and_exited_counters_kept(tmp_path):
+    directory = str(tmp_path)
+    worker = textwrap.dedent(f'''
+        from app.metrics.registry import Registry
+        reg = Registry({directory!r})
+        reg.counter('jobs_total', 'Jobs', ('kind',)).inc(('export',), 3)
+        reg.gauge('busy', 'Busy').set(7)
+        reg.histogram('wait_seconds', 'Wait', buckets=(0.1, 1.0)).observe(0.5)
+        reg.flush()
+    ''')
+    subprocess.run([sys.executable, '-c', worker], cwd=BASE_DIR, check=True)
+    reg = Registry(directory)
+    jobs = reg.counter('jobs_total', 'Jobs', ('kind',))
+    reg.gauge('busy', 'Busy').set(2)
+    wait = reg.histogram('wait_seconds', 'Wait', buckets=(0.1, 1.0))
+    jobs.inc(('export',))
+    wait.observe(0.05)
+    wait.observe(4)
+
+    text = reg.render()
+    assert sample(text, 'jobs_total{kind="export"}') == 4
+    assert sample(text, 'busy') == 2  # the exited worker's gauge is dropped
+    assert sample(text, 'wait_seconds_bucket{le="0.1"}') == 1
+    assert sample(text, 'wait_seconds_bucket{le="1.0"}') == 2
+    assert sample(text, 'wait_seconds_bucket{le="+Inf"}') == 3
+    assert sample(text, 'wait_seconds_sum') == 4.55
+    assert sorted(os.listdir(directory)) == ['metrics-%d.json' % os.getpid(), 'metrics-exited.json',
+                                             'metrics-exited.json.lock']
+    # Folded once: scraping again does not count the exited worker twice.
+    assert sample(reg.render(), 'jobs_total{kind="export"}') == 4
+
+
+def test_middleware_records_endpoints_and_storage(tmp_path):
+    app = Flask(__name__)
+
+    @app.route('/items/<int:n>', methods=['GET', 'POST'])
+    def item(n):
+        atomic_write_json(str(tmp_path / 'item.json'), {'n': n})
+        return jsonify(load_json(str(tmp_path / 'item.json')))
+
+    @app.route('/boom')
+    def boom():
+        return jsonify(success=False), 500
+
+    reg = Registry(str(tmp_path / 'metrics'))
+    install(app, reg, token='s3cret')
+    try:
+        client = app.test_client()
+        for method, path, status in (('GET', '/items/1', 200), ('POST', '/items/2', 200), ('GET', '/boom', 500),
+                                     ('GET', '/nope', 404), ('GET', '/metrics', 401)):
+            # Reading the body finishes the request, as a server would.
+            resp = client.open(path, method=method, data=b'x' * 600 if method == 'POST' else None)
+            assert resp.status_code == status and resp.data
+        resp = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    finally:
+        probe.set_sink(None)
+    text = resp.get_data(as_text=True)
+    assert resp.content_type.startswith('text/plain; version=0.0.4')
+    assert sample(text, 'cabc_http_requests_total{endpoint="item",method="GET",status="200"}') == 1
+    assert sample(text, 'cabc_http_requests_total{endpoint="item",method="POST",status="200"}') == 1
+    assert sample(text, 'cabc_http_requests_total{endpoint="boom",method="GET",status="500"}') == 1
+    assert sample(text, 'cabc_http_requests_total{endpoint="unmatched",method="GET",status="404"}') == 1
+    assert sample(text, 'cabc_http_requests_total{endpoint="metrics",method="GET",status="401"}') == 1
+    assert sample(text, 'cabc_http_request_duration_seconds_count{endpoint="item",method="GET"}') == 1
+    assert sample(text, 'cabc_http_request_size_bytes_bucket{endpoint="item",le="512"}') == 1
+    assert sample(text, 'cabc_http_request_size_bytes_sum{endpoint="item"}') == 600
+    assert sample(text, 'cabc_http_response_size_bytes_sum{endpoint="item"}') == len(b'{"n":1}\n') + len(b'{"n":2}\n')
+    # Only the scrape itself is still running.
+    assert sample(text, 'cabc_http_requests_in_flight') == 1
+    for op in ('json_dump', 'json_load', 'file_save'):
+        assert sample(text, f'cabc_storage_seconds_count{{op="{op}"}}') == 2
+
+
+def test_scrape_without_a_token_is_local_only(tmp_path):
+    app = Flask(__name__)
+    install(app, Registry(str(tmp_path / 'metrics')))
+    try:
+        client = app.test_client()
+        assert client.get('/metrics').status_code == 200
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': '::1'}).status_code == 200
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 403
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.3'}).status_code == 403
+    finally:
+        probe.set_sink(None)
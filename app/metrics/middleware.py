@@ -0,0 +1,150 @@
+import hmac
+import ipaddress
+import time
+
+from flask import Response, request
+
+from app.metrics import probe
+from app.metrics.registry import CONTENT_TYPE, SIZE_BUCKETS, Registry
+
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+# Storage operations timed by app.metrics.probe
+STORAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def flask_endpoint(environ) -> str:
+    """The endpoint Flask routed the request to, or 'unmatched' (404s, 405s, errors before routing).
+
+    Werkzeug keeps the request object in the environ and Flask sets its
+    ``url_rule`` when the URL matches, so no request hook is needed. Flask
+    drops the reference when the request context ends, so this has to be
+    called while the response is being started.
+    """
+    req = environ.get('werkzeug.request')
+    rule = getattr(req, 'url_rule', None)
+    return rule.endpoint if rule is not None else 'unmatched'
+
+
+class _Body:
+    """Passes the response through, counting bytes, and reports once it is done or closed."""
+
+    def __init__(self, body, done):
+        self._body = body
+        self._done = done
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self.size += len(chunk)
+            yield chunk
+        self._done(self.size)
+
+    def close(self):
+        try:
+            close = getattr(self._body, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._done(self.size)
+
+
+class MetricsMiddleware:
+    """WSGI middleware recording per-endpoint latency, status codes, in-flight count and sizes.
+
+    Latency runs from the call until the response body has been sent (or
+    the server closes it). Endpoints, not paths, label the samples so
+    ``/uploads/<name>`` stays one series. Request size is the declared
+    Content-Length; response size is the bytes actually sent, or the
+    Content-Length of ``wsgi.file_wrapper`` responses, which are passed
+    through untouched (so gunicorn can still sendfile them) and are timed
+    up to the headers.
+    """
+
+    def __init__(self, app, registry: Registry, endpoint=flask_endpoint):
+        self.app = app
+        self.endpoint = endpoint
+        self.requests = registry.counter(
+            'cabc_http_requests_total', 'HTTP requests by endpoint, method and status code',
+            ('endpoint', 'method', 'status'))
+        self.duration = registry.histogram(
+            'cabc_http_request_duration_seconds', 'Time from receiving a request to sending the last byte',
+            ('endpoint', 'method'))
+        self.in_flight = registry.gauge('cabc_http_requests_in_flight', 'Requests being handled')
+        self.request_size = registry.histogram(
+            'cabc_http_request_size_bytes', 'Request body size (Content-Length)', ('endpoint',), SIZE_BUCKETS)
+        self.response_size = registry.histogram(
+            'cabc_http_response_size_bytes', 'Response body size', ('endpoint',), SIZE_BUCKETS)
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        self.in_flight.inc()
+        response = {}
+
+        def _start_response(status, headers, exc_info=None):
+            response['status'] = status[:3]
+            response['endpoint'] = self.endpoint(environ)
+            for name, value in headers:
+                if name.lower() == 'content-length':
+                    response['length'] = value
+            return start_response(status, headers, exc_info)
+
+        def done(size):
+            if response.get('done'):
+                return
+            response['done'] = True
+            self.in_flight.dec()
+            endpoint = response.get('endpoint') or self.endpoint(environ)
+            method = environ.get('REQUEST_METHOD', 'GET')
+            if method not in METHODS:
+                method = 'other'
+            self.requests.inc((endpoint, method, response.get('status', '500')))
+            self.duration.observe(time.perf_counter() - start, (endpoint, method))
+            try:
+                self.request_size.observe(int(environ.get('CONTENT_LENGTH') or 0), (endpoint,))
+            except ValueError:
+                pass
+            self.response_size.observe(size, (endpoint,))
+
+        try:
+            body = self.app(environ, _start_response)
+        except BaseException:
+            done(0)
+            raise
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+            done(int(response.get('length') or 0))
+            return body
+        return _Body(body, done)
+
+
+def is_loopback(addr) -> bool:
+    try:
+        return ipaddress.ip_address(addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+def install(app, registry: Registry, path: str = '/metrics', token: str = None):
+    """Wrap ``app.wsgi_app`` in ``MetricsMiddleware``, time storage I/O and serve ``path``.
+
+    With ``token`` the scrape must send ``Authorization: Bearer <token>``;
+    without one only clients on the loopback interface may scrape.
+    """
+    storage = registry.histogram(
+        'cabc_storage_seconds', 'Time spent in JSON load/dump, file saves and fsync', ('op',), STORAGE_BUCKETS)
+    probe.set_sink(lambda op, seconds: storage.observe(seconds, (op,)))
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, registry)
+
+    def metrics():
+        if token:
+            auth = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(auth.encode(), f'Bearer {token}'.encode()):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        elif not is_loopback(request.remote_addr):
+            return Response('Forbidden: set METRICS_TOKEN to scrape from another host\n',
+                            status=403, mimetype='text/plain')
+        resp = Response(registry.render(), content_type=CONTENT_TYPE)
+        resp.headers['Cache-Control'] = 'no-store'
+        return resp
+    app.add_url_rule(path, 'metrics', metrics, methods=['GET'])
+    return app.wsgi_app
@@ -0,0 +1,25 @@
+import time
+from contextlib import contextmanager
+
+# Receives (operation, seconds) for every timed storage operation; None disables timing.
+_sink = None
+
+
+def set_sink(sink):
+    """Route timings to ``sink(op, seconds)`` (``None`` turns the probes off)."""
+    global _sink
+    _sink = sink
+
+
+@contextmanager
+def timed(op: str):
+    """Time the block as ``op`` ('json_load', 'json_dump', 'file_save', 'fsync')."""
+    sink = _sink
+    if sink is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sink(op, time.perf_counter() - start)
@@ -0,0 +1,287 @@
+import atexit
+import bisect
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import weakref
+
+from app.storage.files import FileLock
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+EXITED_FILE = 'metrics-exited.json'
+_PID_FILE_RE = re.compile(r'^metrics-(\d+)\.json$')
+
+
+class Metric:
+    """A counter, gauge or histogram; samples are keyed by label values in ``labelnames`` order."""
+
+    def __init__(self, registry, kind: str, name: str, help: str, labelnames=(), buckets=None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+
+    def inc(self, labels=(), amount=1):
+        reg = self.registry
+        key = (self.name, labels)
+        with reg._lock:
+            reg._values[key] = reg._values.get(key, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, value, labels=()):
+        reg = self.registry
+        with reg._lock:
+            reg._values[(self.name, labels)] = value
+
+    def observe(self, value, labels=()):
+        """Histograms: count ``value`` in its bucket (the last slot is +Inf) and add it to the sum."""
+        i = bisect.bisect_left(self.buckets, value)
+        reg = self.registry
+        key = (self.name, labels)
+        with reg._lock:
+            h = reg._values.get(key)
+            if h is None:
+                h = reg._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            h[i] += 1
+            h[-1] += value
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _num(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Registry:
+    """Metrics for this process, summed with the other workers' when scraped.
+
+    Updates only touch a dict under a lock. With a ``directory`` each process
+    writes its samples to ``metrics-<pid>.json`` there (every ``interval``
+    seconds once ``start`` is called, at exit, and before answering a scrape),
+    and ``collect`` adds up all the files, so whichever gunicorn worker gets
+    the scrape reports for all of them. Counters and histograms of workers
+    that have exited are folded into ``metrics-exited.json`` so totals never
+    go backwards; their gauges are dropped. Without a directory the registry
+    only reports this process.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self.metrics = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._claimed = False
+        self._interval = 0
+        self._stop = threading.Event()
+        self._thread = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            if hasattr(os, 'register_at_fork'):
+                ref = weakref.ref(self)
+                os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._after_fork())
+
+    def _register(self, kind: str, name: str, help: str, labelnames, buckets=None) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is not None:
+            if metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(f'Metric {name} already registered as a different {metric.kind}')
+            return metric
+        metric = self.metrics[name] = Metric(self, kind, name, help, labelnames, buckets)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Metric:
+        return self._register('counter', name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Metric:
+        return self._register('gauge', name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Metric:
+        return self._register('histogram', name, help, labelnames, buckets)
+
+    def snapshot(self) -> dict:
+        """This process's samples: ``{(name, label values): value}``."""
+        with self._lock:
+            return {key: list(v) if isinstance(v, list) else v for key, v in self._values.items()}
+
+    # -- files shared by the workers ------------------------------------------------
+
+    def _read(self, filename: str) -> dict:
+        try:
+            with open(os.path.join(self.directory, filename), 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {(name, tuple(labels)): value for name, labels, value in data.get('samples', [])}
+
+    def _write(self, filename: str, values: dict):
+        # Not fsynced: losing the last few seconds of samples in a crash is fine.
+        data = {'pid': self._pid, 'samples': [[name, list(labels), value] for (name, labels), value in values.items()]}
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + filename + '.', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(data, fh, separators=(',', ':'))
+            os.replace(tmp_path, os.path.join(self.directory, filename))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _merge(self, into: dict, values: dict, gauges: bool = True):
+        for key, value in values.items():
+            metric = self.metrics.get(key[0])
+            if metric is None or (metric.kind == 'gauge' and not gauges):
+                continue
+            have = into.get(key)
+            if metric.kind == 'histogram':
+                if len(value) != len(metric.buckets) + 2:
+                    continue
+                into[key] = list(value) if have is None else [a + b for a, b in zip(have, value)]
+            else:
+                into[key] = (have or 0) + value
+
+    def _fold_exited(self, filenames):
+        """Add the counters of exited processes to the exited file and remove theirs (lock held)."""
+        exited = self._read(EXITED_FILE)
+        for filename in filenames:
+            self._merge(exited, self._read(filename), gauges=False)
+        self._write(EXITED_FILE, exited)
+        for filename in filenames:
+            try:
+                os.unlink(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+
+    def flush(self):
+        """Write this process's samples to its file in ``directory``."""
+        if not self.directory:
+            return
+        filename = f'metrics-{self._pid}.json'
+        if not self._claimed:
+            # A file under our pid was left by an earlier process that had it.
+            with FileLock(os.path.join(self.directory, EXITED_FILE)):
+                if os.path.exists(os.path.join(self.directory, filename)):
+                    self._fold_exited([filename])
+            self._claimed = True
+        self._write(filename, self.snapshot())
+
+    def collect(self) -> dict:
+        """Samples summed over every process sharing ``directory``."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        merged = {}
+        with FileLock(os.path.join(self.directory, EXITED_FILE)):
+            dead = []
+            for filename in os.listdir(self.directory):
+                m = _PID_FILE_RE.match(filename)
+                if not m:
+                    continue
+                pid = int(m.group(1))
+                if pid != self._pid and not _alive(pid):
+                    dead.append(filename)
+                else:
+                    self._merge(merged, self._read(filename))
+            if dead:
+                self._fold_exited(dead)
+            self._merge(merged, self._read(EXITED_FILE), gauges=False)
+        return merged
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        by_name = {}
+        for (name, labels), value in self.collect().items():
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {_escape(metric.help)}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            samples = sorted(by_name.get(name, ()), key=lambda s: s[0])
+            if not samples and not metric.labelnames and metric.kind != 'histogram':
+                samples = [((), 0)]
+            for labels, value in samples:
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind != 'histogram':
+                    lines.append(f'{name}{_labels(pairs)} {_num(value)}')
+                    continue
+                cumulative = 0
+                for le, count in zip(metric.buckets + (math.inf,), value):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(pairs + [("le", _num(le))])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(pairs)} {_num(value[-1])}')
+                lines.append(f'{name}_count{_labels(pairs)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    # -- background flushing ----------------------------------------------------------
+
+    def start(self, interval: float):
+        """Flush every ``interval`` seconds in a daemon thread and once more at exit."""
+        if not self.directory or interval <= 0 or self._thread is not None:
+            return
+        if not self._interval:
+            atexit.register(self.stop)
+        self._interval = interval
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+        self._thread = threading.Thread(target=run, name='metrics-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def _after_fork(self):
+        # A forked worker starts from zero (the parent's samples stay the parent's)
+        # and needs its own lock, file and flush thread.
+        self._values = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._claimed = False
+        self._stop = threading.Event()
+        self._thread = None
+        if self._interval:
+            self.start(self._interval)
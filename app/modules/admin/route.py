@@ -0,0 +1,89 @@
+import time
+
+from flask import Blueprint, jsonify, request, send_file, session
+
+from app.site.helpers import require_admin_token
+from app.site.site import site
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/api/admin/login-stats', methods=['GET'])
+def admin_login_stats():
+    """Admin-only: session counts and durations per admin and per day.
+    Optional from/to (YYYY-MM-DD) limit the per-day rows.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        date_from = request.args.get('from') or None
+        date_to = request.args.get('to') or None
+        return jsonify(site.login_log.stats_report(date_from, date_to))
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@admin_bp.route('/api/admin/profiles', methods=['GET'])
+def admin_profiles():
+    """Admin-only: captured request profiles (slow or asked for with X-Profile), newest first."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        profiler = site.profiler
+        return jsonify(items=profiler.ring.list(), slow_ms=profiler.threshold * 1000)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@admin_bp.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def admin_profile(profile_id):
+    """Admin-only: one profile with its top functions; ?format=folded downloads the
+    collapsed stacks (for flamegraph.pl or speedscope).
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        ring = site.profiler.ring
+        summary = ring.get(profile_id)
+        if summary is None:
+            return jsonify(success=False, message='Not found'), 404
+        if request.args.get('format') == 'folded':
+            return send_file(ring.path(profile_id, 'folded'), mimetype='text/plain',
+                             as_attachment=True, download_name=f'profile-{profile_id}.folded')
+        return jsonify(summary)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@admin_bp.route('/api/search', methods=['GET'])
+def api_search():
+    """Admin-only: ranked search over prayers and memberships.
+    Query args: q (words or word prefixes, English or Telugu), in (comma list of
+    prayers, pending_prayers, memberships, pending_memberships; default all), limit (max 100).
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        q = (request.args.get('q') or '').strip()
+        if not q:
+            return jsonify(success=False, message='Missing q'), 400
+        search = site.search
+        collections = [c.strip() for c in request.args.get('in', '').split(',') if c.strip()] or None
+        unknown = set(collections or ()) - set(search.sources)
+        if unknown:
+            return jsonify(success=False, message=f"Unknown collection: {', '.join(sorted(unknown))}"), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        started = time.perf_counter()
+        items = search.search(q, collections, limit)
+        return jsonify(success=True, q=q, count=len(items), items=items,
+                       took_ms=round((time.perf_counter() - started) * 1000, 2))
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
@@ -0,0 +1,86 @@
+from flask import Blueprint, current_app, jsonify, request, session
+
+from app.site.helpers import append_login_log, close_last_login_log, is_admin_email
+from app.site.site import site
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/auth/me')
+def auth_me():
+    u = session.get('user')
+    return jsonify(user=u) if u else jsonify(user=None)
+
+@auth_bp.route('/auth/google/verify', methods=['POST'])
+def auth_google_verify():
+    try:
+        data = request.get_json(silent=True) or {}
+        token = data.get('id_token') or data.get('credential')
+        if not token:
+            return jsonify(success=False, message='Missing id_token'), 400
+        if not current_app.config['GOOGLE_CLIENT_ID']:
+            return jsonify(success=False, message='Server missing GOOGLE_CLIENT_ID'), 500
+        # Verify token with Google's (cached) certs
+        idinfo = site.google_verifier.verify(token)
+        email = idinfo.get('email')
+        name = idinfo.get('name') or ''
+        picture = idinfo.get('picture') or ''
+        sub = idinfo.get('sub')
+        if not email:
+            return jsonify(success=False, message='No email in token'), 400
+        is_admin = is_admin_email(email)
+        session['user'] = {'email': email, 'name': name, 'picture': picture, 'sub': sub, 'admin': is_admin}
+        if is_admin:
+            append_login_log(email, name)
+        return jsonify(success=True, user=session['user'])
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 400
+
+@auth_bp.route('/auth/logout', methods=['POST'])
+def auth_logout():
+    u = session.get('user')
+    if u and u.get('admin'):
+        close_last_login_log(u.get('email'))
+    session.clear()
+    return jsonify(success=True)
+
+
+@auth_bp.route('/auth/login', methods=['POST'])
+def auth_login():
+    """Simple username/password fallback for environments without Google OAuth.
+    Expects JSON: {username, password}
+    Requires ADMIN_USER and ADMIN_PASS to be set in env.
+    """
+    try:
+        admin_user = current_app.config['ADMIN_USER']
+        admin_pass = current_app.config['ADMIN_PASS']
+        if not admin_user or not admin_pass:
+            return jsonify(success=False, message='Server not configured for fallback login'), 500
+        data = request.get_json(silent=True) or {}
+        username = (data.get('username') or '').strip()
+        password = (data.get('password') or '').strip()
+        if not username or not password:
+            return jsonify(success=False, message='Missing username or password'), 400
+        if username != admin_user or password != admin_pass:
+            return jsonify(success=False, message='Invalid credentials'), 401
+        # login successful
+        email = username
+        name = username
+        is_admin = True
+        session['user'] = {'email': email, 'name': name, 'picture': '', 'sub': None, 'admin': is_admin}
+        append_login_log(email, name)
+        return jsonify(success=True, user=session['user'])
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+# Development convenience: allow a dev login endpoint when running in debug mode
+@auth_bp.route('/auth/dev-login', methods=['POST'])
+def auth_dev_login():
+    if not current_app.debug:
+        return jsonify(success=False, message='Not available'), 403
+    # create a dummy admin session for local testing
+    email = 'dev-admin@example.com'
+    session['user'] = {'email': email, 'name': 'Dev Admin', 'picture': '', 'sub': None, 'admin': True}
+    append_login_log(email, 'Dev Admin')
+    return jsonify(success=True, user=session['user'])
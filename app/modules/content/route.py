@@ -0,0 +1,147 @@
+import json
+
+from flask import Blueprint, jsonify, request, session
+
+from app.assets.static_index import send_entry
+from app.sermons.catalog import clean_entry as clean_sermon
+from app.site.helpers import require_admin_token
+from app.site.site import site
+from app.storage.cache import CacheEntry, entry_response
+from app.storage.query import PageQuery, page
+
+content_bp = Blueprint('content', __name__)
+
+SONG_CACHE_CONTROL = 'public, max-age=86400'
+SERMON_CACHE_CONTROL = 'public, max-age=60'
+MEMBERS_SHEET_CACHE_CONTROL = 'public, max-age=60, stale-while-revalidate=600'
+
+
+def song_summary(song: dict) -> dict:
+    return {
+        'number': song['number'],
+        'pages': song['page_end'] - song['page_start'] + 1,
+        'pdf': f"/api/songs/{song['number']}/pdf",
+    }
+
+def songbook_ready() -> bool:
+    return bool(site.songbook.songs) or site.songbook.ensure()
+
+@content_bp.route('/api/songs', methods=['GET'])
+def api_songs():
+    """The song numbers of the book with their page counts.
+    (Titles are not searchable: the PDF's Telugu text does not extract as Unicode.)
+    """
+    try:
+        if not songbook_ready():
+            return jsonify(success=False, message='Songbook not available'), 503
+        items = [{'number': s['number'], 'pages': s['page_end'] - s['page_start'] + 1}
+                 for s in site.songbook.list()]
+        resp = jsonify(success=True, count=len(items), items=items)
+        resp.headers['Cache-Control'] = SONG_CACHE_CONTROL
+        resp.add_etag()
+        return resp.make_conditional(request)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@content_bp.route('/api/songs/<int:number>', methods=['GET'])
+def api_song(number: int):
+    try:
+        if not songbook_ready():
+            return jsonify(success=False, message='Songbook not available'), 503
+        song = site.songbook.get(number)
+        if song is None:
+            return jsonify(success=False, message='Not found'), 404
+        resp = jsonify(success=True, song=song_summary(song))
+        resp.headers['Cache-Control'] = SONG_CACHE_CONTROL
+        return resp
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@content_bp.route('/api/songs/<int:number>/pdf', methods=['GET'])
+def api_song_pdf(number: int):
+    """Just the song's pages of the songbook (tens of KB instead of the whole book)."""
+    if not songbook_ready():
+        return jsonify(success=False, message='Songbook not available'), 503
+    entry = site.songbook.excerpt(number)
+    if entry is None:
+        return jsonify(success=False, message='Not found'), 404
+    return send_entry(entry, SONG_CACHE_CONTROL,
+                      {'Content-Disposition': f'inline; filename="song-{number}.pdf"'})
+
+
+@content_bp.route('/api/sermons', methods=['GET'])
+def api_sermons():
+    """Sermon videos, newest first: limit/cursor pages, from/to on the date, series, speaker."""
+    try:
+        try:
+            query = PageQuery.from_args(request.args, eq_fields=('series', 'speaker'))
+        except ValueError as e:
+            return jsonify(success=False, message=str(e)), 400
+        sermons = site.sermons
+
+        def build():
+            result = page(sermons, query, 'date')
+            return CacheEntry(None, result, json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        entry = sermons.cached(tuple(sorted(request.args.items(multi=True))), build)
+        return entry_response(entry, SERMON_CACHE_CONTROL)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@content_bp.route('/api/sermons', methods=['POST'])
+def add_sermons():
+    """Admin-only: add sermons or update them (matched by id or video).
+
+    Body is one entry or a list: {"video", "title", "date": "YYYY-MM-DD", "series", "speaker", "thumb"}.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        data = request.get_json(silent=True)
+        items = data if isinstance(data, list) else [data]
+        if not items or not all(isinstance(item, dict) for item in items):
+            return jsonify(success=False, message='Expected a sermon object or a list of them'), 400
+        entries = []
+        for item in items:
+            try:
+                entry = clean_sermon(item)
+            except ValueError as e:
+                return jsonify(success=False, message=str(e)), 400
+            if isinstance(item.get('id'), int):
+                entry['id'] = item['id']
+            entries.append(entry)
+        return jsonify(success=True, items=site.sermons.upsert(entries))
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@content_bp.route('/api/sermons/<int:rid>', methods=['DELETE'])
+def delete_sermon(rid: int):
+    """Admin-only: remove a sermon from the list."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        removed = site.sermons.remove(rid)
+        if removed is None:
+            return jsonify(success=False, message='Not found'), 404
+        return jsonify(success=True, removed=removed)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@content_bp.route('/api/members-directory', methods=['GET'])
+def members_directory():
+    """Rows of the public members sheet ({columns, rows, count}) from the server-side snapshot."""
+    try:
+        entry = site.members_sheet.get()
+        if entry is None:
+            return jsonify(success=False, message='Members sheet not available'), 503
+        return entry_response(entry, MEMBERS_SHEET_CACHE_CONTROL)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
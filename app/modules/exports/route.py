@@ -0,0 +1,204 @@
+import os
+import tempfile
+import time
+import uuid
+from functools import partial
+
+from flask import Blueprint, Response, current_app, jsonify, request, send_from_directory, session, stream_with_context
+
+from app.export.export import FORMATS, MEMBERSHIP_FIELDS, PRAYER_FIELDS, stream_csv, stream_ndjson
+from app.jobs.queue import DONE
+from app.site.helpers import record_epoch, require_admin_token
+from app.site.site import site
+from app.storage.query import date_bounds
+
+exports_bp = Blueprint('exports', __name__)
+
+# collection -> (default fields, whether it is ordered by an ISO timestamp). Prayers carry an
+# epoch ``ts`` (seconds, or milliseconds from the browser) and are bounded by epoch instead.
+EXPORT_COLLECTIONS = {'memberships': (MEMBERSHIP_FIELDS, True), 'prayers': (PRAYER_FIELDS, False)}
+
+
+def export_dir() -> str:
+    return os.path.join(current_app.config['DATA_DIR'], 'exports')
+
+
+def epoch_bounds(date_from, date_to) -> tuple:
+    """``date_bounds`` as inclusive epoch seconds; a bare end date covers its whole day. Raises ValueError."""
+    bounds = []
+    for value in (date_from, date_to):
+        if value is None:
+            bounds.append(None)
+            continue
+        whole_day = value.endswith('\uffff')
+        value = value.rstrip('\uffff')
+        epoch = record_epoch(value)
+        if epoch is None:
+            raise ValueError(f'Invalid date: {value}')
+        bounds.append(epoch + 86400 - 0.001 if whole_day else epoch)
+    return tuple(bounds)
+
+
+def in_epoch_range(epoch, lo, hi) -> bool:
+    if epoch is None:
+        return False
+    return (lo is None or epoch >= lo) and (hi is None or epoch <= hi)
+
+
+def export_body(collection: str, fmt: str, fields=None, date_from=None, date_to=None):
+    """(chunk generator, mimetype, extension) for an export of ``collection`` in timestamp order."""
+    default_fields, dates = EXPORT_COLLECTIONS[collection]
+    repo = getattr(site.store, collection)
+    if dates:
+        records = repo.iter_ordered(lo=date_from, hi=date_to)
+    else:
+        records = repo.iter_ordered()
+        if date_from is not None or date_to is not None:
+            records = (r for r in records if in_epoch_range(record_epoch(r.get('ts')), date_from, date_to))
+    if fmt == 'ndjson':
+        return stream_ndjson(records, fields or None), 'application/x-ndjson', 'ndjson'
+    return stream_csv(records, fields or default_fields, excel=(fmt == 'xlsx')), 'text/csv', 'csv'
+
+
+def export_args(args, collection: str):
+    """Validated (format, fields, from, to) from query args or a JSON body; raises ValueError."""
+    fmt = (args.get('format') or 'csv').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+    fields = args.get('fields') or ''
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    date_from, date_to = date_bounds(args)
+    if not EXPORT_COLLECTIONS[collection][1]:
+        date_from, date_to = epoch_bounds(date_from, date_to)
+    return fmt, fields, date_from, date_to
+
+
+def export_response(collection: str):
+    """Stream ``collection`` as CSV, Excel-friendly CSV or NDJSON."""
+    try:
+        fmt, fields, date_from, date_to = export_args(request.args, collection)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    body, mimetype, ext = export_body(collection, fmt, fields, date_from, date_to)
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename="{collection}.{ext}"'
+    return resp
+
+
+def export_job(app, collection: str, fmt: str, fields=None, date_from=None, date_to=None) -> dict:
+    """Job handler: write an export to data/exports/ and return its file name."""
+    with app.app_context():
+        out_dir = export_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        cutoff = time.time() - current_app.config['JOB_RETENTION_HOURS'] * 3600
+        for entry in os.scandir(out_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        body, mimetype, ext = export_body(collection, fmt, fields, date_from, date_to)
+        name = f'{collection}-{uuid.uuid4().hex[:12]}.{ext}'
+        fd, tmp_path = tempfile.mkstemp(prefix='.export.', dir=out_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as fh:
+                for chunk in body:
+                    fh.write(chunk)
+            os.replace(tmp_path, os.path.join(out_dir, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return {'file': name, 'mimetype': mimetype, 'bytes': os.path.getsize(os.path.join(out_dir, name))}
+
+
+@exports_bp.record_once
+def register_export_job(state):
+    state.app.extensions['site'].register_job('export', partial(export_job, state.app))
+
+
+@exports_bp.route('/export/memberships', methods=['GET'])
+def export_memberships():
+    """Admin-only: stream approved memberships without buffering them.
+    Query args: format (csv|xlsx|ndjson), fields (comma list), from/to (timestamp range).
+    CSV output flattens children and files into plain columns.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return export_response('memberships')
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@exports_bp.route('/export/prayers', methods=['GET'])
+def export_prayers():
+    """Admin-only: stream approved prayers (format and fields as for memberships).
+    from/to (YYYY-MM-DD or ISO) bound the prayer's ts.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return export_response('prayers')
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@exports_bp.route('/api/exports', methods=['POST'])
+def queue_export():
+    """Admin-only: run an export in the background.
+    JSON body: collection (memberships|prayers), format, fields, from, to.
+    Returns 202 with a job id; poll /api/jobs/<id>, then fetch /api/jobs/<id>/download.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        data = request.get_json(silent=True) or {}
+        collection = data.get('collection') or 'memberships'
+        if collection not in EXPORT_COLLECTIONS:
+            return jsonify(success=False, message='collection must be memberships or prayers'), 400
+        try:
+            fmt, fields, date_from, date_to = export_args(data, collection)
+        except ValueError as e:
+            return jsonify(success=False, message=str(e)), 400
+        job = site.jobs.submit('export', collection=collection, fmt=fmt, fields=fields,
+                               date_from=date_from, date_to=date_to)
+        return jsonify(success=True, job_id=job['id'], status_url=f"/api/jobs/{job['id']}"), 202
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@exports_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+def job_status(job_id: int):
+    """Admin-only: status (queued|running|done|failed), timestamps, result or error of a job."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        job = site.jobs.get(job_id)
+        if not job:
+            return jsonify(success=False, message='Not found'), 404
+        if job['kind'] == 'export' and job['status'] == DONE:
+            job['download'] = f'/api/jobs/{job_id}/download'
+        return jsonify(job)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@exports_bp.route('/api/jobs/<int:job_id>/download', methods=['GET'])
+def job_download(job_id: int):
+    """Admin-only: the file produced by a finished export job."""
+    if not require_admin_token():
+        u = session.get('user')
+        if not (u and u.get('admin')):
+            return jsonify(success=False, message='Unauthorized'), 401
+    job = site.jobs.get(job_id)
+    if not job or job['kind'] != 'export' or job['status'] != DONE:
+        return jsonify(success=False, message='Not found'), 404
+    result = job['result']
+    ext = result['file'].rsplit('.', 1)[-1]
+    return send_from_directory(export_dir(), result['file'], mimetype=result['mimetype'], as_attachment=True,
+                               download_name=f"{job['args']['collection']}.{ext}")
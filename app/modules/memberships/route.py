@@ -0,0 +1,220 @@
+import json
+import os
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request, session
+from werkzeug.utils import secure_filename
+
+from app.site.helpers import (allowed_filename, batch_moderate, list_response, rate_limited, release_uploads,
+                              require_admin_token, validate_membership_form)
+from app.site.site import site
+
+memberships_bp = Blueprint('memberships', __name__)
+
+
+@memberships_bp.route('/api/memberships', methods=['POST'])
+@rate_limited('membership')
+def receive_membership():
+    try:
+        form = request.form
+        ok, msg = validate_membership_form(form)
+        if not ok:
+            return jsonify(success=False, message=msg), 400
+        # Basic fields (keep existing names for backward compatibility)
+        name = form.get('memberName', '').strip()
+        dob = form.get('memberDob', '').strip()
+        phone = form.get('memberPhone', '').strip()
+        email = form.get('memberEmail', '').strip()
+        address = form.get('memberAddress', '').strip()
+        baptized = form.get('memberBaptized', '').strip()
+        prev_church = form.get('memberPrevChurch', '').strip()
+        why = form.get('memberWhy', '').strip()
+
+        # New/expanded fields from the long membership form
+        birth_place = form.get('memberBirthPlace', '').strip()
+        blood_group = form.get('memberBloodGroup', '').strip()
+        christian_status = form.get('memberChristianStatus', '').strip()
+        baptism_pastor = form.get('memberBaptismPastor', '').strip()
+        baptism_year = form.get('memberBaptismYear', '').strip()
+        education = form.get('memberEducation', '').strip()
+        other_qualifications = form.get('memberOtherQualifications', '').strip()
+        occupation = form.get('memberOccupation', '').strip()
+        aadhar = form.get('memberAadhar', '').strip()
+        father_name = form.get('memberFatherName', '').strip()
+        father_occupation = form.get('memberFatherOcc', '').strip()
+        mother_name = form.get('memberMotherName', '').strip()
+        mother_occupation = form.get('memberMotherOcc', '').strip()
+        spouse_name = form.get('memberSpouseName', '').strip()
+        spouse_occupation = form.get('memberSpouseOcc', '').strip()
+        children_json = form.get('children', '[]').strip()
+        declaration = form.get('memberDeclaration', '').strip()
+        declaration_date = form.get('memberDeclarationDate', '').strip()
+        declaration_place = form.get('memberDeclarationPlace', '').strip()
+
+        # File handling - allow familyPhoto and memberSignature
+        saved_files = {}
+        blob_paths = []
+        def save_file(field_name):
+            if field_name in request.files:
+                f = request.files[field_name]
+                if f and f.filename:
+                    filename = secure_filename(f.filename)
+                    if not allowed_filename(filename):
+                        raise ValueError(f'File type not allowed for {field_name}')
+                    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+                    name_pref = filename.rsplit('.', 1)[0]
+                    ext = filename.rsplit('.', 1)[1]
+                    saved_name = f"{field_name}_{name_pref}_{timestamp}.{ext}"
+                    # Stored once per distinct content; the record points at the blob
+                    saved_name, blob_path = site.blob_store.save(f.stream, saved_name)
+                    saved_files[field_name] = saved_name
+                    blob_paths.append(os.path.join(current_app.config['UPLOAD_DIR'], blob_path))
+                    return blob_path
+            return None
+
+        try:
+            family_photo_name = save_file('familyPhoto')
+            signature_name = save_file('memberSignature')
+        except Exception:
+            for saved_name in saved_files.values():
+                site.blob_store.release(saved_name)
+            raise
+        if blob_paths:
+            # Thumbnails for the whole submission: one job, rendered off the request path
+            derivatives = site.derivatives
+            site.jobs.submit('derivatives', root=derivatives.root, max_bytes=derivatives.max_bytes,
+                             src_paths=blob_paths)
+
+        # Build a membership record (without assigning approved ID yet)
+        record = {
+                'name': name,
+                'dob': dob,
+                'phone': phone,
+                'email': email,
+                'address': address,
+                'baptized': baptized,
+                'previous_church': prev_church,
+                'why': why,
+                'birth_place': birth_place,
+                'blood_group': blood_group,
+                'christian_status': christian_status,
+                'baptism_pastor': baptism_pastor,
+                'baptism_year': baptism_year,
+                'education': education,
+                'other_qualifications': other_qualifications,
+                'occupation': occupation,
+                'aadhar': aadhar,
+                'father_name': father_name,
+                'father_occupation': father_occupation,
+                'mother_name': mother_name,
+                'mother_occupation': mother_occupation,
+                'spouse_name': spouse_name,
+                'spouse_occupation': spouse_occupation,
+                'children': None,
+                'declaration': declaration,
+                'declaration_date': declaration_date,
+                'declaration_place': declaration_place,
+                'files': {},
+                'upload_names': saved_files,
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    }
+
+        # Parse children JSON if present
+        try:
+            record['children'] = json.loads(children_json) if children_json else []
+        except Exception:
+            record['children'] = []
+
+        if family_photo_name:
+            record['files']['familyPhoto'] = family_photo_name
+        if signature_name:
+            record['files']['memberSignature'] = signature_name
+
+        # Save to pending members list for admin review
+        try:
+            record = site.store.pending_members.add(record)
+        except Exception as e:
+            for saved_name in saved_files.values():
+                site.blob_store.release(saved_name)
+            return jsonify(success=False, message=f'Failed to save pending membership: {e}'), 500
+
+        resp = {'success': True, 'message': 'Submitted for review', 'pending_id': record['id']}
+        if family_photo_name:
+            resp['family_photo'] = '/uploads/' + family_photo_name
+        if signature_name:
+            resp['member_signature'] = '/uploads/' + signature_name
+        return jsonify(resp)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@memberships_bp.route('/api/memberships', methods=['GET'])
+def list_memberships():
+    """Admin-only: list approved memberships.
+    Query args limit, cursor, fields, sort (asc|desc), from, to, baptized and
+    blood_group return a {items, next_cursor} page ordered by timestamp.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return list_response(site.store.memberships, 'timestamp')
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@memberships_bp.route('/api/pending-memberships', methods=['GET'])
+def list_pending_memberships():
+    """Admin-only: list pending membership submissions (same paging args as GET /api/memberships)."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return list_response(site.store.pending_members, 'timestamp')
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@memberships_bp.route('/api/pending-memberships/<int:mid>/approve', methods=['POST'])
+def approve_pending_membership(mid: int):
+    """Admin-only: move a pending membership into the approved memberships."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+
+        store = site.store
+        # Moved under the pending queue's write lock: a double-clicked approve
+        # cannot create the membership twice.
+        approved = store.pending_members.move_many([mid], store.memberships)[mid]
+        if approved is None:
+            return jsonify(success=False, message='Not found'), 404
+        return jsonify(success=True, id=approved['id'])
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@memberships_bp.route('/api/pending-memberships/<int:mid>/reject', methods=['POST'])
+def reject_pending_membership(mid: int):
+    """Admin-only: drop a pending membership submission."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        release_uploads([site.store.pending_members.remove(mid)])
+        return jsonify(success=True)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+@memberships_bp.route('/api/pending-memberships/batch', methods=['POST'])
+def batch_pending_memberships():
+    """Admin-only: approve or reject many pending memberships in one request."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        store = site.store
+        return batch_moderate(store.pending_members, store.memberships, 'timestamp', on_reject=release_uploads)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
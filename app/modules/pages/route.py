@@ -0,0 +1,29 @@
+from flask import Blueprint, abort, current_app, jsonify
+
+from app.site.site import site
+
+pages_bp = Blueprint('pages', __name__)
+
+
+@pages_bp.route('/')
+def index():
+    return static_files('index.html')
+
+# Serve other static files (css, js, images, know_more.html, etc.)
+@pages_bp.route('/<path:filename>')
+def static_files(filename):
+    # Pages, CSS and JS come precompressed from the asset build; hashed names are immutable.
+    # Everything else must be in the allow-listed index (no .env, logs, pid files or code).
+    resp = site.assets.send(filename) or site.static_index.send(filename)
+    if resp is None:
+        abort(404)
+    return resp
+
+@pages_bp.route('/config')
+def config_endpoint():
+    return jsonify(googleClientId=current_app.config['GOOGLE_CLIENT_ID'],
+                   adminEmails=current_app.config['ADMIN_EMAILS'])
+
+@pages_bp.route('/health', methods=['GET'])
+def health():
+    return jsonify({'status': 'ok'}), 200
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request, session
+
+from app.site.helpers import batch_moderate, list_response, rate_limited, require_admin_token
+from app.site.site import site
+from app.storage.cache import cached_json_response
+
+prayers_bp = Blueprint('prayers', __name__)
+
+
+@prayers_bp.route('/api/prayers', methods=['GET'])
+def api_prayers():
+    """Return the approved prayers. Requires admin token or admin session."""
+    try:
+        # enforce admin access unless ADMIN_TOKEN not set (dev convenience)
+        if not require_admin_token():
+            # also allow logged-in admin session
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return cached_json_response(site.read_cache, site.store.prayers)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@prayers_bp.route('/submit/prayer', methods=['POST'])
+@rate_limited('prayer')
+def submit_prayer():
+    """Public endpoint for submitting prayer requests. Appends to the pending prayers journal."""
+    try:
+        data = request.get_json(silent=True) or {}
+        name = data.get('name','').strip()
+        text = data.get('text','').strip()
+        anon = bool(data.get('anon', False))
+        ts = data.get('ts') or datetime.utcnow().timestamp()
+        if not text:
+            return jsonify(success=False, message='Missing text'), 400
+
+        entry = site.store.pending_prayers.add({'ts': int(ts), 'name': name, 'anon': anon, 'text': text})
+        return jsonify(success=True, id=entry['id'])
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@prayers_bp.route('/api/pending-prayers', methods=['GET'])
+def api_pending_prayers():
+    """Return array of pending prayers; requires admin token or session.
+    Pass limit/cursor/fields/sort for a {items, next_cursor} page ordered by ts.
+    """
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return list_response(site.store.pending_prayers, 'ts', eq_fields=(), dates=False)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@prayers_bp.route('/api/pending-prayers/<int:pid>/approve', methods=['POST'])
+def approve_pending_prayer(pid):
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        store = site.store
+        # One step under the pending queue's write lock, so two admins approving
+        # the same prayer at once cannot both copy it (the second gets 404).
+        if store.pending_prayers.move_many([pid], store.prayers)[pid] is None:
+            return jsonify(success=False, message='Not found'), 404
+        return jsonify(success=True)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@prayers_bp.route('/api/pending-prayers/<int:pid>/reject', methods=['POST'])
+def reject_pending_prayer(pid):
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        site.store.pending_prayers.remove(pid)
+        return jsonify(success=True)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@prayers_bp.route('/api/pending-prayers/batch', methods=['POST'])
+def batch_pending_prayers():
+    """Admin-only: approve or reject many pending prayers in one request."""
+    try:
+        if not require_admin_token():
+            u = session.get('user')
+            if not (u and u.get('admin')):
+                return jsonify(success=False, message='Unauthorized'), 401
+        return batch_moderate(site.store.pending_prayers, site.store.prayers, 'ts')
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
@@ -0,0 +1,116 @@
+import os
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, jsonify, request, send_file, send_from_directory
+from werkzeug.security import safe_join
+from werkzeug.wsgi import get_input_stream
+
+from app.media.derivatives import IMAGE_EXT, MIMETYPES as DERIVATIVE_MIMETYPES, pick_format
+from app.site.helpers import require_admin_token, validate_membership_record
+from app.site.site import site
+from app.storage.blobs import BLOB_PREFIX
+from app.storage.bulk import import_records, import_replacing, iter_json_records
+
+uploads_bp = Blueprint('uploads', __name__)
+
+BULK_MIMETYPES = ('application/json', 'application/x-ndjson', 'application/ndjson')
+
+
+# Serve uploaded files
+@uploads_bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    """Blob URLs are content-addressed and cached forever; plain names are
+    looked up in the blob index, then in the uploads folder (older files).
+    ?w=<px> serves a resized copy (WebP when accepted, ?format= to force one).
+    """
+    if filename.startswith(('index.json', 'names.jsonl')):
+        abort(404)
+    upload_dir = current_app.config['UPLOAD_DIR']
+    immutable = filename.startswith(BLOB_PREFIX + '/')
+    rel = filename if immutable else (site.blob_store.resolve(filename) or filename)
+    width = request.args.get('w', type=int)
+    ext = rel.rsplit('.', 1)[-1].lower()
+    resp = None
+    if width and width > 0 and ext in IMAGE_EXT:
+        src = safe_join(upload_dir, rel)
+        if not src or not os.path.isfile(src):
+            abort(404)
+        fmt = pick_format(request.args.get('format'), request.headers.get('Accept'), ext)
+        try:
+            resp = send_file(site.derivatives.get(src, width, fmt), mimetype=DERIVATIVE_MIMETYPES[fmt], conditional=True)
+            resp.vary.add('Accept')
+        except Exception as e:
+            # Not decodable (or Pillow missing): serve the original instead
+            current_app.logger.warning('derivative for %s failed: %s', rel, e)
+    if resp is None:
+        resp = send_from_directory(upload_dir, rel, conditional=True)
+    if immutable:
+        resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resp
+
+
+def bulk_import(records_repo, validate, replace: bool = False) -> dict:
+    """Stream-parse the request body (JSON array or NDJSON) and commit it in batches.
+    With ``replace`` the accepted records swap out the whole collection once the
+    body has parsed cleanly; a broken body or one with no valid records leaves
+    the existing data alone.
+    """
+    # Read the raw WSGI input so large imports are not capped by MAX_UPLOAD_MB.
+    stream = get_input_stream(request.environ, max_content_length=current_app.config['MAX_IMPORT_MB'] * 1024 * 1024)
+    if replace:
+        return import_replacing(iter_json_records(stream), validate, records_repo.replace_all)
+    return import_records(iter_json_records(stream), validate, records_repo.add_many)
+
+
+def bulk_report_response(report: dict, **extra):
+    ok = 'error' not in report
+    status = 200 if ok or report['accepted'] else 400
+    return jsonify(success=ok, message=report.get('error') or 'Saved', **extra, **report), status
+
+
+@uploads_bp.route('/upload/memberships', methods=['POST'])
+def upload_memberships_bulk():
+    """Import membership objects (JSON array or NDJSON) into the memberships journal.
+    The body is parsed incrementally, each record is validated like the
+    membership form, and accepted records are committed in batches. The
+    response carries a per-record accepted/rejected report.
+    This is used by the client export button which sends application/json.
+    """
+    try:
+        if not require_admin_token():
+            return jsonify(success=False, message='Unauthorized'), 401
+        if request.mimetype not in BULK_MIMETYPES:
+            return jsonify(success=False, message='Expected application/json or application/x-ndjson'), 400
+        now = datetime.utcnow().isoformat() + 'Z'
+
+        def validate(item):
+            ok, msg = validate_membership_record(item)
+            return ok, msg, dict(item, timestamp=now)
+        report = bulk_import(site.store.memberships, validate)
+        ids = [r['id'] for r in report['results'] if r['status'] == 'accepted']
+        return bulk_report_response(report, saved=report['accepted'], ids=ids)
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
+
+
+@uploads_bp.route('/upload/prayers', methods=['POST'])
+def upload_prayers():
+    """Import prayer entries (JSON array or NDJSON), streamed and committed in batches.
+    By default the approved prayers are replaced as before; pass ?mode=append to add instead.
+    """
+    try:
+        if not require_admin_token():
+            return jsonify(success=False, message='Unauthorized'), 401
+        if request.mimetype not in BULK_MIMETYPES:
+            return jsonify(success=False, message='Expected application/json or application/x-ndjson'), 400
+
+        def validate(item):
+            text = item.get('text')
+            if not isinstance(text, str) or not text.strip():
+                return False, 'Missing text', None
+            return True, None, item
+        replace = request.args.get('mode', 'replace') != 'append'
+        report = bulk_import(site.store.prayers, validate, replace=replace)
+        return bulk_report_response(report, count=report['accepted'])
+    except Exception as e:
+        return jsonify(success=False, message=str(e)), 500
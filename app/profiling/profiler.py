@@ -0,0 +1,273 @@
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+from app.storage.files import FileLock, atomic_write_bytes, atomic_write_json, load_json
+
+PROFILE_HEADER = 'X-Profile'
+MAX_DEPTH = 128
+_ID_RE = re.compile(r'^\d{13}-\d+-\d+$')
+
+
+def _function_name(filename: str, line: int, name: str) -> str:
+    if filename == '~':  # builtins in cProfile's stats
+        return name
+    parts = filename.replace('\\', '/').rsplit('/', 2)
+    return f'{name} ({"/".join(parts[-2:])}:{line})'
+
+
+def _frame_name(code) -> str:
+    return _function_name(code.co_filename, code.co_firstlineno, code.co_name)
+
+
+class Capture:
+    """Stack samples for one request running on thread ``ident``."""
+
+    def __init__(self, ident: int, interval: float, forced: bool):
+        self.ident = ident
+        self.interval = interval
+        self.forced = forced
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.samples = Counter()
+        self.cprofile = None
+        self.status = None
+        self.id = None
+
+
+class ProfileRing:
+    """The newest ``keep`` profiles in ``directory``: ``<id>.json`` (summary) and ``<id>.folded``.
+
+    Ids start with the capture time in milliseconds, so name order is age
+    order across all worker processes; saving prunes the oldest under the
+    directory's lock.
+    """
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def valid_id(pid: str) -> bool:
+        return bool(_ID_RE.match(pid or ''))
+
+    def path(self, pid: str, ext: str) -> str:
+        return os.path.join(self.directory, f'{pid}.{ext}')
+
+    def ids(self) -> list:
+        """Stored profile ids, newest first."""
+        names = [n[:-5] for n in os.listdir(self.directory) if n.endswith('.json')]
+        return sorted((n for n in names if self.valid_id(n)), reverse=True)
+
+    def save(self, summary: dict, folded: str):
+        pid = summary['id']
+        with FileLock(os.path.join(self.directory, 'ring')):
+            # The folded stacks go first: a listed summary always has its download.
+            atomic_write_bytes(self.path(pid, 'folded'), folded.encode('utf-8'))
+            atomic_write_json(self.path(pid, 'json'), summary)
+            for old in self.ids()[self.keep:]:
+                for ext in ('json', 'folded'):
+                    try:
+                        os.unlink(self.path(old, ext))
+                    except FileNotFoundError:
+                        pass
+
+    def get(self, pid: str):
+        """The summary for ``pid``, or None."""
+        if not self.valid_id(pid):
+            return None
+        return load_json(self.path(pid, 'json'), None)
+
+    def list(self) -> list:
+        """Summaries without their function tables, newest first."""
+        items = []
+        for pid in self.ids():
+            summary = load_json(self.path(pid, 'json'), None)
+            if summary:
+                summary.pop('top', None)
+                items.append(summary)
+        return items
+
+
+class SamplingProfiler:
+    """Samples the stacks of in-flight requests from one background thread.
+
+    ``begin`` registers the calling thread; while any request is registered
+    the sampler reads ``sys._current_frames()`` every ``interval`` seconds
+    (``forced_interval`` while an explicitly requested profile is running,
+    since those are often short) and counts each request's stack. ``end``
+    keeps the samples of forced requests and of requests that took at least
+    ``threshold`` seconds (0 disables the automatic capture) and drops the
+    rest, so ordinary requests only pay for being sampled.
+
+    Forced requests also run under ``cProfile``: the sampler needs the GIL,
+    so a request that finishes within a few milliseconds may get no samples
+    at all, while the deterministic profile still has exact call counts and
+    times for its function table.
+    """
+
+    def __init__(self, ring: ProfileRing, threshold: float = 1.0, interval: float = 0.01,
+                 forced_interval: float = 0.001, top: int = 25):
+        self.ring = ring
+        self.threshold = threshold
+        self.interval = interval
+        self.forced_interval = forced_interval
+        self.top = top
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._seq = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def _ensure_thread(self):
+        # Checked per process: a forked worker does not inherit the sampler thread.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._active = {}
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            self._wake.wait()
+            # Sampling under the lock means ``end`` never sees a capture being updated.
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for cap in active:
+                    frame = frames.get(cap.ident)
+                    if frame is None or cap.ident == me:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < MAX_DEPTH:
+                        stack.append(frame.f_code)
+                        frame = frame.f_back
+                    cap.samples[tuple(stack)] += 1
+                del frames, frame
+            time.sleep(min(cap.interval for cap in active))
+
+    def _assign_id(self, cap: Capture):
+        # Lock held
+        self._seq += 1
+        cap.id = f'{int(cap.started * 1000):013d}-{os.getpid()}-{self._seq}'
+
+    def begin(self, forced: bool = False) -> Capture:
+        self._ensure_thread()
+        cap = Capture(threading.get_ident(), self.forced_interval if forced else self.interval, forced)
+        with self._lock:
+            if forced:
+                self._assign_id(cap)
+            self._active[cap.ident] = cap
+        if not self._wake.is_set():
+            self._wake.set()
+        if forced:
+            cap.cprofile = cProfile.Profile()
+            cap.cprofile.enable()
+        return cap
+
+    def end(self, cap: Capture, **info):
+        """Stop sampling ``cap``; saves and returns its summary if it is forced or slow.
+
+        Must be called on the thread that called ``begin``.
+        """
+        if cap.cprofile is not None:
+            cap.cprofile.disable()
+        with self._lock:
+            self._active.pop(cap.ident, None)
+            duration = time.perf_counter() - cap.start
+            slow = self.enabled and duration >= self.threshold and cap.samples
+            if not (cap.forced or slow):
+                return None
+            if cap.id is None:
+                self._assign_id(cap)
+        summary, folded = self.summarize(cap, duration, info)
+        self.ring.save(summary, folded)
+        return summary
+
+    def summarize(self, cap: Capture, duration: float, info: dict):
+        """``(summary dict, collapsed stacks text)`` for a finished capture."""
+        names = {}
+
+        def name(code):
+            n = names.get(code)
+            if n is None:
+                n = names[code] = _frame_name(code)
+            return n
+
+        lines = []
+        own = Counter()
+        total = Counter()
+        for stack, count in cap.samples.items():
+            # Stacks are leaf first; flamegraph lines go root first.
+            frames = [name(code) for code in reversed(stack)]
+            lines.append(';'.join(frames) + f' {count}')
+            own[frames[-1]] += count
+            for fn in set(frames):
+                total[fn] += count
+        samples = sum(cap.samples.values())
+        if cap.cprofile is not None:
+            stats = pstats.Stats(cap.cprofile).stats
+            ranked = sorted(stats.items(), key=lambda kv: (-kv[1][2], -kv[1][3]))[:self.top]
+            top = [{'function': _function_name(*func), 'calls': nc,
+                    'self_ms': round(tt * 1000, 3), 'total_ms': round(ct * 1000, 3)}
+                   for func, (_cc, nc, tt, ct, _callers) in ranked]
+        else:
+            ms = duration * 1000 / samples if samples else 0
+            top = [{'function': fn, 'self_samples': own[fn], 'total_samples': n,
+                    'self_ms': round(own[fn] * ms, 2), 'total_ms': round(n * ms, 2)}
+                   for fn, n in sorted(total.items(), key=lambda kv: (-own[kv[0]], -kv[1], kv[0]))[:self.top]]
+        summary = dict(info, id=cap.id, status=cap.status, started=cap.started,
+                       duration_ms=round(duration * 1000, 2), samples=samples,
+                       interval_ms=cap.interval * 1000, forced=cap.forced,
+                       profiler='cprofile' if cap.cprofile is not None else 'sampling', top=top)
+        return summary, '\n'.join(sorted(lines)) + '\n'
+
+
+def install(app, profiler: SamplingProfiler, allow):
+    """Sample every request of ``app``; ``allow()`` decides who may force a profile with ``X-Profile: 1``.
+
+    A forced request gets ``X-Profile-Id`` on its response.
+    """
+
+    @app.before_request
+    def _begin_profile():
+        forced = request.headers.get(PROFILE_HEADER, '') not in ('', '0') and allow()
+        if forced or profiler.enabled:
+            g._profile = profiler.begin(forced)
+
+    @app.after_request
+    def _profile_header(response):
+        cap = g.get('_profile')
+        if cap is not None:
+            cap.status = response.status_code
+            if cap.forced:
+                response.headers['X-Profile-Id'] = cap.id
+        return response
+
+    @app.teardown_request
+    def _end_profile(exc):
+        cap = g.pop('_profile', None)
+        if cap is not None:
+            profiler.end(cap, endpoint=request.endpoint, method=request.method, path=request.path,
+                         error=type(exc).__name__ if exc is not None else None)
@@ -0,0 +1,59 @@
+import time
+
+from flask import Flask, jsonify, request
+
+from app.profiling.profiler import ProfileRing, SamplingProfiler, install
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def test_slow_requests_kept_in_bounded_ring(tmp_path):
+    ring = ProfileRing(str(tmp_path), keep=2)
+    profiler = SamplingProfiler(ring, threshold=0.05, interval=0.002)
+    fast = profiler.begin()
+    assert profiler.end(fast, endpoint='fast') is None
+    saved = []
+    for i in range(3):
+        cap = profiler.begin()
+        spin(0.08)
+        saved.append(profiler.end(cap, endpoint=f'slow{i}'))
+    assert all(s and s['samples'] > 0 for s in saved)
+    assert ring.ids() == [saved[2]['id'], saved[1]['id']]
+    assert [p['endpoint'] for p in ring.list()] == ['slow2', 'slow1']
+
+    summary = ring.get(saved[2]['id'])
+    assert summary['top'][0]['function'].startswith('spin (profiling/profiling_tests.py:')
+    assert summary['top'][0]['self_samples'] > summary['samples'] // 2
+    with open(ring.path(summary['id'], 'folded'), encoding='utf-8') as fh:
+        lines = fh.read().splitlines()
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == summary['samples']
+    assert any(';test_slow_requests_kept_in_bounded_ring (' in line and ';spin (' in line for line in lines)
+    assert ring.get('../etc/passwd') is None
+
+
+def test_profile_forced_by_allowed_header(tmp_path):
+    app = Flask(__name__)
+
+    @app.route('/work')
+    def work():
+        return jsonify(n=spin(0.02))
+
+    ring = ProfileRing(str(tmp_path))
+    install(app, SamplingProfiler(ring, threshold=0), allow=lambda: request.args.get('admin') == '1')
+    client = app.test_client()
+    assert 'X-Profile-Id' not in client.get('/work').headers
+    assert 'X-Profile-Id' not in client.get('/work', headers={'X-Profile': '1'}).headers
+    assert ring.ids() == []
+
+    resp = client.get('/work?admin=1', headers={'X-Profile': '1'})
+    summary = ring.get(resp.headers['X-Profile-Id'])
+    assert summary['forced'] and summary['endpoint'] == 'work' and summary['status'] == 200
+    assert summary['profiler'] == 'cprofile' and summary['samples'] > 0
+    spin_row = next(f for f in summary['top'] if f['function'].startswith('spin ('))
+    assert spin_row['calls'] == 1 and spin_row['total_ms'] >= 20
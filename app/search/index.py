@@ -0,0 +1,179 @@
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+# Telugu block (letters, vowel signs, virama, digits). Vowel signs and the virama
+# are combining marks, which \w does not match, so the block is listed explicitly.
+_TOKEN_RE = re.compile(r'(?:[^\W_]|[\u0c00-\u0c7f])+')
+# Zero-width (non-)joiners only change how Telugu conjuncts are drawn.
+_INVISIBLE = dict.fromkeys(map(ord, '\u200b\u200c\u200d\ufeff'))
+_TELUGU_DIGITS = {0x0C66 + i: str(i) for i in range(10)}
+# Query tokens shorter than this only match whole terms.
+MIN_PREFIX = 2
+# Upper bound on index terms one query token may expand to.
+MAX_EXPANSIONS = 200
+# Prefix hits rank below exact hits of the same term.
+PREFIX_WEIGHT = 0.7
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text) -> list:
+    """Lower-cased word tokens of English and Telugu text (Telugu digits become 0-9)."""
+    if text is None:
+        return []
+    text = unicodedata.normalize('NFC', str(text)).translate(_INVISIBLE).translate(_TELUGU_DIGITS).casefold()
+    return _TOKEN_RE.findall(text)
+
+
+class SearchIndex:
+    """In-memory inverted index with BM25 ranking and prefix matching.
+
+    Documents are keyed by any hashable (here ``(collection, id)``) and made of
+    ``(text, weight)`` parts, so a hit in a name can count more than one in a
+    long description. Every query token must match a document, either as a
+    whole term or as the prefix of one.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}
+        self._total_len = 0.0
+        self._terms = []
+        self._terms_dirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, key, parts):
+        self.remove(key)
+        freqs = {}
+        for text, weight in parts:
+            for term in tokenize(text):
+                freqs[term] = freqs.get(term, 0.0) + weight
+        length = sum(freqs.values())
+        for term, tf in freqs.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self._terms_dirty = True
+            posting[key] = tf
+        self.docs[key] = (tuple(freqs), length)
+        self._total_len += length
+
+    def remove(self, key):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        terms, length = doc
+        self._total_len -= length
+        for term in terms:
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+                self._terms_dirty = True
+
+    def _expand(self, token: str) -> list:
+        """``[(term, weight)]`` for the whole term and, if long enough, terms it prefixes."""
+        found = [(token, 1.0)] if token in self.postings else []
+        if len(token) < MIN_PREFIX:
+            return found
+        if self._terms_dirty:
+            self._terms = sorted(self.postings)
+            self._terms_dirty = False
+        i = bisect.bisect_right(self._terms, token)
+        while i < len(self._terms) and self._terms[i].startswith(token) and len(found) < MAX_EXPANSIONS:
+            found.append((self._terms[i], PREFIX_WEIGHT))
+            i += 1
+        return found
+
+    def search(self, query: str, limit: int = 20, accept=None) -> list:
+        """``[(key, score)]`` best first; ``accept(key)`` can restrict the keys considered."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.docs:
+            return []
+        n = len(self.docs)
+        avg_len = self._total_len / n or 1.0
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for term, weight in self._expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, tf in posting.items():
+                    if scores is not None and key not in scores:
+                        continue
+                    if accept is not None and not accept(key):
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.docs[key][1] / avg_len)
+                    s = weight * idf * tf * (BM25_K1 + 1) / norm
+                    if s > token_scores.get(key, 0.0):
+                        token_scores[key] = s
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {key: scores[key] + s for key, s in token_scores.items()}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda kv: (-kv[1], str(kv[0])))[:limit]
+
+
+class RecordSearch:
+    """Keeps a ``SearchIndex`` in step with several repositories.
+
+    ``sources`` maps a collection name to ``(repo, {field: weight})``. Before
+    each query every repository's ``version()`` is compared with the one last
+    indexed; on a change only the ids that appeared or disappeared are read,
+    so submissions, approvals and imports - from any worker process - are
+    searchable on the next query without rescanning the files.
+    """
+
+    def __init__(self, sources: dict):
+        self.sources = sources
+        self.index = SearchIndex()
+        self._versions = {}
+        self._ids = {name: set() for name in sources}
+        self._lock = threading.Lock()
+
+    def _parts(self, name: str, rec: dict) -> list:
+        return [(rec.get(field), weight) for field, weight in self.sources[name][1].items()]
+
+    def _sync(self, name: str):
+        repo = self.sources[name][0]
+        version = repo.version()
+        if self._versions.get(name) == version:
+            return
+        current = set(repo.ids())
+        known = self._ids[name]
+        for rid in known - current:
+            self.index.remove((name, rid))
+        for rid in current - known:
+            rec = repo.get(rid)
+            if rec is not None:
+                self.index.add((name, rid), self._parts(name, rec))
+        self._ids[name] = current
+        self._versions[name] = version
+
+    def sync(self):
+        with self._lock:
+            for name in self.sources:
+                self._sync(name)
+
+    def search(self, query: str, collections=None, limit: int = 20) -> list:
+        """``[{'collection', 'id', 'score', 'record'}]`` best first."""
+        collections = [c for c in (collections or self.sources) if c in self.sources]
+        with self._lock:
+            for name in collections:
+                self._sync(name)
+            wanted = set(collections)
+            hits = self.index.search(query, limit=limit, accept=lambda key: key[0] in wanted)
+        results = []
+        for (name, rid), score in hits:
+            rec = self.sources[name][0].get(rid)
+            if rec is not None:
+                results.append({'collection': name, 'id': rid, 'score': round(score, 4), 'record': rec})
+        return results
+
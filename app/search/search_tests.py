@@ -0,0 +1,39 @@
+from app.search.index import RecordSearch, SearchIndex, tokenize
+from app.storage.journal import Journal
+from app.storage.repository import Repository
+
+
+def test_tokenize_english_and_telugu():
+    assert tokenize('Pray for my MOTHER, a.b@x.com') == ['pray', 'for', 'my', 'mother', 'a', 'b', 'x', 'com']
+    # Vowel signs and the virama stay inside the word; zero-width joiners are dropped.
+    assert tokenize('ప్రార్థన\u200cకోసం 9876543210') == ['ప్రార్థనకోసం', '9876543210']
+    assert tokenize('౧౨౩') == ['123']
+
+
+def test_prefix_matching_and_ranking():
+    index = SearchIndex()
+    index.add(1, [('Ravi Kumar', 3.0), ('Teacher', 1.0)])
+    index.add(2, [('Sunita', 3.0), ('Ravipadu village', 1.0)])
+    index.add(3, [('ప్రార్థన కోసం', 1.0)])
+    assert [k for k, _ in index.search('ravi')] == [1, 2]
+    assert [k for k, _ in index.search('ravi teach')] == [1]
+    assert [k for k, _ in index.search('ప్రార్')] == [3]
+    assert index.search('r') == []
+    index.remove(1)
+    assert [k for k, _ in index.search('ravi')] == [2]
+
+
+def test_record_search_follows_repository_writes(tmp_path):
+    prayers = Repository(Journal(str(tmp_path / 'prayers.jsonl')))
+    members = Repository(Journal(str(tmp_path / 'members.jsonl')))
+    search = RecordSearch({'prayers': (prayers, {'text': 1.0, 'name': 2.0}),
+                           'memberships': (members, {'name': 3.0, 'phone': 2.0})})
+    prayers.add({'name': 'Anil', 'text': 'Healing for my mother'})
+    members.add({'name': 'Anitha', 'phone': '9876543210'})
+    assert [(r['collection'], r['id']) for r in search.search('ani')] == [('memberships', 1), ('prayers', 1)]
+    assert search.search('98765', ['memberships'])[0]['record']['name'] == 'Anitha'
+    assert search.search('healing', ['memberships']) == []
+    prayers.remove(1)
+    prayers.add({'name': 'Guest', 'text': 'స్వస్థత కొరకు'})
+    assert search.search('healing') == []
+    assert search.search('స్వస్థ')[0]['id'] == 2
@@ -0,0 +1,182 @@
+import bisect
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from app.storage.files import FileLock, atomic_write_json, load_json
+from app.storage.journal import sort_key
+
+# YouTube video ids are 11 characters today; accept a little slack either way.
+_VIDEO_RE = re.compile(r'^[A-Za-z0-9_-]{6,20}$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+FIELDS = ('video', 'title', 'date', 'series', 'speaker', 'thumb')
+# Serialized pages kept per catalog version (distinct filter/page combinations).
+MAX_CACHED_PAGES = 128
+
+
+def _from_file(data) -> list:
+    """Records from ``sermons.json``, numbering entries written by hand.
+
+    The file started out as ``[{"id": "<youtube id>", "title": ...}]``; those
+    entries keep their video under ``video`` and get an integer ``id`` like
+    everything else, so cursors and admin updates can address them.
+    """
+    records = [dict(r) for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+    used = {r['id'] for r in records if isinstance(r.get('id'), int) and not isinstance(r.get('id'), bool)}
+    next_id = max(used) + 1 if used else 1
+    seen = set()
+    for rec in records:
+        rid = rec.get('id')
+        if isinstance(rid, str) and not rec.get('video'):
+            rec['video'] = rid
+        if not isinstance(rid, int) or isinstance(rid, bool) or rid in seen:
+            rec['id'] = next_id
+            next_id += 1
+        seen.add(rec['id'])
+    return records
+
+
+def clean_entry(data: dict) -> dict:
+    """The known fields of an admin-submitted entry; raises ValueError if unusable."""
+    entry = {f: str(data[f]).strip() for f in FIELDS if data.get(f) not in (None, '')}
+    if not _VIDEO_RE.match(entry.get('video', '')):
+        raise ValueError('video must be a YouTube video id')
+    if 'date' in entry and not _DATE_RE.match(entry['date']):
+        raise ValueError('date must be YYYY-MM-DD')
+    return entry
+
+
+class SermonCatalog:
+    """The curated sermon list in ``sermons.json``, parsed once per change.
+
+    Readers get the records from memory, sorted by ``(date, id)``; the file's
+    stat is checked on each read, so an update from any worker process is
+    picked up on that worker's next request. ``iter_ordered`` matches the
+    repositories' signature, so ``app.storage.query.page`` paginates it.
+    Serialized responses can be memoized with ``cached``; they are dropped
+    whenever the catalog changes.
+    """
+
+    order_by = 'date'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = None
+        self._records = {}
+        self._order = []
+        self._pages = OrderedDict()
+
+    def version(self) -> tuple:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (self.path, None)
+        return (self.path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        version = self.version()
+        with self._lock:
+            if version == self._version:
+                return
+        # Parsed outside the lock; a write racing with this costs one more reload.
+        records = _from_file(load_json(self.path, []))
+        order = sorted((sort_key(r.get(self.order_by)), r['id']) for r in records)
+        with self._lock:
+            self._records = {r['id']: r for r in records}
+            self._order = order
+            self._version = version
+            self._pages.clear()
+
+    def __len__(self):
+        self._refresh()
+        return len(self._records)
+
+    def get(self, rid: int):
+        self._refresh()
+        return self._records.get(rid)
+
+    def list(self) -> list:
+        """Newest first."""
+        self._refresh()
+        with self._lock:
+            return [self._records[rid] for _key, rid in reversed(self._order)]
+
+    def iter_ordered(self, lo=None, hi=None, after=None, descending: bool = False, eq=None):
+        """Records sorted by ``(date, id)``; same bounds as ``Journal.iter_ordered``."""
+        self._refresh()
+        with self._lock:
+            order, records = self._order, self._records
+        if descending:
+            if after is not None:
+                end = bisect.bisect_left(order, (sort_key(after[0]), after[1]))
+            elif hi is not None:
+                end = bisect.bisect_right(order, (sort_key(hi), math.inf))
+            else:
+                end = len(order)
+            lo_key = sort_key(lo) if lo is not None else None
+            for key, rid in reversed(order[:end]):
+                if lo_key is not None and key < lo_key:
+                    return
+                yield records[rid]
+        else:
+            if after is not None:
+                start = bisect.bisect_right(order, (sort_key(after[0]), after[1]))
+            elif lo is not None:
+                start = bisect.bisect_left(order, (sort_key(lo),))
+            else:
+                start = 0
+            hi_key = sort_key(hi) if hi is not None else None
+            for key, rid in order[start:]:
+                if hi_key is not None and key > hi_key:
+                    return
+                yield records[rid]
+
+    def cached(self, key, build):
+        """``build()`` memoized under ``key`` until the catalog next changes."""
+        self._refresh()
+        with self._lock:
+            version = self._version
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return self._pages[key]
+        value = build()
+        with self._lock:
+            if self._version == version:
+                self._pages[key] = value
+                while len(self._pages) > MAX_CACHED_PAGES:
+                    self._pages.popitem(last=False)
+        return value
+
+    def upsert(self, entries: list) -> list:
+        """Add entries, or update the one with the same ``id`` or ``video``; returns the saved records."""
+        with FileLock(self.path):
+            records = _from_file(load_json(self.path, []))
+            by_id = {r['id']: r for r in records}
+            by_video = {r.get('video'): r for r in records}
+            next_id = max(by_id, default=0) + 1
+            saved = []
+            for entry in entries:
+                rec = by_id.get(entry.get('id')) or by_video.get(entry.get('video'))
+                if rec is None:
+                    rec = {'id': next_id}
+                    next_id += 1
+                    records.append(rec)
+                    by_id[rec['id']] = rec
+                rec.update({k: v for k, v in entry.items() if k != 'id'})
+                by_video[rec['video']] = rec
+                saved.append(dict(rec))
+            atomic_write_json(self.path, records)
+        return saved
+
+    def remove(self, rid: int):
+        """Delete a record and return it, or None if it does not exist."""
+        with FileLock(self.path):
+            records = _from_file(load_json(self.path, []))
+            keep = [r for r in records if r['id'] != rid]
+            if len(keep) == len(records):
+                return None
+            atomic_write_json(self.path, keep)
+        return next(r for r in records if r['id'] == rid)
@@ -0,0 +1,44 @@
+import json
+
+from app.sermons.catalog import SermonCatalog, clean_entry
+from app.storage.query import PageQuery, page
+
+
+def _catalog(tmp_path, data):
+    path = tmp_path / 'sermons.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return SermonCatalog(str(path))
+
+
+def test_legacy_entries_get_numbered_and_upsert_matches_video(tmp_path):
+    catalog = _catalog(tmp_path, [{'id': 'abcdefghijk', 'title': 'Old'}])
+    assert catalog.list() == [{'id': 1, 'video': 'abcdefghijk', 'title': 'Old'}]
+    catalog.upsert([clean_entry({'video': 'abcdefghijk', 'date': '2025-01-05'}),
+                    clean_entry({'video': 'BBBBBBBBBBB', 'title': 'New', 'date': '2025-02-02'})])
+    assert [(s['id'], s['video'], s['date']) for s in catalog.list()] == [
+        (2, 'BBBBBBBBBBB', '2025-02-02'), (1, 'abcdefghijk', '2025-01-05')]
+    assert catalog.remove(2)['title'] == 'New' and catalog.remove(2) is None
+
+
+def test_pages_and_filters(tmp_path):
+    catalog = _catalog(tmp_path, [
+        {'id': i, 'video': f'video{i:06d}', 'date': f'2025-10-{i:02d}', 'series': 'Romans' if i % 2 else 'Psalms'}
+        for i in range(1, 8)
+    ])
+    first = page(catalog, PageQuery.from_args({'limit': '3'}), 'date')
+    assert [s['id'] for s in first['items']] == [7, 6, 5]
+    rest = page(catalog, PageQuery.from_args({'limit': '3', 'cursor': first['next_cursor']}), 'date')
+    assert [s['id'] for s in rest['items']] == [4, 3, 2]
+    query = PageQuery.from_args({'series': 'romans', 'from': '2025-10-02', 'to': '2025-10-05'},
+                                eq_fields=('series', 'speaker'))
+    assert [s['id'] for s in page(catalog, query, 'date')['items']] == [5, 3]
+
+
+def test_cached_values_dropped_on_change(tmp_path):
+    catalog = _catalog(tmp_path, [])
+    calls = []
+    build = lambda: calls.append(1) or len(catalog)
+    assert catalog.cached('all', build) == 0 and catalog.cached('all', build) == 0
+    assert len(calls) == 1
+    catalog.upsert([clean_entry({'video': 'AAAAAAAAAAA'})])
+    assert catalog.cached('all', build) == 1 and len(calls) == 2
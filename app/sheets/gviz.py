@@ -0,0 +1,189 @@
+import json
+import logging
+import re
+import threading
+import time
+
+from app.storage.cache import CacheEntry
+from app.storage.files import FileLock, atomic_write_json, load_json
+
+log = logging.getLogger(__name__)
+
+GVIZ_URL = 'https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?gid={gid}'
+# GViz encodes date cells as "Date(2024,0,31)" (0-based month) next to the sheet's formatted text.
+_DATE_RE = re.compile(r'^Date\((\d+),(\d+),(\d+)')
+
+
+def parse_gviz(text: str) -> dict:
+    """The JSON inside GViz's ``google.visualization.Query.setResponse(...)`` wrapper."""
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end < start:
+        raise ValueError('Not a GViz response')
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        raise ValueError('Not a GViz response')
+    if data.get('status') == 'error':
+        errors = data.get('errors') or [{}]
+        raise ValueError(errors[0].get('detailed_message') or errors[0].get('message') or 'GViz error')
+    if not isinstance(data.get('table'), dict):
+        raise ValueError('GViz response has no table')
+    return data
+
+
+def _cell(cell):
+    if not cell:
+        return ''
+    v = cell.get('v')
+    if v is None:
+        return cell.get('f') or ''
+    if isinstance(v, str):
+        m = _DATE_RE.match(v)
+        if m:
+            if cell.get('f'):
+                return cell['f']
+            y, mo, d = map(int, m.groups())
+            return f'{y:04d}-{mo + 1:02d}-{d:02d}'
+        return v.strip()
+    if isinstance(v, float) and v.is_integer():
+        # Phone numbers and years come back as 9876543210.0
+        return int(v)
+    return v
+
+
+def normalize_table(data: dict) -> dict:
+    """``{'columns': [label], 'rows': [{label: value}]}``; empty rows are dropped."""
+    table = data['table']
+    columns = [(c.get('label') or '').strip() or c.get('id') or f'c{i}'
+               for i, c in enumerate(table.get('cols') or [])]
+    rows = []
+    for row in table.get('rows') or []:
+        cells = (row or {}).get('c') or []
+        values = [_cell(cells[i]) if i < len(cells) else '' for i in range(len(columns))]
+        if any(v != '' for v in values):
+            rows.append(dict(zip(columns, values)))
+    return {'columns': columns, 'rows': rows}
+
+
+class HttpGvizSource:
+    """A public sheet's GViz endpoint, fetched over a pooled ``requests`` session."""
+
+    def __init__(self, url: str, session=None, timeout: float = 10.0):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+
+    def fetch(self) -> str:
+        resp = self.session.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.text
+
+
+class FileGvizSource:
+    """A saved GViz response on disk, standing in for the sheet in tests and offline development."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> str:
+        with open(self.path, 'r', encoding='utf-8') as fh:
+            return fh.read()
+
+
+class SheetMirror:
+    """A normalized snapshot of a Google Sheet, refreshed in the background.
+
+    The snapshot lives in ``path`` so it survives restarts and is shared by
+    all worker processes: a refresh takes the file's lock and only fetches if
+    no other worker did so within ``max_age``. ``get`` never waits for the
+    sheet once a snapshot exists; if it is older than ``max_age`` a refresh
+    is started in the background and the stale copy is served meanwhile.
+    A failed fetch keeps the last good snapshot.
+    """
+
+    def __init__(self, source, path: str, max_age: float = 300, clock=time.time):
+        self.source = source
+        self.path = path
+        self.max_age = max_age
+        self.clock = clock
+        self.last_error = None
+        self._entry = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self):
+        """Pick up the snapshot on disk if it changed; returns it (or None)."""
+        snap = load_json(self.path, None)
+        if not snap:
+            return None
+        entry = self._entry
+        if entry is None or entry.version != snap['fetched_at']:
+            body = json.dumps({'columns': snap['columns'], 'rows': snap['rows'], 'count': len(snap['rows'])},
+                              ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._entry = CacheEntry(snap['fetched_at'], snap, body)
+        return snap
+
+    def refresh(self, force: bool = False) -> bool:
+        """Fetch the sheet unless a fresh snapshot exists; False if the fetch failed."""
+        try:
+            with FileLock(self.path):
+                snap = self._load()
+                if not force and snap and self.clock() - snap['fetched_at'] < self.max_age:
+                    return True
+                table = normalize_table(parse_gviz(self.source.fetch()))
+                atomic_write_json(self.path, dict(table, fetched_at=self.clock()))
+                self._load()
+            self.last_error = None
+            return True
+        except Exception as e:
+            log.warning('sheet refresh failed: %s', e)
+            self.last_error = str(e)
+            return False
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, name='sheet-refresh', daemon=True).start()
+
+    def get(self):
+        """``CacheEntry`` for the current snapshot (body is the JSON response), or None."""
+        entry = self._entry
+        if entry is None:
+            # First request in this worker: read the shared snapshot, or fetch it now.
+            with FileLock(self.path):
+                self._load()
+            if self._entry is None:
+                self.refresh()
+            return self._entry
+        if self.clock() - entry.version >= self.max_age:
+            self._refresh_in_background()
+        return entry
+
+    def start(self, interval: float):
+        """Refresh every ``interval`` seconds in a daemon thread (0 disables)."""
+        if self._thread is not None or interval <= 0:
+            return
+
+        def run():
+            while True:
+                self.refresh()
+                if self._stop.wait(interval):
+                    return
+        self._thread = threading.Thread(target=run, name='sheet-mirror', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
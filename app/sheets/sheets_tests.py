@@ -0,0 +1,69 @@
+import json
+import time
+
+import pytest
+
+from app.sheets.gviz import SheetMirror, normalize_table, parse_gviz
+
+
+def gviz(names):
+    table = {
+        'cols': [{'id': 'A', 'label': 'Name', 'type': 'string'}, {'id': 'B', 'label': 'Since', 'type': 'date'}],
+        'rows': [{'c': [{'v': n}, {'v': 'Date(2020,0,5)'}]} for n in names] + [{'c': [None, None]}],
+    }
+    return '/*O_o*/\ngoogle.visualization.Query.setResponse(%s);' % json.dumps({'status': 'ok', 'table': table})
+
+
+class StandIn:
+    """Local replacement for the sheet: serves ``text`` or raises ``error``."""
+
+    def __init__(self, text):
+        self.text = text
+        self.error = None
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.text
+
+
+def test_parse_and_normalize():
+    table = normalize_table(parse_gviz(gviz(['Ravi', 'Sita'])))
+    assert table == {'columns': ['Name', 'Since'],
+                     'rows': [{'Name': 'Ravi', 'Since': '2020-01-05'}, {'Name': 'Sita', 'Since': '2020-01-05'}]}
+    with pytest.raises(ValueError):
+        parse_gviz('<html>Sign in</html>')
+    with pytest.raises(ValueError):
+        parse_gviz('setResponse({"status":"error","errors":[{"message":"Access denied"}]})')
+
+
+def test_snapshot_shared_and_kept_on_failure(tmp_path):
+    now = [1000.0]
+    source = StandIn(gviz(['Ravi']))
+    path = str(tmp_path / 'sheet.json')
+    a = SheetMirror(source, path, max_age=60, clock=lambda: now[0])
+    b = SheetMirror(source, path, max_age=60, clock=lambda: now[0])
+    first = a.get()
+    assert json.loads(first.body)['count'] == 1 and source.calls == 1
+    assert b.get().etag == first.etag and source.calls == 1
+    now[0] += 120
+    source.error = OSError('sheet timed out')
+    assert not a.refresh()
+    assert a.get().etag == first.etag and a.last_error == 'sheet timed out'
+
+
+def test_stale_snapshot_served_while_refreshing(tmp_path):
+    now = [1000.0]
+    source = StandIn(gviz(['Ravi']))
+    mirror = SheetMirror(source, str(tmp_path / 'sheet.json'), max_age=60, clock=lambda: now[0])
+    old = mirror.get()
+    source.text = gviz(['Ravi', 'Sita'])
+    now[0] += 61
+    assert mirror.get() is old
+    for _ in range(100):
+        if mirror.get() is not old:
+            break
+        time.sleep(0.01)
+    assert json.loads(mirror.get().body)['count'] == 2 and source.calls == 2
@@ -0,0 +1,46 @@
+import threading
+
+from flask import Flask
+
+# Everything flasgger serves: the UI, its static files, the OAuth redirect and the spec.
+DOCS_PREFIXES = ('/apidocs', '/apispec_1.json', '/flasgger_static', '/oauth2-redirect.html')
+
+
+class LazyDocs:
+    """WSGI middleware serving the Swagger UI for ``app`` from a separate Flask app.
+
+    flasgger registers its views when it is set up, which Flask only allows
+    before the first request; mounting it on its own app lets the import and
+    setup wait until someone opens ``/apidocs``. The spec still describes
+    ``app``: it is built inside ``app``'s application context.
+    """
+
+    def __init__(self, app: Flask, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.docs = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> Flask:
+        from flasgger import Swagger
+
+        site_app = self.app
+
+        class SiteSwagger(Swagger):
+            def get_apispecs(self, endpoint='apispec_1'):
+                with site_app.app_context():
+                    return super().get_apispecs(endpoint)
+
+        docs = Flask(__name__, static_folder=None)
+        docs.config.update(DEBUG=site_app.debug, SWAGGER=site_app.config.get('SWAGGER', {}))
+        SiteSwagger(docs)
+        return docs
+
+    def __call__(self, environ, start_response):
+        if not environ.get('PATH_INFO', '').startswith(DOCS_PREFIXES):
+            return self.wsgi_app(environ, start_response)
+        if self.docs is None:
+            with self._lock:
+                if self.docs is None:
+                    self.docs = self._build()
+        return self.docs(environ, start_response)
@@ -0,0 +1,185 @@
+import re
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, jsonify, request, session
+
+from app.site.site import site
+from app.storage.cache import cached_json_response
+from app.storage.query import PAGE_PARAMS, PageQuery, page
+
+ALLOWED_EXT = {'png', 'jpg', 'jpeg', 'gif', 'pdf'}
+
+
+def allowed_filename(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXT
+
+def validate_phone(phone: str) -> bool:
+    return bool(re.fullmatch(r"\d{10}", phone))
+
+def validate_aadhar(aadhar: str) -> bool:
+    if not aadhar:
+        return True
+    return bool(re.fullmatch(r"\d{12}", aadhar))
+
+def validate_email(email: str) -> bool:
+    if not email:
+        return True
+    return ('@' in email and '.' in email)
+
+def validate_membership_form(form: dict):
+    name = (form.get('memberName') or '').strip()
+    phone = (form.get('memberPhone') or '').strip()
+    email = (form.get('memberEmail') or '').strip()
+    aadhar = (form.get('memberAadhar') or '').strip()
+    if not name:
+        return False, 'Name is required'
+    if not validate_phone(phone):
+        return False, 'Phone must be 10 digits'
+    if not validate_email(email):
+        return False, 'Invalid email address'
+    if not validate_aadhar(aadhar):
+        return False, 'Aadhar must be 12 digits'
+    return True, None
+
+def validate_membership_record(rec: dict):
+    """validate_membership_form rules for a record-shaped dict (bulk import).
+    Accepts both record keys (name, phone, ...) and form keys (memberName, ...).
+    """
+    def val(*keys):
+        for k in keys:
+            v = rec.get(k)
+            if v not in (None, ''):
+                return str(v)
+        return ''
+    return validate_membership_form({
+        'memberName': val('name', 'memberName'),
+        'memberPhone': val('phone', 'memberPhone'),
+        'memberEmail': val('email', 'memberEmail'),
+        'memberAadhar': val('aadhar', 'memberAadhar'),
+    })
+
+def require_admin_token():
+    admin_token = current_app.config['ADMIN_TOKEN']
+    if not admin_token:
+        # No token set -> do not enforce (development convenience)
+        return True
+    token = request.headers.get('X-Admin-Token', '')
+    return token == admin_token
+
+def is_admin_request() -> bool:
+    """True for an admin session or a matching X-Admin-Token (never just because no token is set)."""
+    u = session.get('user')
+    if u and u.get('admin'):
+        return True
+    admin_token = current_app.config['ADMIN_TOKEN']
+    return bool(admin_token) and request.headers.get('X-Admin-Token', '') == admin_token
+
+def rate_limited(rule: str):
+    """Reject with 429 + Retry-After once the client's bucket for ``rule`` is empty; admins are exempt."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            limit = site.rate_limits.get(rule)
+            if limit and not is_admin_request():
+                allowed, retry_after = site.rate_limiter.hit(f'{rule}:{request.remote_addr}', *limit)
+                if not allowed:
+                    resp = jsonify(success=False, message='Too many requests, please try again later')
+                    resp.status_code = 429
+                    resp.headers['Retry-After'] = str(retry_after)
+                    return resp
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def list_response(repo, order_by: str, eq_fields=('baptized', 'blood_group'), dates: bool = True):
+    """Full cached list, or one keyset page when any paging/filter arg is given."""
+    if not any(k in request.args for k in PAGE_PARAMS):
+        return cached_json_response(site.read_cache, repo)
+    try:
+        query = PageQuery.from_args(request.args, eq_fields=eq_fields, dates=dates)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    return jsonify(page(repo, query, order_by))
+
+def is_admin_email(email: str) -> bool:
+    admin_emails = current_app.config['ADMIN_EMAILS']
+    return (email or '').strip().lower() in admin_emails if admin_emails else False
+
+def append_login_log(email: str, name: str):
+    """Record an admin login; the session id is kept so logout closes this session."""
+    try:
+        session['login_sid'] = site.login_log.append(email, name)
+    except Exception:
+        pass
+
+def close_last_login_log(email: str):
+    try:
+        site.login_log.close_last(email, session.get('login_sid'))
+    except Exception:
+        pass
+
+
+def record_epoch(value):
+    """Seconds since the epoch for a record's ts (seconds or JS milliseconds) or ISO timestamp."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '')).timestamp()
+    except ValueError:
+        return None
+
+def batch_ids(repo, field: str, data: dict) -> list:
+    """Ids named in a batch body: ``ids``, or every record whose ``field`` is before ``older_than``."""
+    if data.get('older_than'):
+        cutoff = record_epoch(data['older_than'])
+        if cutoff is None:
+            raise ValueError('older_than must be an ISO date or time')
+        # A range scan of the repo's order: ts holds epoch seconds or JS
+        # milliseconds, the other fields ISO strings in record_epoch's local time.
+        if field == 'ts':
+            ranges = ((None, cutoff), (1e11, cutoff * 1000))
+        else:
+            ranges = ((None, datetime.fromtimestamp(cutoff).isoformat()),)
+        stamps = ((r['id'], record_epoch(r.get(field))) for lo, hi in ranges for r in repo.iter_ordered(lo=lo, hi=hi))
+        return sorted(rid for rid, ts in stamps if ts is not None and ts < cutoff)
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError('Provide ids (list of integers) or older_than')
+    return ids
+
+def batch_moderate(pending, approved, field: str, on_reject=None):
+    """Approve or reject many pending records with one write per file.
+
+    Body: {"action": "approve"|"reject", "ids": [...]} or {"action": ..., "older_than": "YYYY-MM-DD"}.
+    Returns per-id outcomes: approved (with the new id), rejected or not_found.
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in ('approve', 'reject'):
+        return jsonify(success=False, message='action must be approve or reject'), 400
+    try:
+        ids = batch_ids(pending, field, data)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    results = []
+    if action == 'approve':
+        for rid, rec in pending.move_many(ids, approved).items():
+            results.append({'id': rid, 'status': 'approved', 'approved_id': rec['id']} if rec
+                           else {'id': rid, 'status': 'not_found'})
+    else:
+        removed = pending.remove_many(ids)
+        if on_reject is not None:
+            on_reject([rec for rec in removed.values() if rec])
+        for rid, rec in removed.items():
+            results.append({'id': rid, 'status': 'rejected' if rec else 'not_found'})
+    done = sum(1 for r in results if r['status'] != 'not_found')
+    return jsonify(success=True, action=action, count=done, not_found=len(results) - done, results=results)
+
+def release_uploads(entries: list):
+    """Queue one job that releases the uploads of the rejected ``entries``."""
+    names = [name for entry in entries for name in ((entry or {}).get('upload_names') or {}).values()]
+    if names:
+        site.jobs.submit('release_uploads', names=names)
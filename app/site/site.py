@@ -0,0 +1,272 @@
+"""The church site's services for one Flask app, each built on first use.
+
+Nothing here opens files, imports pypdf, SQLAlchemy, cryptography or
+requests, or starts a thread when the app is created. ``warm`` builds the
+read-mostly services (built pages, static file index, songbook, sermons) so a
+preloading server (``gunicorn --preload``) shares them copy-on-write with its
+workers. Services that hold open files, sockets, SQLite connections, locks
+or threads are per process: a forked worker drops them and builds its own
+on first use, and background threads start with the first request each
+process serves.
+"""
+import gc
+import os
+import threading
+import weakref
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+PRAYER_SEARCH_FIELDS = {'name': 2.0, 'text': 1.0}
+MEMBER_SEARCH_FIELDS = {'name': 3.0, 'phone': 2.0, 'email': 2.0, 'address': 1.0, 'occupation': 1.0}
+MEMBERS_SHEET = {'sheet_id': '1O8oWqIT-i8FmvOCMqCroA-axC9OHMqhJeRUbn_IoDZ4', 'gid': '399213448'}
+SONGBOOK_PDF = 'andhra_christava_keerthanalu.pdf'
+
+
+class _Service:
+    def __init__(self, build, shared: bool):
+        self.build = build
+        self.name = build.__name__
+        self.shared = shared
+        self.__doc__ = build.__doc__
+
+    def __get__(self, site, owner=None):
+        if site is None:
+            return self
+        try:
+            return site._services[self.name]
+        except KeyError:
+            pass
+        with site._lock:
+            if self.name not in site._services:
+                site._services[self.name] = self.build(site)
+            return site._services[self.name]
+
+
+def service(shared: bool = False):
+    """``Site`` attribute built by the decorated method on first access.
+
+    ``shared`` services survive a fork; the others are rebuilt in the child.
+    """
+    def decorator(build):
+        return _Service(build, shared)
+    return decorator
+
+
+class Site:
+    """Services of the app's site, reached in views through the ``site`` proxy."""
+
+    def __init__(self, app):
+        self.app = app
+        self.config = app.config
+        self.metrics = None
+        self.profiler = None
+        self.handlers = {}
+        self._services = {}
+        self._lock = threading.RLock()
+        self._started = None
+        if hasattr(os, 'register_at_fork'):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._after_fork())
+
+    def _after_fork(self):
+        # Only the parent's threads are gone; its read-only data stays shared.
+        self._lock = threading.RLock()
+        self._started = None
+        shared = {name for name, attr in vars(type(self)).items() if isinstance(attr, _Service) and attr.shared}
+        self._services = {name: s for name, s in self._services.items() if name in shared}
+
+    def _dir(self, key: str) -> str:
+        path = self.config[key]
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @property
+    def built(self) -> set:
+        """Names of the services this process has built so far."""
+        return set(self._services)
+
+    # Read-mostly, shared with forked workers
+
+    @service(shared=True)
+    def assets(self):
+        """Fingerprinted, precompressed copies of pages/CSS/JS in dist/ (rebuilt when sources change)."""
+        from app.assets.pipeline import AssetPipeline
+        assets = AssetPipeline(self.config['BASE_DIR'], os.path.join(self.config['BASE_DIR'], 'dist'))
+        assets.ensure()
+        return assets
+
+    @service(shared=True)
+    def static_index(self):
+        """Allow-listed index of the servable files."""
+        from app.assets.static_index import StaticIndex
+        return StaticIndex(self.config['BASE_DIR'])
+
+    @service(shared=True)
+    def songbook(self):
+        """Song number -> pages of the songbook PDF, indexed into data/songbook/."""
+        from app.songbook.songbook import Songbook
+        return Songbook(os.path.join(self.config['BASE_DIR'], SONGBOOK_PDF),
+                        os.path.join(self.config['DATA_DIR'], 'songbook'))
+
+    @service(shared=True)
+    def sermons(self):
+        """Sermon videos from data/sermons.json, parsed once per change."""
+        from app.sermons.catalog import SermonCatalog
+        return SermonCatalog(os.path.join(self._dir('DATA_DIR'), 'sermons.json'))
+
+    # Per process
+
+    @service()
+    def store(self):
+        """Memberships, prayers and both pending queues (journal files or SQLite)."""
+        if self.config['STORAGE_BACKEND'] == 'sqlite':
+            from app.db.repository import SqlStore, create_tables
+            with self.app.app_context():
+                create_tables(self.app)
+            return SqlStore()
+        from app.storage.repository import Store
+        return Store(self._dir('DATA_DIR'))
+
+    @service()
+    def blob_store(self):
+        """Uploads, stored once per content hash under uploads/blobs/."""
+        from app.storage.blobs import BlobStore
+        return BlobStore(self._dir('UPLOAD_DIR'))
+
+    @service()
+    def derivatives(self):
+        """Resized/WebP copies for /uploads/<name>?w=, bounded LRU on disk."""
+        from app.media.derivatives import DerivativeCache
+        return DerivativeCache(os.path.join(self._dir('UPLOAD_DIR'), 'derivatives'),
+                               max_bytes=self.config['DERIVATIVE_CACHE_MB'] * 1024 * 1024)
+
+    @service()
+    def jobs(self):
+        """Durable job queue in data/jobs.jsonl (thumbnails, exports)."""
+        from app.jobs.queue import JobQueue
+        from app.media.derivatives import warm_derivatives
+        jobs = JobQueue(os.path.join(self._dir('DATA_DIR'), 'jobs.jsonl'),
+                        workers=self.config['JOB_WORKERS'], processes=self.config['JOB_PROCESSES'],
+                        retention_seconds=self.config['JOB_RETENTION_HOURS'] * 3600)
+        jobs.register('derivatives', warm_derivatives, process=True)
+        jobs.register('release_uploads', self._release_uploads)
+        for kind, (fn, process) in self.handlers.items():
+            jobs.register(kind, fn, process=process)
+        return jobs
+
+    @service()
+    def google_verifier(self):
+        """Google sign-in: certs cached per their max-age, verified tokens memoized until exp."""
+        from app.auth.google import GoogleTokenVerifier, HttpJwksSource, StaticJwksSource
+        jwks_file = self.config['GOOGLE_JWKS_FILE']
+        return GoogleTokenVerifier(self.config['GOOGLE_CLIENT_ID'],
+                                   StaticJwksSource.from_file(jwks_file) if jwks_file else HttpJwksSource())
+
+    @service()
+    def rate_limiter(self):
+        """Token buckets in one SQLite file shared by all workers."""
+        from app.limits.limiter import TokenBucketLimiter
+        return TokenBucketLimiter(os.path.join(self._dir('DATA_DIR'), 'ratelimit.sqlite3'))
+
+    @service()
+    def rate_limits(self):
+        """Parsed RATE_LIMIT_* settings by rule name."""
+        from app.limits.limiter import parse_rate
+        return {'prayer': parse_rate(self.config['RATE_LIMIT_PRAYER']),
+                'membership': parse_rate(self.config['RATE_LIMIT_MEMBERSHIP'])}
+
+    @service()
+    def search(self):
+        """Admin search: in-memory inverted index, caught up with each collection's writes."""
+        from app.search.index import RecordSearch
+        store = self.store
+        return RecordSearch({
+            'prayers': (store.prayers, PRAYER_SEARCH_FIELDS),
+            'pending_prayers': (store.pending_prayers, PRAYER_SEARCH_FIELDS),
+            'memberships': (store.memberships, MEMBER_SEARCH_FIELDS),
+            'pending_memberships': (store.pending_members, MEMBER_SEARCH_FIELDS),
+        })
+
+    @service()
+    def members_sheet(self):
+        """The public members Google Sheet, mirrored into data/members_sheet.json."""
+        from app.sheets.gviz import GVIZ_URL, FileGvizSource, HttpGvizSource, SheetMirror
+        sheet_file = self.config['MEMBERS_SHEET_FILE']
+        source = (FileGvizSource(sheet_file) if sheet_file
+                  else HttpGvizSource(self.config['MEMBERS_SHEET_URL'] or GVIZ_URL.format(**MEMBERS_SHEET)))
+        return SheetMirror(source, os.path.join(self._dir('DATA_DIR'), 'members_sheet.json'),
+                           max_age=self.config['MEMBERS_SHEET_REFRESH'] or 300)
+
+    @service()
+    def read_cache(self):
+        """Parsed lists + serialized bodies for the admin list endpoints, revalidated by stat."""
+        from app.storage.cache import ReadCache
+        return ReadCache()
+
+    @service()
+    def login_log(self):
+        """Admin logins: rotating event log with per-admin/per-day totals (or the login_logs table)."""
+        if self.config['STORAGE_BACKEND'] == 'sqlite':
+            return self.store.login_logs
+        from app.storage.eventlog import LoginEventLog
+        data_dir = self._dir('DATA_DIR')
+        return LoginEventLog(data_dir,
+                             max_bytes=self.config['LOGIN_LOG_MAX_KB'] * 1024,
+                             max_age_seconds=self.config['LOGIN_LOG_MAX_DAYS'] * 86400,
+                             legacy_path=os.path.join(data_dir, 'login_logs.json'))
+
+    def register_job(self, kind: str, fn, process: bool = False):
+        """Add a job handler; registered with the queue whenever it is built."""
+        with self._lock:
+            self.handlers[kind] = (fn, process)
+            if 'jobs' in self._services:
+                self._services['jobs'].register(kind, fn, process=process)
+
+    def _release_uploads(self, names: list) -> dict:
+        """Job handler: drop one reference to each upload of rejected submissions."""
+        for saved_name in names:
+            self.blob_store.release(saved_name)
+        return {'released': len(names)}
+
+    def warm(self):
+        """Build the shared services and freeze the heap, before workers are forked."""
+        self.assets
+        self.static_index
+        self.songbook.ensure()
+        self.sermons
+        # Objects made so far are never collected, so the collector does not
+        # touch (and un-share) their pages in the workers.
+        gc.freeze()
+
+    def refresh_static(self):
+        """Rescan the servable files and rebuild dist/ if a source changed (on SIGHUP)."""
+        self.static_index.refresh()
+        self.assets.ensure()
+
+    def start(self):
+        """Start this process's background threads; a no-op after the first call per process."""
+        if self._started == os.getpid():
+            return
+        with self._lock:
+            if self._started == os.getpid():
+                return
+            self._started = os.getpid()
+            self.jobs.start()
+            self.static_index.start_watcher(self.config['STATIC_WATCH_SECONDS'], on_change=self.assets.ensure)
+            if self.config['MEMBERS_SHEET_REFRESH'] > 0:
+                self.members_sheet.start(self.config['MEMBERS_SHEET_REFRESH'])
+            if self.metrics is not None:
+                self.metrics.start(self.config['METRICS_FLUSH_SECONDS'])
+
+    def stop(self):
+        """Stop the background work this process started (tests, benchmarks)."""
+        for name in ('jobs', 'members_sheet'):
+            svc = self._services.get(name)
+            if svc is not None:
+                svc.stop()
+        if self.metrics is not None:
+            self.metrics.stop()
+
+
+site = LocalProxy(lambda: current_app.extensions['site'])
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from PIL import Image
+
+from app.app import create_app
+from app.bench.startup import HEAVY_MODULES, over_budget
+from app.site.helpers import batch_ids, record_epoch
+from app.storage.repository import open_repository
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def site_env(monkeypatch, tmp_path):
+    for key, value in {'DATA_DIR': str(tmp_path / 'data'), 'UPLOAD_DIR': str(tmp_path / 'uploads'),
+                       'STATIC_WATCH_SECONDS': '0', 'MEMBERS_SHEET_REFRESH': '0',
+                       'METRICS_FLUSH_SECONDS': '0', 'RATE_LIMIT_PRAYER': 'off', 'ADMIN_TOKEN': ''}.items():
+        monkeypatch.setenv(key, value)
+    return tmp_path
+
+
+def test_create_app_builds_nothing_heavy(site_env):
+    # A fresh interpreter: this test process has imported most of the app already.
+    child = textwrap.dedent('''
+        import json, sys
+        from app.app import create_app
+        app = create_app('production')
+        print(json.dumps({'built': sorted(app.extensions['site'].built), 'modules': sorted(sys.modules)}))
+    ''')
+    out = subprocess.run([sys.executable, '-c', child], cwd=BASE_DIR, check=True, stdout=subprocess.PIPE).stdout
+    report = json.loads(out.decode('utf-8').strip().splitlines()[-1])
+    assert report['built'] == []
+    assert [m for m in HEAVY_MODULES if m in report['modules']] == []
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_forked_worker_keeps_shared_services_and_rebuilds_the_rest(site_env):
+    app = create_app('testing')
+    site = app.extensions['site']
+    sermons = site.sermons
+    site.store
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            ok = (site.built == {'sermons'} and site.sermons is sermons
+                  and app.test_client().post('/submit/prayer', json={'text': 'child'}).status_code == 200)
+            site.stop()
+            status = 0 if ok else 1
+        finally:
+            os._exit(status)
+    try:
+        resp = app.test_client().post('/submit/prayer', json={'text': 'parent'})
+        assert resp.status_code == 200
+        _, status = os.waitpid(pid, 0)
+        assert status == 0
+        texts = [p['text'] for p in app.test_client().get('/api/pending-prayers').get_json()]
+        assert sorted(texts) == ['child', 'parent']
+    finally:
+        site.stop()
+
+
+def test_static_watcher_is_off_unless_developing(site_env, monkeypatch):
+    monkeypatch.delenv('STATIC_WATCH_SECONDS')
+    assert create_app('production').config['STATIC_WATCH_SECONDS'] == 0
+    assert create_app('development').config['STATIC_WATCH_SECONDS'] == 2
+
+
+def _png() -> bytes:
+    buf = io.BytesIO()
+    Image.new('RGB', (40, 30), (0, 90, 0)).save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def test_membership_files_and_reject_cleanup_run_as_jobs(site_env, monkeypatch):
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('RATE_LIMIT_MEMBERSHIP', 'off')
+    app = create_app('testing')
+    site = app.extensions['site']
+    try:
+        client = app.test_client()
+        form = {'memberName': 'Ravi', 'memberPhone': '9876543210', 'memberEmail': 'ravi@example.com',
+                'memberAadhar': '123456789012',
+                'familyPhoto': (io.BytesIO(_png()), 'family.png'),
+                'memberSignature': (io.BytesIO(_png() + b'\0'), 'sign.png')}
+        assert client.post('/api/memberships', data=form).status_code == 200
+        jobs = list(site.jobs.journal.iter_records())
+        assert [(j['kind'], len(j['args']['src_paths'])) for j in jobs] == [('derivatives', 2)]
+
+        pending = site.store.pending_members.iter()
+        names = list(next(iter(pending))['upload_names'].values())
+        assert client.post('/api/pending-memberships/1/reject').status_code == 200
+        # The response does not wait for the blobs: they go once the job runs.
+        assert all(site.blob_store.resolve(name) for name in names)
+        assert [j['kind'] for j in site.jobs.journal.iter_records()] == ['derivatives', 'release_uploads']
+        assert site.jobs.run_pending() == 2
+        assert not any(site.blob_store.resolve(name) for name in names)
+    finally:
+        site.stop()
+
+
+def test_older_than_reads_a_range_of_the_order(tmp_path, monkeypatch):
+    prayers = open_repository(str(tmp_path), 'prayers', order_by='ts')
+    cutoff = record_epoch('2024-03-01')
+    prayers.add_many([{'ts': cutoff - 10}, {'ts': cutoff}, {'ts': (cutoff - 5) * 1000},
+                      {'ts': (cutoff + 5) * 1000}, {'text': 'no ts'}])
+    members = open_repository(str(tmp_path), 'members', order_by='timestamp')
+    members.add_many([{'timestamp': '2024-02-29T23:59:59Z'}, {'timestamp': '2024-03-01T00:00:00Z'},
+                      {'timestamp': '2024-03-02T08:00:00Z'}, {'timestamp': '2024-01-05T08:00:00.5Z'}])
+    for repo in (prayers, members):
+        monkeypatch.setattr(repo, 'iter', None)  # no full scans
+    assert batch_ids(prayers, 'ts', {'older_than': '2024-03-01'}) == [1, 3]
+    assert batch_ids(members, 'timestamp', {'older_than': '2024-03-01'}) == [1, 4]
+    with pytest.raises(ValueError):
+        batch_ids(members, 'timestamp', {'older_than': 'soon'})
+
+
+def test_over_budget_names_each_overrun():
+    report = {'import': 900, 'create_app': 20, 'warm': 100,
+              'first_request': {'/': 5, '/config': 400}, 'heavy_modules': ['pypdf']}
+    assert over_budget(report) == ['import: 900 ms (budget 800 ms)',
+                                   'first request /config: 400 ms (budget 300 ms)',
+                                   'create_app imported pypdf']
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+
+from app.assets.static_index import FileEntry
+from app.storage.files import FileLock, atomic_write_bytes, atomic_write_json, load_json
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional: without it the songbook endpoints answer 503
+    PdfReader = PdfWriter = None
+
+log = logging.getLogger(__name__)
+
+# A song starts on a line holding its number, alone or followed by the title
+# ("48 <title>", "619"); the page's printed number is always the first line.
+# The book is set in a legacy (non-Unicode) Telugu font, so the extracted title
+# and lyrics are unreadable glyph codes: only numbers and page ranges are kept.
+_HEADER_RE = re.compile(r'^(\d{1,3})(?:\s+(\S.*))?$')
+# Running footers start with the two facing page numbers ("87 88<section>").
+_FOOTER_RE = re.compile(r'^(\d{1,3})\s+(\d{1,3})(?!\d)')
+# A few headers are printed "238. <title>"; verse numbers never get this high.
+_DOTTED_RE = re.compile(r'^(\d{2,3})\.\s+(\S.*)$')
+# Song numbers are increasing; a candidate further ahead than this is a stray number.
+MAX_GAP = 5
+INDEX_VERSION = 2
+
+
+def _source_stamp(pdf_path: str) -> dict:
+    st = os.stat(pdf_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _clean(line: str) -> str:
+    return re.sub(r'\s+', ' ', line).strip()
+
+
+def parse_songs(pages) -> list:
+    """``[{number, page_start, page_end}]`` from the text of each page.
+
+    ``pages`` is a list of page texts; page numbers in the result are 0-based
+    PDF page indexes (inclusive range).
+    """
+    songs = []
+    last = 0
+    for page_no, text in enumerate(pages):
+        lines = [_clean(l) for l in text.splitlines()]
+        for i, line in enumerate(lines[1:], 1):
+            footer = _FOOTER_RE.match(line)
+            if footer and int(footer.group(2)) == int(footer.group(1)) + 1:
+                continue
+            m = _HEADER_RE.match(line)
+            if not (m and last < int(m.group(1)) <= last + MAX_GAP):
+                m = _DOTTED_RE.match(line)
+                if not (m and int(m.group(1)) == last + 1):
+                    continue
+            number = int(m.group(1))
+            if songs:
+                prev = songs[-1]
+                # The previous song ends on this page unless this header opens the page.
+                prev['page_end'] = page_no if i > 1 else max(prev['page_start'], page_no - 1)
+            songs.append({'number': number, 'page_start': page_no, 'page_end': page_no})
+            last = number
+    if songs:
+        songs[-1]['page_end'] = len(pages) - 1
+    return songs
+
+
+def build_index(pdf_path: str, out_dir: str) -> dict:
+    """Extract the song list from ``pdf_path`` into ``<out_dir>/index.json``."""
+    reader = PdfReader(pdf_path)
+    pages = [page.extract_text() or '' for page in reader.pages]
+    index = {
+        'version': INDEX_VERSION,
+        'source': _source_stamp(pdf_path),
+        'page_count': len(pages),
+        'songs': parse_songs(pages),
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    atomic_write_json(os.path.join(out_dir, 'index.json'), index)
+    return index
+
+
+class Songbook:
+    """Song number -> pages lookup and per-song PDF excerpts for the songbook PDF.
+
+    ``ensure`` loads ``<cache_dir>/index.json``, rebuilding it when the PDF
+    changed (normally done once at image build time). Excerpts hold only a
+    song's own pages and are written to ``<cache_dir>/pages`` on first request,
+    so later requests are a plain file send.
+    """
+
+    def __init__(self, pdf_path: str, cache_dir: str):
+        self.pdf_path = pdf_path
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.pages_dir = os.path.join(cache_dir, 'pages')
+        self.songs = {}
+        self.source = None
+
+    def ensure(self) -> bool:
+        """Load (building if stale) the index; False if the PDF or pypdf is missing."""
+        if PdfReader is None or not os.path.exists(self.pdf_path):
+            return False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with FileLock(self.index_path):
+            index = load_json(self.index_path, None)
+            if (not index or index.get('version') != INDEX_VERSION
+                    or index.get('source') != _source_stamp(self.pdf_path)):
+                log.info('building songbook index from %s', self.pdf_path)
+                index = build_index(self.pdf_path, self.cache_dir)
+        self.songs = {s['number']: s for s in index['songs']}
+        self.source = index['source']
+        return True
+
+    def get(self, number: int):
+        return self.songs.get(number)
+
+    def list(self) -> list:
+        return [self.songs[n] for n in sorted(self.songs)]
+
+    def excerpt(self, number: int):
+        """``FileEntry`` for a PDF of the song's pages, extracting it on first use; None if unknown."""
+        song = self.songs.get(number)
+        if song is None:
+            return None
+        stamp = hashlib.sha256(json.dumps(self.source, sort_keys=True).encode()).hexdigest()[:10]
+        path = os.path.join(self.pages_dir, f'{number}-{stamp}.pdf')
+        if not os.path.exists(path):
+            os.makedirs(self.pages_dir, exist_ok=True)
+            with FileLock(path):
+                if not os.path.exists(path):
+                    atomic_write_bytes(path, self._extract(song['page_start'], song['page_end']))
+        return FileEntry(path, 'application/pdf')
+
+    def _extract(self, first: int, last: int) -> bytes:
+        reader = PdfReader(self.pdf_path)
+        writer = PdfWriter()
+        for page_no in range(first, last + 1):
+            writer.add_page(reader.pages[page_no])
+        buf = io.BytesIO()
+        writer.write(buf)
+        return buf.getvalue()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Index the songbook PDF into song numbers and page ranges.')
+    parser.add_argument('pdf', nargs='?', default='andhra_christava_keerthanalu.pdf')
+    parser.add_argument('--out-dir', default=os.path.join('data', 'songbook'))
+    args = parser.parse_args(argv)
+    index = build_index(args.pdf, args.out_dir)
+    numbers = [s['number'] for s in index['songs']]
+    missing = sorted(set(range(1, max(numbers) + 1)) - set(numbers)) if numbers else []
+    print(f"{len(numbers)} songs indexed from {index['page_count']} pages"
+          + (f"; not found: {', '.join(map(str, missing))}" if missing else ''))
+
+
+if __name__ == '__main__':
+    main()
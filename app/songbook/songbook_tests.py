@@ -0,0 +1,50 @@
+import io
+import os
+
+from pypdf import PdfReader, PdfWriter
+
+from app.songbook.songbook import INDEX_VERSION, Songbook, _source_stamp, parse_songs
+from app.storage.files import atomic_write_json
+
+PAGES = [
+    '1\nHymns\n',
+    '3\n1 Amazing Grace\n(John Newton)\nAmazing grace how sweet the sound\n2\nAbide with me\nfast falls the eventide\n',
+    '4\nthe darkness deepens\nLord with me abide\n',
+    '5\n3 4 Section footer\n4 Holy Holy Holy\nLord God almighty\n',
+]
+
+
+def test_parse_songs_headers_and_page_ranges():
+    songs = parse_songs(PAGES)
+    assert [s['number'] for s in songs] == [1, 2, 4]
+    first, second, fourth = songs
+    assert first == {'number': 1, 'page_start': 1, 'page_end': 1}
+    assert (second['page_start'], second['page_end']) == (1, 3)
+    assert (fourth['page_start'], fourth['page_end']) == (3, 3)
+
+
+def _book(tmp_path, pages=4):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    path = str(tmp_path / 'book.pdf')
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return path
+
+
+def test_excerpt_holds_only_the_song_pages(tmp_path):
+    pdf = _book(tmp_path)
+    cache = str(tmp_path / 'cache')
+    os.makedirs(cache)
+    atomic_write_json(os.path.join(cache, 'index.json'), {
+        'version': INDEX_VERSION, 'source': _source_stamp(pdf), 'page_count': 4,
+        'songs': parse_songs(PAGES),
+    })
+    book = Songbook(pdf, cache)
+    assert book.ensure()
+    entry = book.excerpt(2)
+    with open(entry.path, 'rb') as f:
+        assert len(PdfReader(io.BytesIO(f.read())).pages) == 3
+    assert book.excerpt(2).path == entry.path
+    assert book.excerpt(99) is None
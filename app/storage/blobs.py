@@ -0,0 +1,212 @@
+import hashlib
+import os
+import tempfile
+
+from app.metrics.probe import timed
+from app.storage.files import fsync_dir, load_json
+from app.storage.journal import Journal
+
+CHUNK_SIZE = 64 * 1024
+BLOB_PREFIX = 'blobs'
+
+
+class _NameJournal(Journal):
+    """Journal of ``{name, digest, path, size}`` records with name and blob maps kept in memory.
+
+    The maps are updated as lines are applied, so catching up with other
+    workers costs a ``stat`` plus the new lines, never a reparse of the file.
+    """
+
+    def _load(self, repair: bool = False):
+        self.names = {}      # name -> id
+        self.by_id = {}      # id -> (name, digest)
+        self.blobs = {}      # digest -> [path, size, refs]
+        super()._load(repair)
+
+    def _apply(self, op: dict, offset: int):
+        rid = op.get('id')
+        old = self.by_id.pop(rid, None) if op.get('op') in ('put', 'del') else None
+        if old is not None:
+            self.names.pop(old[0], None)
+            blob = self.blobs[old[1]]
+            blob[2] -= 1
+            if blob[2] <= 0:
+                del self.blobs[old[1]]
+        super()._apply(op, offset)
+        rec = op.get('rec')
+        if op.get('op') == 'put' and isinstance(rec, dict) and isinstance(rid, int):
+            self.names[rec['name']] = rid
+            self.by_id[rid] = (rec['name'], rec['digest'])
+            blob = self.blobs.setdefault(rec['digest'], [rec['path'], rec.get('size', 0), 0])
+            blob[2] += 1
+
+    def refresh(self):
+        """Catch up with lines appended by other processes (just a ``stat`` when there are none)."""
+        self._refresh()
+
+
+class BlobStore:
+    """Content-addressed upload store under ``root``.
+
+    Every distinct file is kept once at ``blobs/<h[:2]>/<sha256><.ext>`` and is
+    never modified afterwards, so its URL can be cached forever. Upload names
+    (the friendly ``field_name_timestamp.ext`` names) map to a hash through an
+    append-only journal, ``names.jsonl``; each blob counts the names that point
+    at it and is deleted when the last one is released.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, BLOB_PREFIX)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.journal = _NameJournal(os.path.join(root, 'names.jsonl'))
+        self._import_index(os.path.join(root, 'index.json'))
+
+    def _import_index(self, legacy_path: str):
+        # Stores written before the journal kept every mapping in one index.json.
+        if self.journal.next_id() > 1 or not os.path.exists(legacy_path):
+            return
+        index = load_json(legacy_path, None) or {}
+        blobs = index.get('blobs') or {}
+        records = [{'name': name, 'digest': digest, 'path': blobs[digest]['path'], 'size': blobs[digest].get('size', 0)}
+                   for name, digest in (index.get('names') or {}).items() if digest in blobs]
+
+        def build(journal):
+            if journal.next_id() > 1:
+                return [], None
+            return [('put', rid, rec) for rid, rec in enumerate(records, 1)], None
+        if records:
+            self.journal.commit(build)
+
+    @staticmethod
+    def blob_path(digest: str, ext: str = '') -> str:
+        """Path of a blob relative to ``root`` (also its URL under /uploads/)."""
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest}' + (f'.{ext.lower()}' if ext else '')
+
+    def save(self, stream, name: str) -> tuple:
+        """Copy ``stream`` into the store as ``name``; returns ``(name, blob path)``.
+
+        The data is hashed while it is written to a temp file, so the upload
+        is read exactly once and never held in memory. If the same content is
+        already stored the temp file is dropped and the existing blob reused.
+        A name that is already taken gets a ``-2``, ``-3``... suffix.
+        """
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload.', suffix='.tmp', dir=self.blob_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fh, timed('file_save'):
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    fh.write(chunk)
+                    size += len(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+            digest = sha.hexdigest()
+            ext = name.rsplit('.', 1)[1] if '.' in name else ''
+            return self._commit(tmp_path, digest, ext, size, name)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def adopt(self, path: str, name: str = None) -> str:
+        """Move an existing loose file into the store (used to migrate old uploads)."""
+        name = name or os.path.basename(path)
+        with open(path, 'rb') as fh:
+            _name, rel = self.save(fh, name)
+        os.unlink(path)
+        return rel
+
+    @staticmethod
+    def _unique_name(names: dict, name: str) -> str:
+        stem, dot, ext = name.rpartition('.')
+        if not dot:
+            stem, ext = name, ''
+        n = 1
+        while name in names:
+            n += 1
+            name = f'{stem}-{n}' + (f'.{ext}' if dot else '')
+        return name
+
+    def _commit(self, tmp_path: str, digest: str, ext: str, size: int, name: str) -> tuple:
+        # Publishing the blob and counting the reference happen under the journal's write
+        # lock so a concurrent release() cannot delete a blob we are about to point at.
+        def build(journal):
+            blob = journal.blobs.get(digest)
+            rel = blob[0] if blob else self.blob_path(digest, ext)
+            dest = os.path.join(self.root, rel)
+            if not os.path.exists(dest):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(tmp_path, dest)
+                fsync_dir(dest)
+            unique = self._unique_name(journal.names, name)
+            rec = {'name': unique, 'digest': digest, 'path': rel, 'size': size}
+            return [('put', journal.next_id(), rec)], (unique, rel)
+        return self.journal.commit(build)
+
+    def release(self, name: str) -> bool:
+        """Drop ``name``; the blob is deleted once nothing references it.
+
+        The ``del`` line is written first and the file removed afterwards, so a
+        crash in between leaves an orphaned blob rather than a name pointing at
+        a missing file.
+        """
+        def build(journal):
+            rid = journal.names.get(name)
+            if rid is None:
+                return [], None
+            digest = journal.by_id[rid][1]
+            return [('del', rid, None)], (digest, journal.blobs[digest][0])
+        released = self.journal.commit(build)
+        if released is None:
+            return False
+        digest, path = released
+        journal = self.journal
+        # Re-checked under the write lock: a save of the same content may have taken a new reference.
+        with journal.lock, journal.file_lock:
+            journal.refresh()
+            if digest not in journal.blobs:
+                try:
+                    os.unlink(os.path.join(self.root, path))
+                except FileNotFoundError:
+                    pass
+        return True
+
+    def resolve(self, name: str):
+        """Blob path for an upload name, or None if the name is unknown."""
+        journal = self.journal
+        with journal.lock:
+            journal.refresh()
+            rid = journal.names.get(name)
+            return journal.blobs[journal.by_id[rid][1]][0] if rid is not None else None
+
+    def stored_bytes(self) -> int:
+        """Total size of the distinct blobs."""
+        with self.journal.lock:
+            self.journal.refresh()
+            return sum(size for _path, size, _refs in self.journal.blobs.values())
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Move loose files in an uploads folder into the blob store.')
+    parser.add_argument('uploads', help='uploads directory (e.g. ./uploads)')
+    args = parser.parse_args(argv)
+    store = BlobStore(args.uploads)
+    before = 0
+    for entry in sorted(os.scandir(args.uploads), key=lambda e: e.name):
+        if not entry.is_file() or entry.name.startswith('.') or entry.name in ('index.json', 'names.jsonl') \
+                or entry.name.endswith('.lock'):
+            continue
+        before += entry.stat().st_size
+        store.adopt(entry.path)
+    after = store.stored_bytes()
+    print(f'{before} bytes of loose files now stored in {after} bytes of blobs')
+
+
+if __name__ == '__main__':
+    main()
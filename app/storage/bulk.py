@@ -0,0 +1,214 @@
+import codecs
+import json
+import tempfile
+
+READ_SIZE = 64 * 1024
+# A single record larger than this is treated as malformed input rather than
+# letting one bad value pull the rest of the upload into memory.
+MAX_RECORD_BYTES = 1024 * 1024
+DEFAULT_BATCH = 500
+
+
+class BulkParseError(ValueError):
+    pass
+
+
+class _Malformed:
+    """Placeholder yielded for an NDJSON line that is not valid JSON."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def _chunks(stream):
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    while True:
+        data = stream.read(READ_SIZE)
+        if not data:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(data)
+        if text:
+            yield text
+
+
+def iter_json_records(stream):
+    """Yield values from a JSON array or NDJSON body, reading ``stream`` incrementally.
+
+    The format is picked from the first non-blank character: ``[`` means a
+    JSON array, anything else is newline-delimited JSON. A bad NDJSON line is
+    yielded as a ``_Malformed`` marker so it can be reported per record; a
+    broken JSON array raises ``BulkParseError`` since it cannot be resynced.
+    """
+    chunks = _chunks(stream)
+    buf = ''
+    eof = False
+
+    def fill():
+        nonlocal buf, eof
+        try:
+            buf += next(chunks)
+        except StopIteration:
+            eof = True
+
+    while not buf.strip() and not eof:
+        fill()
+    buf = buf.lstrip()
+    if not buf:
+        return
+    if buf[0] != '[':
+        yield from _iter_ndjson(buf, chunks)
+        return
+
+    decoder = json.JSONDecoder()
+    pos = 1
+    expect_value = True
+    first = True
+    while True:
+        # Skip whitespace and the separator between values.
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            buf, pos = buf[pos:], 0
+            fill()
+        if pos >= len(buf):
+            raise BulkParseError('Unexpected end of JSON array')
+        ch = buf[pos]
+        if ch == ']' and (first or not expect_value):
+            return
+        if not expect_value:
+            if ch != ',':
+                raise BulkParseError(f'Expected "," or "]" but found {ch!r}')
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            complete = end < len(buf) or eof or not isinstance(value, (int, float))
+        except json.JSONDecodeError as e:
+            if eof:
+                raise BulkParseError(str(e))
+            complete = False
+        if not complete:
+            if len(buf) - pos > MAX_RECORD_BYTES:
+                raise BulkParseError('Record too large or malformed JSON')
+            buf, pos = buf[pos:], 0
+            fill()
+            continue
+        yield value
+        pos = end
+        first = False
+        expect_value = False
+        if pos > READ_SIZE:
+            buf, pos = buf[pos:], 0
+
+
+def _iter_ndjson(buf: str, chunks):
+    while True:
+        nl = buf.find('\n')
+        if nl >= 0:
+            line, buf = buf[:nl], buf[nl + 1:]
+        else:
+            try:
+                more = next(chunks)
+            except StopIteration:
+                line, buf = buf, None
+            else:
+                if len(buf) > MAX_RECORD_BYTES:
+                    raise BulkParseError('Line too long')
+                buf += more
+                continue
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield _Malformed(f'Invalid JSON: {e}')
+        if buf is None:
+            return
+
+
+def import_records(records, validate, commit, batch_size: int = DEFAULT_BATCH) -> dict:
+    """Validate each record and ``commit`` accepted ones in batches.
+
+    ``validate(rec) -> (ok, message, normalized)`` and ``commit(list) -> list``
+    of saved records (with ids). Returns a report with one result per input
+    record in order; batches committed before a fatal parse error are kept
+    and the error is included in the report.
+    """
+    results = []
+    batch = []
+    batch_idx = []
+    accepted = rejected = 0
+    error = None
+
+    def flush():
+        nonlocal accepted
+        saved = commit(batch)
+        for idx, rec in zip(batch_idx, saved):
+            results[idx] = {'index': idx, 'status': 'accepted', 'id': rec.get('id')}
+        accepted += len(saved)
+        batch.clear()
+        batch_idx.clear()
+
+    try:
+        for rec in records:
+            idx = len(results)
+            if isinstance(rec, _Malformed):
+                ok, msg, norm = False, rec.message, None
+            elif not isinstance(rec, dict):
+                ok, msg, norm = False, 'Expected a JSON object', None
+            else:
+                ok, msg, norm = validate(rec)
+            if ok:
+                results.append(None)
+                batch.append(norm)
+                batch_idx.append(idx)
+                if len(batch) >= batch_size:
+                    flush()
+            else:
+                results.append({'index': idx, 'status': 'rejected', 'error': msg})
+                rejected += 1
+    except BulkParseError as e:
+        error = str(e)
+    # Everything that parsed and validated is committed, even after a parse error.
+    if batch:
+        flush()
+    report = {'accepted': accepted, 'rejected': rejected, 'results': results}
+    if error:
+        report['error'] = error
+    return report
+
+
+def import_replacing(records, validate, replace_all, batch_size: int = DEFAULT_BATCH) -> dict:
+    """Like ``import_records``, but the accepted records replace the whole collection.
+
+    Accepted records are staged in a temporary file while the body is read and
+    the collection is swapped out in one ``replace_all`` after a clean parse: a
+    truncated or malformed upload, or one with no valid records, writes nothing.
+    """
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as staged:
+        def stage(batch):
+            for rec in batch:
+                staged.write(json.dumps(rec, ensure_ascii=False) + '\n')
+            return [{} for _ in batch]
+        report = import_records(records, validate, stage, batch_size)
+        kept = [r for r in report['results'] if r['status'] == 'accepted']
+        if report.get('error'):
+            for r in kept:
+                r.update(status='rejected', error='Not saved: ' + report['error'])
+                r.pop('id', None)
+            report['rejected'] += len(kept)
+            report['accepted'] = 0
+            return report
+        if not kept:
+            return report
+
+        staged.seek(0)
+        saved = replace_all(json.loads(line) for line in staged)
+        for r, rec in zip(kept, saved):
+            r['id'] = rec.get('id')
+    return report
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import threading
+
+from flask import Response, request
+
+from app.metrics.probe import timed
+
+
+class CacheEntry:
+    __slots__ = ('version', 'obj', 'body', 'etag')
+
+    def __init__(self, version, obj, body: bytes):
+        self.version = version
+        self.obj = obj
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+
+class ReadCache:
+    """Parsed data plus its serialized JSON body, keyed by source and version.
+
+    ``version`` is a tuple whose first item names the source (the journal path)
+    and whose remaining items describe its state on disk (inode, mtime, size).
+    Any write - in this process or another worker - changes the stat and
+    therefore the version, so stale entries are rebuilt on the next read.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: tuple, load) -> CacheEntry:
+        key = version[0]
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+        # ``version`` was taken before loading, so a write racing with the load
+        # at worst costs one extra rebuild on the next request.
+        with timed('json_load'):
+            obj = load()
+        with timed('json_dump'):
+            body = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        entry = CacheEntry(version, obj, body)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def entry_response(entry: CacheEntry, cache_control: str) -> Response:
+    """Serve a cached body with its strong ETag, or 304 if the client has it."""
+    if request.if_none_match.contains(entry.etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(entry.body, mimetype='application/json')
+    resp.set_etag(entry.etag)
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+
+def cached_json_response(cache: ReadCache, repo) -> Response:
+    """Serve ``repo.list()`` from ``cache`` with a strong ETag, or 304 if it matches."""
+    entry = cache.get(repo.version(), repo.list)
+    # Always revalidate: these are admin views and must reflect approvals at once.
+    return entry_response(entry, 'private, no-cache')
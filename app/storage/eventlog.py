@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from app.storage.files import FileLock, atomic_write_json, load_json
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + 'Z'
+
+
+def _parse(ts: str):
+    try:
+        return datetime.fromisoformat(ts.replace('Z', ''))
+    except (AttributeError, ValueError):
+        return None
+
+
+class SessionStats:
+    """Login/logout aggregates folded one event at a time.
+
+    ``open`` maps session id -> login event for sessions that have not logged
+    out yet; ``admins`` and ``days`` hold running totals, so a report never
+    needs to look at old events again.
+    """
+
+    def __init__(self, data: dict = None):
+        data = data or {}
+        self.open = data.get('open', {})
+        self.admins = data.get('admins', {})
+        self.days = data.get('days', {})
+
+    def to_dict(self) -> dict:
+        return {'open': self.open, 'admins': self.admins, 'days': self.days}
+
+    def apply(self, ev: dict):
+        email = (ev.get('email') or '').lower()
+        if ev.get('ev') == 'login':
+            self.open[ev['sid']] = {'email': email, 'name': ev.get('name') or '', 't': ev['t']}
+            admin = self.admins.setdefault(email, {'name': '', 'sessions': 0, 'closed': 0, 'total_seconds': 0})
+            admin['name'] = ev.get('name') or admin['name']
+            admin['sessions'] += 1
+            day = self.days.setdefault(ev['t'][:10], {'logins': 0, 'closed': 0, 'total_seconds': 0})
+            day['logins'] += 1
+        elif ev.get('ev') == 'logout':
+            sid = ev.get('sid')
+            if sid not in self.open:
+                return
+            start = self.open.pop(sid)
+            t1, t2 = _parse(start['t']), _parse(ev['t'])
+            seconds = max(0, int((t2 - t1).total_seconds())) if t1 and t2 else 0
+            admin = self.admins.get(start['email'])
+            if admin is not None:
+                admin['closed'] += 1
+                admin['total_seconds'] += seconds
+            day = self.days.get(start['t'][:10])
+            if day is not None:
+                day['closed'] += 1
+                day['total_seconds'] += seconds
+
+    def latest_open(self, email: str):
+        email = (email or '').lower()
+        best = None
+        for sid, s in self.open.items():
+            if s['email'] == email and (best is None or s['t'] > self.open[best]['t']):
+                best = sid
+        return best
+
+    def report(self, date_from: str = None, date_to: str = None) -> dict:
+        open_by_admin = {}
+        for s in self.open.values():
+            open_by_admin[s['email']] = open_by_admin.get(s['email'], 0) + 1
+        admins = []
+        for email, a in sorted(self.admins.items()):
+            admins.append({
+                'email': email,
+                'name': a['name'],
+                'sessions': a['sessions'],
+                'closed': a['closed'],
+                'open': open_by_admin.get(email, 0),
+                'total_seconds': a['total_seconds'],
+                'avg_seconds': a['total_seconds'] // a['closed'] if a['closed'] else None,
+            })
+        days = [dict(v, date=d) for d, v in sorted(self.days.items())
+                if (not date_from or d >= date_from) and (not date_to or d <= date_to)]
+        return {'admins': admins, 'days': days}
+
+
+class LoginEventLog:
+    """Append-only admin login/logout log with size- and time-based rotation.
+
+    Events are JSON lines in ``<dir>/login_events.jsonl``. Every process tails
+    the file and folds new events into a ``SessionStats``; on rotation the
+    totals are saved to ``login_stats.json`` so old segments are never
+    reparsed and can be pruned.
+    """
+
+    def __init__(self, data_dir: str, max_bytes: int = 1024 * 1024, max_age_seconds: int = 7 * 86400,
+                 keep: int = 8, legacy_path: str = None):
+        self.dir = data_dir
+        self.path = os.path.join(data_dir, 'login_events.jsonl')
+        self.stats_path = os.path.join(data_dir, 'login_stats.json')
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.keep = keep
+        self.lock = threading.RLock()
+        self.file_lock = FileLock(self.path)
+        with self.file_lock:
+            if not os.path.exists(self.path):
+                self._seed(legacy_path)
+            self._load_snapshot()
+
+    def _seed(self, legacy_path: str):
+        """Create the log, converting the old login_logs.json list if there is one."""
+        lines = []
+        for entry in load_json(legacy_path, []) if legacy_path else []:
+            if not isinstance(entry, dict) or not entry.get('login_time'):
+                continue
+            sid = uuid.uuid4().hex
+            lines.append({'ev': 'login', 'sid': sid, 'email': entry.get('email'), 'name': entry.get('name'),
+                          't': entry['login_time']})
+            if entry.get('logout_time'):
+                lines.append({'ev': 'logout', 'sid': sid, 'email': entry.get('email'), 't': entry['logout_time']})
+        with open(self.path, 'ab') as fh:
+            fh.write(b''.join(self._encode(ev) for ev in lines))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    @staticmethod
+    def _encode(ev: dict) -> bytes:
+        return (json.dumps(ev, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def _load_snapshot(self):
+        snap = load_json(self.stats_path, None) or {}
+        self.stats = SessionStats(snap.get('stats'))
+        self._ino = snap.get('ino')
+        self._offset = snap.get('offset', 0)
+        self._started = snap.get('started')
+        if self._ino != os.stat(self.path).st_ino:
+            # No snapshot for the current segment yet (first run): read it from the start.
+            self._ino, self._offset = os.stat(self.path).st_ino, 0
+
+    def _catch_up(self):
+        """Fold events appended since we last looked (by any process)."""
+        try:
+            fh = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with fh:
+            if os.fstat(fh.fileno()).st_ino != self._ino:
+                # Another process rotated; its snapshot covers everything before this segment.
+                with self.file_lock:
+                    self._load_snapshot()
+                return self._catch_up()
+            fh.seek(self._offset)
+            for line in fh:
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    continue
+                if self._started is None:
+                    self._started = ev.get('t')
+                self.stats.apply(ev)
+
+    def _append(self, ev: dict):
+        with self.lock, self.file_lock:
+            self._catch_up()
+            with open(self.path, 'ab') as fh:
+                fh.write(self._encode(ev))
+                fh.flush()
+                os.fsync(fh.fileno())
+            self._catch_up()
+            self._maybe_rotate()
+
+    def _maybe_rotate(self):
+        started = _parse(self._started) if self._started else None
+        too_old = started is not None and (datetime.utcnow() - started).total_seconds() >= self.max_age_seconds
+        if self._offset < self.max_bytes and not too_old:
+            return
+        stamp = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+        os.replace(self.path, os.path.join(self.dir, f'login_events.{stamp}.jsonl'))
+        open(self.path, 'ab').close()
+        self._ino, self._offset, self._started = os.stat(self.path).st_ino, 0, None
+        atomic_write_json(self.stats_path, {'ino': self._ino, 'offset': 0, 'started': None,
+                                            'stats': self.stats.to_dict()})
+        rotated = sorted(n for n in os.listdir(self.dir)
+                         if n.startswith('login_events.') and n != 'login_events.jsonl' and n.endswith('.jsonl'))
+        for name in rotated[:-self.keep] if self.keep else rotated:
+            os.unlink(os.path.join(self.dir, name))
+
+    def append(self, email: str, name: str) -> str:
+        """Record a login; returns the new session id."""
+        sid = uuid.uuid4().hex
+        self._append({'ev': 'login', 'sid': sid, 'email': email, 'name': name, 't': _now()})
+        return sid
+
+    def close_last(self, email: str, sid: str = None):
+        """Record a logout for ``sid``, or the newest open session of ``email``."""
+        with self.lock:
+            self._catch_up()
+            if sid not in self.stats.open:
+                sid = self.stats.latest_open(email)
+            if sid is None:
+                return
+            self._append({'ev': 'logout', 'sid': sid, 'email': email, 't': _now()})
+
+    def stats_report(self, date_from: str = None, date_to: str = None) -> dict:
+        with self.lock:
+            self._catch_up()
+            return self.stats.report(date_from, date_to)
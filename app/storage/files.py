@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import threading
+
+from app.metrics.probe import timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+class _LockState:
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fh = None
+
+
+class FileLock:
+    """Exclusive lock on ``<path>.lock`` shared by threads and worker processes.
+
+    Uses ``flock`` so gunicorn workers serialize on the same file. Within a
+    process all ``FileLock`` objects for one path share state, and the lock is
+    re-entrant per thread, so nested ``with`` blocks do not deadlock.
+    """
+
+    _states = {}
+    _states_guard = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path + '.lock'
+        with FileLock._states_guard:
+            self._state = FileLock._states.setdefault(self.path, _LockState())
+
+    def acquire(self):
+        st = self._state
+        st.rlock.acquire()
+        if st.depth == 0 and fcntl is not None:
+            try:
+                st.fh = open(self.path, 'a')
+                fcntl.flock(st.fh.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                if st.fh is not None:
+                    st.fh.close()
+                    st.fh = None
+                st.rlock.release()
+                raise
+        st.depth += 1
+
+    def release(self):
+        st = self._state
+        st.depth -= 1
+        if st.depth == 0 and st.fh is not None:
+            fcntl.flock(st.fh.fileno(), fcntl.LOCK_UN)
+            st.fh.close()
+            st.fh = None
+        st.rlock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def fsync_dir(path: str):
+    """Persist a rename by syncing the containing directory (no-op where unsupported)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Replace ``path`` with ``data`` via temp file + fsync + rename.
+
+    Readers see either the old or the new content, never a partial file.
+    """
+    atomic_write_chunks(path, [data])
+
+
+def atomic_write_chunks(path: str, chunks):
+    """``atomic_write_bytes`` for content produced piece by piece (never held whole in memory)."""
+    with timed('file_save'):
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        fsync_dir(path)
+
+
+def atomic_write_json(path: str, obj):
+    with timed('json_dump'):
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    atomic_write_bytes(path, data)
+
+
+def load_json(path: str, default=None):
+    """Load a JSON file; a missing file gives ``default``, a corrupt one raises."""
+    try:
+        with open(path, 'r', encoding='utf-8') as fh, timed('json_load'):
+            return json.load(fh)
+    except FileNotFoundError:
+        return default
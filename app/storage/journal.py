@@ -0,0 +1,385 @@
+import bisect
+import json
+import math
+import os
+import threading
+
+from app.metrics.probe import timed
+from app.storage.files import FileLock, atomic_write_bytes, atomic_write_chunks
+
+
+def sort_key(value):
+    """Total order over mixed record values: missing < numbers < strings."""
+    if isinstance(value, bool) or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+class _Commit:
+    __slots__ = ('build', 'done', 'result', 'error')
+
+    def __init__(self, build):
+        self.build = build
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class Journal:
+    """Append-only JSONL journal with an in-memory id -> offset index.
+
+    Every line is one operation: ``{"op": "put", "id": N, "rec": {...}}`` or
+    ``{"op": "del", "id": N}``. Writes only ever append, reads seek straight to
+    the offset of the latest ``put`` for an id. Superseded lines are dropped by
+    ``compact()``, which runs automatically once enough of the file is dead.
+
+    The journal is safe to share between threads and between worker processes:
+    writers serialize on a ``FileLock`` and every reader first catches up on
+    lines appended (or a compaction done) by other processes. Concurrent
+    writers in one process are grouped so a batch costs one ``fsync``.
+
+    With ``order_by`` set, a second in-memory index keeps ``(value, id)`` pairs
+    sorted so ``iter_ordered`` can page through records by that field without
+    reading the rest of the file.
+    """
+
+    def __init__(self, path: str, compact_min: int = 1000, compact_ratio: float = 1.0, fsync: bool = True,
+                 order_by: str = None):
+        self.path = path
+        self.order_by = order_by
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self.file_lock = FileLock(path)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._leader = False
+        self._wfh = None
+        self._rfh = None
+        with self.file_lock:
+            if not os.path.exists(path):
+                open(path, 'ab').close()
+            self._load(repair=True)
+
+    def _open(self):
+        for fh in (self._wfh, self._rfh):
+            if fh is not None:
+                fh.close()
+        self._wfh = open(self.path, 'ab')
+        self._rfh = open(self.path, 'rb')
+        self._ino = os.fstat(self._rfh.fileno()).st_ino
+
+    def _load(self, repair: bool = False):
+        """Rebuild the index from scratch. ``repair`` (lock held) cuts a torn tail."""
+        self._open()
+        self._index = {}
+        self._order = []
+        self._order_keys = {}
+        self._next_id = 1
+        self._dead = 0
+        self._end = 0
+        self._tail()
+        if repair and self._end != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as fh:
+                fh.truncate(self._end)
+
+    def _tail(self):
+        """Apply complete lines past ``self._end``; a partial last line is left for later."""
+        self._rfh.seek(self._end)
+        offset = self._end
+        with timed('json_load'):
+            for line in self._rfh:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    self._dead += 1
+                else:
+                    self._apply(op, offset)
+                offset += len(line)
+        self._end = offset
+
+    def _refresh(self):
+        """Pick up changes made by other processes since we last looked."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._ino:
+            self._load()
+        elif st.st_size > self._end:
+            self._tail()
+
+    def _apply(self, op: dict, offset: int):
+        rid = op.get('id')
+        if not isinstance(rid, int):
+            self._dead += 1
+            return
+        if rid in self._index:
+            self._dead += 1
+        kind = op.get('op')
+        if kind == 'put':
+            self._index[rid] = offset
+            self._next_id = max(self._next_id, rid + 1)
+            if self.order_by:
+                self._unorder(rid)
+                rec = op.get('rec')
+                key = sort_key(rec.get(self.order_by) if isinstance(rec, dict) else None)
+                self._order_keys[rid] = key
+                bisect.insort(self._order, (key, rid))
+        elif kind == 'del':
+            self._index.pop(rid, None)
+            self._dead += 1
+            if self.order_by:
+                self._unorder(rid)
+        elif kind == 'seq':
+            # Written by compact() so deleted high ids are never handed out again.
+            self._next_id = max(self._next_id, rid)
+        else:
+            self._dead += 1
+
+    def _unorder(self, rid: int):
+        key = self._order_keys.pop(rid, None)
+        if key is not None:
+            pos = bisect.bisect_left(self._order, (key, rid))
+            if pos < len(self._order) and self._order[pos] == (key, rid):
+                del self._order[pos]
+
+    @staticmethod
+    def _encode(op: dict) -> bytes:
+        return (json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def __len__(self):
+        with self.lock:
+            self._refresh()
+            return len(self._index)
+
+    def __contains__(self, rid):
+        with self.lock:
+            self._refresh()
+            return rid in self._index
+
+    def ids(self) -> list:
+        with self.lock:
+            self._refresh()
+            return list(self._index)
+
+    def version(self) -> tuple:
+        """``(path, inode, mtime_ns, size)``; changes on every write by any process."""
+        st = os.stat(self.path)
+        return (self.path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def next_id(self) -> int:
+        return self._next_id
+
+    def get(self, rid: int):
+        with self.lock:
+            self._refresh()
+            offset = self._index.get(rid)
+            if offset is None:
+                return None
+            return self._read(offset)
+
+    def _read(self, offset: int) -> dict:
+        self._rfh.seek(offset)
+        return json.loads(self._rfh.readline())['rec']
+
+    def iter_records(self):
+        """Yield live records in insertion order without materializing the list."""
+        for rid in self.ids():
+            with self.lock:
+                offset = self._index.get(rid)
+                rec = self._read(offset) if offset is not None else None
+            if rec is not None:
+                yield rec
+
+    def iter_ordered(self, lo=None, hi=None, after=None, descending: bool = False, chunk: int = 256):
+        """Yield records sorted by ``(order_by, id)``, optionally bounded.
+
+        ``lo``/``hi`` are inclusive bounds on the ``order_by`` value and
+        ``after`` is a ``(value, id)`` pair to resume strictly after (or before,
+        when descending). Records are read ``chunk`` at a time so the lock is
+        never held for a whole scan.
+        """
+        if not self.order_by:
+            raise ValueError('journal has no order_by field')
+        lo_key = sort_key(lo) if lo is not None else None
+        hi_key = sort_key(hi) if hi is not None else None
+        pos_entry = (sort_key(after[0]), after[1]) if after is not None else None
+        while True:
+            with self.lock:
+                self._refresh()
+                order = self._order
+                if descending:
+                    if pos_entry is not None:
+                        end = bisect.bisect_left(order, pos_entry)
+                    elif hi_key is not None:
+                        end = bisect.bisect_right(order, (hi_key, math.inf))
+                    else:
+                        end = len(order)
+                    entries = order[max(0, end - chunk):end][::-1]
+                    if lo_key is not None:
+                        entries = [e for e in entries if e[0] >= lo_key]
+                else:
+                    if pos_entry is not None:
+                        start = bisect.bisect_right(order, pos_entry)
+                    elif lo_key is not None:
+                        start = bisect.bisect_left(order, (lo_key,))
+                    else:
+                        start = 0
+                    entries = order[start:start + chunk]
+                    if hi_key is not None:
+                        entries = [e for e in entries if e[0] <= hi_key]
+                records = [self._read(self._index[rid]) for _key, rid in entries]
+            if not entries:
+                return
+            yield from records
+            if len(entries) < chunk:
+                return
+            pos_entry = entries[-1]
+
+    def commit(self, build):
+        """Run ``build(journal) -> (ops, result)`` under the write lock and append its ops.
+
+        ``build`` sees an index that is up to date with every other writer, so it
+        can allocate ids or check existence safely. Threads that arrive while a
+        flush is in progress queue up and are written by the next leader in a
+        single batch with one ``fsync`` (group commit).
+        """
+        req = _Commit(build)
+        with self._cond:
+            self._queue.append(req)
+            while self._leader and not req.done:
+                self._cond.wait()
+            if req.done:
+                batch = None
+            else:
+                self._leader = True
+                batch, self._queue = self._queue, []
+        if batch is not None:
+            try:
+                self._flush(batch)
+            finally:
+                with self._cond:
+                    self._leader = False
+                    self._cond.notify_all()
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def _flush(self, batch: list):
+        with self.lock, self.file_lock:
+            try:
+                self._refresh_for_write()
+                for req in batch:
+                    try:
+                        ops, req.result = req.build(self)
+                    except Exception as e:
+                        req.error = e
+                        continue
+                    self._append(ops)
+                if self.fsync:
+                    with timed('fsync'):
+                        os.fsync(self._wfh.fileno())
+                self._maybe_compact()
+            except Exception as e:
+                for req in batch:
+                    if req.error is None:
+                        req.error = e
+            finally:
+                for req in batch:
+                    req.done = True
+
+    def _refresh_for_write(self):
+        if os.stat(self.path).st_ino != self._ino:
+            self._load(repair=True)
+        else:
+            self._tail()
+            if self._end != os.path.getsize(self.path):
+                # A writer died mid-line; we hold the lock, so cut the torn tail.
+                with open(self.path, 'r+b') as fh:
+                    fh.truncate(self._end)
+
+    def _append(self, ops: list):
+        if not ops:
+            return
+        buf = []
+        pos = self._end
+        applied = []
+        with timed('json_dump'):
+            for kind, rid, rec in ops:
+                op = {'op': kind, 'id': rid}
+                if kind == 'put':
+                    op['rec'] = rec
+                data = self._encode(op)
+                applied.append((op, pos))
+                buf.append(data)
+                pos += len(data)
+        with timed('file_save'):
+            self._wfh.write(b''.join(buf))
+            # Flush to the OS (fsync comes once per batch) so later builds can read it.
+            self._wfh.flush()
+        for op, offset in applied:
+            self._apply(op, offset)
+        self._end = pos
+
+    def write(self, ops: list):
+        """Append a batch of ``(op, id, rec)`` tuples with a single write call."""
+        self.commit(lambda journal: (ops, None))
+
+    def put(self, rid: int, rec: dict):
+        self.write([('put', rid, rec)])
+
+    def delete(self, rid: int) -> bool:
+        def build(journal):
+            if rid not in journal._index:
+                return [], False
+            return [('del', rid, None)], True
+        return self.commit(build)
+
+    def _maybe_compact(self):
+        if self._dead >= self.compact_min and self._dead >= len(self._index) * self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only live records and atomically swap it in."""
+        with self.lock, self.file_lock:
+            self._refresh_for_write()
+            parts = [self._encode({'op': 'seq', 'id': self._next_id})]
+            for offset in self._index.values():
+                self._rfh.seek(offset)
+                parts.append(self._rfh.readline())
+            atomic_write_bytes(self.path, b''.join(parts))
+            self._load()
+
+    def replace(self, records) -> list:
+        """Swap every record for ``records`` (any iterable), numbered from the next free id.
+
+        The new journal is written to a temp file and renamed over the old one,
+        so readers, other workers and a crash see either all of the old records
+        or all of the new ones. Returns the saved records.
+        """
+        saved = []
+        with self.lock, self.file_lock:
+            self._refresh_for_write()
+            next_id = self._next_id
+
+            def lines():
+                yield self._encode({'op': 'seq', 'id': next_id})
+                for i, record in enumerate(records):
+                    rec = dict(record)
+                    rec['id'] = next_id + i
+                    saved.append(rec)
+                    yield self._encode({'op': 'put', 'id': rec['id'], 'rec': rec})
+            atomic_write_chunks(self.path, lines())
+            self._load()
+        return saved
+
+    def close(self):
+        with self.lock:
+            self._wfh.close()
+            self._rfh.close()
@@ -0,0 +1,122 @@
+import base64
+import json
+
+MAX_LIMIT = 200
+DEFAULT_LIMIT = 50
+# Upper bound on records examined per page when filters reject most of them;
+# the caller gets a cursor to keep going instead of one request scanning everything.
+MAX_SCAN = 5000
+
+FILTER_PARAMS = ('baptized', 'blood_group')
+PAGE_PARAMS = ('limit', 'cursor', 'fields', 'sort', 'from', 'to') + FILTER_PARAMS
+
+
+def encode_cursor(value, rid: int) -> str:
+    raw = json.dumps([value, rid], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, rid = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(rid, int):
+        raise ValueError('Invalid cursor')
+    return value, rid
+
+
+def date_bounds(args) -> tuple:
+    """Inclusive ``(from, to)`` bounds on ISO timestamps from request args."""
+    date_from = args.get('from') or None
+    date_to = args.get('to') or None
+    if date_to and len(date_to) == 10:
+        # A bare YYYY-MM-DD includes the whole day: sort after any time on it.
+        date_to += '\uffff'
+    return date_from, date_to
+
+
+class PageQuery:
+    """Pagination, projection and filter options parsed from request args."""
+
+    def __init__(self, limit=DEFAULT_LIMIT, after=None, fields=None, descending=True,
+                 date_from=None, date_to=None, eq=None):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        self.descending = descending
+        self.date_from = date_from
+        self.date_to = date_to
+        self.eq = eq or {}
+
+    @classmethod
+    def from_args(cls, args, eq_fields=('baptized', 'blood_group'), dates: bool = True):
+        """Build a query from ``request.args``; raises ValueError on bad input.
+
+        ``dates`` enables the ``from``/``to`` range on the ordering field, which
+        only makes sense for ISO timestamp strings. A filter the list does not
+        support is an error rather than silently ignored.
+        """
+        unsupported = [k for k in FILTER_PARAMS if k in args and k not in eq_fields]
+        if not dates:
+            unsupported += [k for k in ('from', 'to') if k in args]
+        if unsupported:
+            raise ValueError(f'Unsupported filter: {", ".join(unsupported)}')
+        try:
+            limit = int(args.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise ValueError('limit must be an integer')
+        limit = max(1, min(limit, MAX_LIMIT))
+        cursor = args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()] or None
+        sort = args.get('sort', 'desc').lower()
+        if sort not in ('asc', 'desc'):
+            raise ValueError("sort must be 'asc' or 'desc'")
+        date_from, date_to = date_bounds(args) if dates else (None, None)
+        eq = {f: args[f].strip().lower() for f in eq_fields if args.get(f, '').strip()}
+        return cls(limit=limit, after=after, fields=fields, descending=(sort == 'desc'),
+                   date_from=date_from, date_to=date_to, eq=eq)
+
+    def matches(self, rec: dict) -> bool:
+        for field, want in self.eq.items():
+            if str(rec.get(field) or '').strip().lower() != want:
+                return False
+        return True
+
+    def project(self, rec: dict) -> dict:
+        if not self.fields:
+            return rec
+        out = {'id': rec.get('id')}
+        for f in self.fields:
+            if f in rec:
+                out[f] = rec[f]
+        return out
+
+
+def page(repo, query: PageQuery, order_by: str) -> dict:
+    """One page of ``repo`` sorted by ``(order_by, id)`` using keyset pagination.
+
+    Returns ``{'items': [...], 'next_cursor': str | None}``. Cost is bounded by
+    ``limit`` (plus at most ``MAX_SCAN`` filtered-out records), not by the size
+    of the collection.
+    """
+    items = []
+    scanned = 0
+    last = None
+    more = False
+    it = repo.iter_ordered(lo=query.date_from, hi=query.date_to, after=query.after,
+                           descending=query.descending, eq=query.eq)
+    for rec in it:
+        if len(items) == query.limit or scanned == MAX_SCAN:
+            more = True
+            break
+        scanned += 1
+        last = rec
+        if query.matches(rec):
+            items.append(query.project(rec))
+    if hasattr(it, 'close'):
+        it.close()
+    next_cursor = encode_cursor(last.get(order_by), last['id']) if more and last else None
+    return {'items': items, 'next_cursor': next_cursor}
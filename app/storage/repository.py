@@ -0,0 +1,149 @@
+import json
+import os
+
+from app.storage.journal import Journal
+
+
+class Repository:
+    """Record collection backed by a ``Journal``.
+
+    Records are plain dicts carrying their own ``id``. ``add`` assigns the next
+    free id under the journal's write lock and is a single append; reads go
+    through the journal index.
+    """
+
+    def __init__(self, journal: Journal):
+        self.journal = journal
+
+    def __len__(self):
+        return len(self.journal)
+
+    def version(self) -> tuple:
+        return self.journal.version()
+
+    def get(self, rid: int):
+        return self.journal.get(rid)
+
+    def ids(self) -> list:
+        return self.journal.ids()
+
+    def iter(self):
+        return self.journal.iter_records()
+
+    def list(self) -> list:
+        return list(self.journal.iter_records())
+
+    def iter_ordered(self, lo=None, hi=None, after=None, descending: bool = False, eq=None):
+        """Records sorted by the journal's ``order_by`` field; ``eq`` is left to the caller."""
+        return self.journal.iter_ordered(lo=lo, hi=hi, after=after, descending=descending)
+
+    def add(self, record: dict) -> dict:
+        return self.add_many([record])[0]
+
+    @staticmethod
+    def _numbered(records: list, next_id: int) -> list:
+        saved = []
+        for i, record in enumerate(records):
+            rec = dict(record)
+            rec['id'] = next_id + i
+            saved.append(rec)
+        return saved
+
+    def add_many(self, records: list) -> list:
+        def build(journal):
+            saved = self._numbered(records, journal.next_id())
+            return [('put', rec['id'], rec) for rec in saved], saved
+        return self.journal.commit(build)
+
+    def remove(self, rid: int):
+        """Delete a record and return it, or None if it does not exist."""
+        def build(journal):
+            rec = journal.get(rid)
+            if rec is None:
+                return [], None
+            return [('del', rid, None)], rec
+        return self.journal.commit(build)
+
+    def remove_many(self, ids) -> dict:
+        """Delete records in one append; returns ``{id: removed record or None}``."""
+        def build(journal):
+            removed = {rid: journal.get(rid) for rid in dict.fromkeys(ids)}
+            return [('del', rid, None) for rid, rec in removed.items() if rec is not None], removed
+        return self.journal.commit(build)
+
+    def move_many(self, ids, target: 'Repository') -> dict:
+        """Move records into ``target`` (fresh ids there); returns ``{old id: new record or None}``.
+
+        Runs under this journal's write lock with one append to each journal.
+        The target is written first, so a crash in between can only duplicate
+        a record, never lose it. Moves must always go in the same direction
+        between two repositories (pending -> approved) to keep lock order fixed.
+        """
+        def build(journal):
+            found = {rid: journal.get(rid) for rid in dict.fromkeys(ids)}
+            moving = [rid for rid, rec in found.items() if rec is not None]
+            saved = target.add_many([found[rid] for rid in moving]) if moving else []
+            moved = dict.fromkeys(found)
+            moved.update(zip(moving, saved))
+            return [('del', rid, None) for rid in moving], moved
+        return self.journal.commit(build)
+
+    def replace_all(self, records) -> list:
+        """Drop every record and store ``records`` (any iterable) with fresh ids, in one atomic swap."""
+        return self.journal.replace(records)
+
+
+def _import_legacy(journal: Journal, legacy_path: str):
+    """Seed an empty journal from the old whole-file JSON array, if present."""
+    if len(journal) or journal.next_id() > 1 or not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+    except Exception:
+        return
+    records = [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+    seen = set()
+    keep, renumber = [], []
+    for rec in records:
+        rid = rec.get('id')
+        if isinstance(rid, int) and rid > 0 and rid not in seen:
+            seen.add(rid)
+            keep.append(rec)
+        else:
+            renumber.append(rec)
+    # Old files can hold entries without ids or with repeated ids (approved
+    # prayers kept their pending id); give those fresh ids after the maximum.
+    next_id = max(seen) + 1 if seen else 1
+    for rec in renumber:
+        rec = dict(rec)
+        rec['id'] = next_id
+        next_id += 1
+        keep.append(rec)
+    keep.sort(key=lambda r: r['id'])
+
+    def build(journal):
+        # Re-checked under the write lock: another worker may have imported already.
+        if len(journal) or journal.next_id() > 1:
+            return [], None
+        return [('put', rec['id'], rec) for rec in keep], None
+    if keep:
+        journal.commit(build)
+
+
+def open_repository(data_dir: str, name: str, order_by: str = None) -> Repository:
+    """Open ``<data_dir>/<name>.jsonl``, importing ``<name>.json`` on first use."""
+    journal = Journal(os.path.join(data_dir, name + '.jsonl'), order_by=order_by)
+    _import_legacy(journal, os.path.join(data_dir, name + '.json'))
+    return Repository(journal)
+
+
+class Store:
+    """The repositories used by the site, all living in one data directory."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.memberships = open_repository(data_dir, 'memberships', order_by='timestamp')
+        self.pending_members = open_repository(data_dir, 'pending_members', order_by='timestamp')
+        self.prayers = open_repository(data_dir, 'prayers', order_by='ts')
+        self.pending_prayers = open_repository(data_dir, 'pending_prayers', order_by='ts')
@@ -0,0 +1,288 @@
+import json
+import os
+
+import pytest
+
+from app.storage.journal import Journal
+from app.storage.repository import Repository, open_repository
+
+
+def test_add_get_remove(tmp_path):
+    repo = Repository(Journal(str(tmp_path / 'items.jsonl')))
+    first = repo.add({'name': 'a'})
+    second = repo.add({'name': 'b'})
+    assert (first['id'], second['id']) == (1, 2)
+    assert repo.get(2) == {'name': 'b', 'id': 2}
+    assert repo.remove(1) == {'name': 'a', 'id': 1}
+    assert repo.remove(1) is None
+    assert [r['id'] for r in repo.list()] == [2]
+
+
+def test_move_many_and_remove_many(tmp_path):
+    pending = Repository(Journal(str(tmp_path / 'pending.jsonl')))
+    approved = Repository(Journal(str(tmp_path / 'approved.jsonl')))
+    approved.add({'name': 'old'})
+    pending.add_many([{'name': 'a'}, {'name': 'b'}, {'name': 'c'}])
+    moved = pending.move_many([3, 1, 9, 1], approved)
+    assert moved == {3: {'name': 'c', 'id': 2}, 1: {'name': 'a', 'id': 3}, 9: None}
+    assert [r['name'] for r in pending.list()] == ['b']
+    assert pending.remove_many([2, 5]) == {2: {'name': 'b', 'id': 2}, 5: None}
+    assert len(pending) == 0 and len(approved) == 3
+
+
+def test_reopen_rebuilds_index_and_drops_torn_tail(tmp_path):
+    path = str(tmp_path / 'items.jsonl')
+    repo = Repository(Journal(path))
+    repo.add_many([{'n': 1}, {'n': 2}, {'n': 3}])
+    repo.remove(2)
+    repo.journal.close()
+    with open(path, 'ab') as fh:
+        fh.write(b'{"op":"put","id":9,"rec":{')
+    reopened = Repository(Journal(path))
+    assert [r['n'] for r in reopened.list()] == [1, 3]
+    assert reopened.add({'n': 4})['id'] == 4
+
+
+def test_compaction_keeps_live_records_and_id_sequence(tmp_path):
+    path = str(tmp_path / 'items.jsonl')
+    journal = Journal(path, compact_min=4, compact_ratio=0.5)
+    repo = Repository(journal)
+    for i in range(6):
+        repo.add({'n': i})
+    for rid in (3, 4, 5, 6):
+        repo.remove(rid)
+    with open(path, 'rb') as fh:
+        assert len(fh.readlines()) == 3
+    assert [r['n'] for r in repo.list()] == [0, 1]
+    journal.close()
+    assert Repository(Journal(path)).add({'n': 6})['id'] == 7
+
+
+def test_legacy_json_is_imported_with_unique_ids(tmp_path):
+    with open(tmp_path / 'prayers.json', 'w', encoding='utf-8') as fh:
+        json.dump([{'text': 'x'}, {'id': 1, 'text': 'y'}, {'id': 1, 'text': 'z'}], fh)
+    repo = open_repository(str(tmp_path), 'prayers')
+    assert sorted((r['id'], r['text']) for r in repo.list()) == [(1, 'y'), (2, 'x'), (3, 'z')]
+
+
+def _add_from_process(path, n):
+    repo = Repository(Journal(path, fsync=False))
+    for i in range(n):
+        repo.add({'n': i})
+
+
+def test_concurrent_processes_and_threads_get_unique_ids(tmp_path):
+    import multiprocessing
+    import threading
+
+    path = str(tmp_path / 'items.jsonl')
+    procs = [multiprocessing.Process(target=_add_from_process, args=(path, 50)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    repo = Repository(Journal(path))
+    threads = [threading.Thread(target=lambda: [repo.add({'t': i}) for i in range(25)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads + procs:
+        t.join()
+    ids = [r['id'] for r in repo.list()]
+    assert len(ids) == 250
+    assert sorted(ids) == list(range(1, 251))
+
+
+def test_atomic_write_json_replaces_whole_file(tmp_path):
+    from app.storage.files import atomic_write_json, load_json
+
+    path = str(tmp_path / 'logs.json')
+    assert load_json(path, []) == []
+    atomic_write_json(path, [{'a': 1}])
+    atomic_write_json(path, [{'a': 1}, {'b': 2}])
+    assert load_json(path) == [{'a': 1}, {'b': 2}]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['logs.json']
+
+
+def test_read_cache_reuses_body_until_journal_changes(tmp_path):
+    from app.storage.cache import ReadCache
+
+    repo = Repository(Journal(str(tmp_path / 'items.jsonl')))
+    repo.add({'n': 1})
+    cache = ReadCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return repo.list()
+    first = cache.get(repo.version(), load)
+    assert cache.get(repo.version(), load) is first
+    repo.add({'n': 2})
+    second = cache.get(repo.version(), load)
+    assert len(loads) == 2
+    assert second.etag != first.etag
+    assert [r['n'] for r in second.obj] == [1, 2]
+
+
+def test_keyset_pages_follow_order_index(tmp_path):
+    from app.storage.query import PageQuery, page
+
+    repo = Repository(Journal(str(tmp_path / 'm.jsonl'), order_by='timestamp'))
+    for day in (3, 1, 2, 5, 4):
+        repo.add({'timestamp': f'2025-01-0{day}T10:00:00Z', 'baptized': 'yes' if day % 2 else 'no'})
+    first = page(repo, PageQuery(limit=2), 'timestamp')
+    assert [r['timestamp'][8:10] for r in first['items']] == ['05', '04']
+    rest = page(repo, PageQuery.from_args({'limit': '5', 'cursor': first['next_cursor']}), 'timestamp')
+    assert [r['timestamp'][8:10] for r in rest['items']] == ['03', '02', '01']
+    assert rest['next_cursor'] is None
+    repo.remove(2)
+    q = PageQuery.from_args({'from': '2025-01-02', 'to': '2025-01-04', 'sort': 'asc', 'baptized': 'YES', 'fields': 'baptized'})
+    assert page(repo, q, 'timestamp')['items'] == [{'id': 1, 'baptized': 'yes'}]
+    for args in ({'baptized': 'yes'}, {'from': '2025-01-02'}):
+        with pytest.raises(ValueError, match='Unsupported filter'):
+            PageQuery.from_args(args, eq_fields=(), dates=False)
+
+
+def test_bulk_import_streams_array_and_ndjson(monkeypatch, tmp_path):
+    import io
+
+    from app.storage import bulk
+
+    monkeypatch.setattr(bulk, 'READ_SIZE', 7)
+    repo = Repository(Journal(str(tmp_path / 'p.jsonl')))
+
+    def validate(rec):
+        if not rec.get('text'):
+            return False, 'Missing text', None
+        return True, None, rec
+    body = json.dumps([{'text': 'ప్రార్థన'}, {'text': ''}, 3, {'text': 'b'}]).encode('utf-8')
+    report = bulk.import_records(bulk.iter_json_records(io.BytesIO(body)), validate, repo.add_many, batch_size=1)
+    assert (report['accepted'], report['rejected']) == (2, 2)
+    assert [r['status'] for r in report['results']] == ['accepted', 'rejected', 'rejected', 'accepted']
+    assert repo.get(report['results'][0]['id'])['text'] == 'ప్రార్థన'
+
+    ndjson = b'{"text": "c"}\nnot json\n\n{"text": "d"}'
+    report = bulk.import_records(bulk.iter_json_records(io.BytesIO(ndjson)), validate, repo.add_many)
+    assert (report['accepted'], report['rejected']) == (2, 1)
+
+    # A truncated array keeps what was parsed before the break.
+    report = bulk.import_records(bulk.iter_json_records(io.BytesIO(b'[{"text": "e"}, {"te')), validate, repo.add_many)
+    assert report['accepted'] == 1 and 'error' in report
+    assert len(repo) == 5
+
+
+
+
+def test_replace_all_swaps_the_journal_in_one_step(tmp_path):
+    path = str(tmp_path / 'p.jsonl')
+    repo = Repository(Journal(path))
+    other = Repository(Journal(path))
+    repo.add_many([{'text': 'old'}] * 3)
+    saved = repo.replace_all({'text': str(i)} for i in range(1200))
+    assert [r['id'] for r in saved[:2]] == [4, 5]
+    assert len(other) == 1200 and other.get(1) is None and other.get(1203)['text'] == '1199'
+    assert repo.add({'text': 'next'})['id'] == 1204
+
+def test_replacing_upload_writes_nothing_unless_the_body_parses(monkeypatch, tmp_path):
+    from app.app import create_app
+
+    for key, value in {'DATA_DIR': str(tmp_path / 'data'), 'UPLOAD_DIR': str(tmp_path / 'uploads'),
+                       'STATIC_WATCH_SECONDS': '0', 'MEMBERS_SHEET_REFRESH': '0',
+                       'METRICS_FLUSH_SECONDS': '0', 'ADMIN_TOKEN': 'tok'}.items():
+        monkeypatch.setenv(key, value)
+    app = create_app('testing')
+    client = app.test_client()
+    headers = {'X-Admin-Token': 'tok', 'Content-Type': 'application/json'}
+
+    def texts():
+        return [p['text'] for p in client.get('/api/prayers', headers=headers).get_json()]
+    try:
+        assert client.post('/upload/prayers', headers=headers, data=json.dumps([{'text': 'old'}])).status_code == 200
+        body = json.dumps([{'text': 'new %d' % i} for i in range(600)])[:-40]
+        resp = client.post('/upload/prayers', headers=headers, data=body)
+        assert resp.status_code == 400 and resp.get_json()['accepted'] == 0
+        assert texts() == ['old']
+
+        resp = client.post('/upload/prayers', headers=headers, data=json.dumps([{'text': 'a'}, {}, {'text': 'b'}]))
+        report = resp.get_json()
+        assert resp.status_code == 200 and [r['status'] for r in report['results']] == ['accepted', 'rejected', 'accepted']
+        saved = client.get('/api/prayers', headers=headers).get_json()
+        assert {p['id']: p['text'] for p in saved} == {report['results'][0]['id']: 'a', report['results'][2]['id']: 'b'}
+    finally:
+        app.extensions['site'].stop()
+
+def test_blob_store_dedupes_and_refcounts(tmp_path):
+    import io
+
+    from app.storage.blobs import BlobStore
+
+    blobs = BlobStore(str(tmp_path))
+    name1, path1 = blobs.save(io.BytesIO(b'same bytes'), 'photo.png')
+    name2, path2 = blobs.save(io.BytesIO(b'same bytes'), 'photo.png')
+    assert (name1, name2) == ('photo.png', 'photo-2.png')
+    assert path1 == path2 and path1.startswith('blobs/')
+    assert blobs.resolve('photo-2.png') == path1
+    blobs.release(name1)
+    assert os.path.exists(tmp_path / path1)
+    blobs.release(name2)
+    assert not os.path.exists(tmp_path / path1)
+    assert blobs.resolve(name2) is None
+    assert [p for p in os.listdir(tmp_path / 'blobs') if p.endswith('.tmp')] == []
+
+    # Another worker's store sees the mapping by catching up on the journal.
+    other = BlobStore(str(tmp_path))
+    name3, path3 = blobs.save(io.BytesIO(b'other bytes'), 'photo.png')
+    assert other.resolve(name3) == path3
+    assert other.release(name3) and blobs.resolve(name3) is None
+    assert not os.path.exists(tmp_path / path3)
+
+
+def test_blob_release_keeps_the_file_when_the_journal_write_fails(monkeypatch, tmp_path):
+    import io
+
+    from app.storage.blobs import BlobStore
+
+    blobs = BlobStore(str(tmp_path))
+    name, path = blobs.save(io.BytesIO(b'photo'), 'photo.png')
+
+    def fail(ops):
+        raise OSError('disk full')
+    monkeypatch.setattr(blobs.journal, '_append', fail)
+    with pytest.raises(OSError):
+        blobs.release(name)
+    monkeypatch.undo()
+    assert blobs.resolve(name) == path and os.path.exists(tmp_path / path)
+
+
+def test_blob_store_imports_the_old_index(tmp_path):
+    from app.storage.blobs import BlobStore
+    from app.storage.files import atomic_write_json
+
+    atomic_write_json(str(tmp_path / 'index.json'), {
+        'names': {'a.png': 'ab12', 'b.png': 'ab12'},
+        'blobs': {'ab12': {'path': 'blobs/ab/ab12.png', 'size': 3, 'refs': 2}}})
+    blobs = BlobStore(str(tmp_path))
+    assert blobs.resolve('b.png') == 'blobs/ab/ab12.png' and blobs.stored_bytes() == 3
+    blobs.release('a.png')
+    assert BlobStore(str(tmp_path)).resolve('b.png') == 'blobs/ab/ab12.png'
+
+
+def test_login_event_log_rotates_and_keeps_totals(tmp_path):
+    from app.storage.eventlog import LoginEventLog
+
+    legacy = tmp_path / 'login_logs.json'
+    legacy.write_text(json.dumps([
+        {'email': 'a@x.com', 'name': 'A', 'login_time': '2025-01-01T10:00:00Z', 'logout_time': '2025-01-01T10:10:00Z'},
+        {'email': 'a@x.com', 'name': 'A', 'login_time': '2025-01-02T10:00:00Z', 'logout_time': None},
+    ]))
+    log = LoginEventLog(str(tmp_path), max_bytes=400, keep=1, legacy_path=str(legacy))
+    other = LoginEventLog(str(tmp_path), max_bytes=400, keep=1)
+    report = log.stats_report()
+    assert report['admins'][0]['total_seconds'] == 600 and report['admins'][0]['open'] == 1
+    for i in range(10):
+        sid = log.append('b@x.com', 'B')
+        other.close_last('B@x.com', sid if i % 2 else None)
+    rotated = [n for n in os.listdir(tmp_path) if n.startswith('login_events.2')]
+    assert len(rotated) == 1
+    expected = log.stats_report()
+    assert other.stats_report() == expected == LoginEventLog(str(tmp_path)).stats_report()
+    b = [a for a in expected['admins'] if a['email'] == 'b@x.com'][0]
+    assert (b['sessions'], b['closed'], b['open']) == (10, 10, 0)
+    assert [d['date'] for d in log.stats_report(date_from='2025-01-02', date_to='2025-01-02')['days']] == ['2025-01-02']
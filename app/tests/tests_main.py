@@ -4,5 +4,9 @@ class TestMain():
     def test_index(self, client):
         response = client.get('/')
         assert response.status_code == 200
-        assert response.json == {'message': 'Hello, World!'}
-            
\ No newline at end of file
+        assert response.mimetype == 'text/html'
+
+    def test_main_api(self, client):
+        response = client.get('/api/v1/main/')
+        assert response.status_code == 200
+        assert response.json == {'data': {'message': 'Hello, World!'}}
@@ -0,0 +1,14 @@
+import os
+
+bind = '0.0.0.0:5000'
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = 4
+# Import and warm the app once in the master: workers fork with the built pages,
+# static index and songbook already in memory and share them copy-on-write.
+# Each worker opens its own files, SQLite connections and threads on first use.
+preload_app = True
+
+
+def on_reload(server):
+    """kill -HUP <master> after a deploy: pick up new static files before the new workers fork."""
+    server.app.wsgi().extensions['site'].refresh_static()
@@ -777,31 +777,31 @@ document.addEventListener('DOMContentLoaded', function(){
     function renderFromList(items){
       if(!Array.isArray(items) || !items.length){ return false; }
       const first = items[0];
-      setMainVideo(first.id);
+      setMainVideo(first.video);
       thumbs.innerHTML = '';
       items.forEach(v=>{
         const div = document.createElement('div');
         div.className = 'sermon-thumb';
         const img = document.createElement('img');
-        img.src = v.thumb || `https://img.youtube.com/vi/${v.id}/hqdefault.jpg`;
+        img.src = v.thumb || `https://img.youtube.com/vi/${v.video}/hqdefault.jpg`;
         img.alt = v.title || 'Video';
         const t = document.createElement('div'); t.className = 'title'; t.textContent = v.title || '';
         div.appendChild(img); div.appendChild(t);
-        div.addEventListener('click', ()=> setMainVideo(v.id));
+        div.addEventListener('click', ()=> setMainVideo(v.video));
         thumbs.appendChild(div);
       });
       return true;
     }
     try{
-      const r = await fetch('/data/sermons.json?_=' + Date.now());
+      const r = await fetch('/api/sermons?limit=12');
       if(r.ok){
-        const list = await r.json();
-        if(renderFromList(list)) return;
+        const data = await r.json();
+        if(renderFromList(data.items)) return;
       }
     }catch(e){ /* ignore */ }
     // Fallback: embed a search playlist for the channel handle
     main.innerHTML = `<iframe src="https://www.youtube.com/embed?listType=search&list=CABCKakinada" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" allowfullscreen loading="lazy"></iframe>`;
-    thumbs.innerHTML = '<em style="color:var(--muted);font-size:13px">Showing YouTube search results. Add data/sermons.json for curated videos.</em>';
+    thumbs.innerHTML = '<em style="color:var(--muted);font-size:13px">Showing YouTube search results. Add videos with POST /api/sermons for a curated list.</em>';
   })();
 
   /* Google Sign-In setup and admin login/logout */
@@ -1039,10 +1039,15 @@ document.addEventListener('DOMContentLoaded', function(){
           alert('Please enter a valid song number (1 or higher).');
           return;
         }
-        // build URL
-        var url = 'http://akkonline.joelnetwork.com/songs/' + encodeURIComponent(val) + '.html';
-        // attempt to open in modal; if remote site prevents embedding, user can use download/open in new tab
-        openSongModal(url, 'Song ' + val);
+        // just this song's pages, extracted from the song book on the server;
+        // numbers missing from the index fall back to the external song site
+        var n = encodeURIComponent(Number(val));
+        var external = 'http://akkonline.joelnetwork.com/songs/' + n + '.html';
+        fetch('/api/songs/' + n).then(function (r) {
+          openSongModal(r.ok ? '/api/songs/' + n + '/pdf' : external, 'Song ' + val);
+        }).catch(function () {
+          openSongModal(external, 'Song ' + val);
+        });
       });
     }
 
@@ -1145,6 +1150,17 @@ document.addEventListener('DOMContentLoaded', function(){
 
     async function loadSheet(){
       setStatus('Loading members...');
+      // The server keeps a refreshed copy of the sheet; go to Google only if it has none.
+      try{
+        const res = await fetch('/api/members-directory');
+        if(res.ok){
+          const data = await res.json();
+          members = data.rows || [];
+          setStatus(`Loaded ${members.length} members`);
+          renderMembers(members);
+          return;
+        }
+      }catch(e){ /* fall back to the sheet */ }
       try{
         const res = await fetch(GVIZ);
         if(!res.ok) throw new Error('Network response not ok');
@@ -1162,12 +1178,20 @@ document.addEventListener('DOMContentLoaded', function(){
       }
     }
 
+    // Our own uploads can be served resized (/uploads/<name>?w=); leave other URLs alone
+    function thumbUrl(src, w){
+      const s = String(src || '');
+      if(!/^\/?uploads\//.test(s) || s.includes('?')) return s;
+      return s + '?w=' + w;
+    }
+
     function mkCard(m){
       const card = document.createElement('article');
       card.className = 'member-card';
       const photo = document.createElement('div'); photo.className = 'm-photo';
       const img = document.createElement('img');
-      img.src = m.Photo || m.photo || 'uploads/Crucifixion-of-Jesus_20251016163744.jpg';
+      img.src = thumbUrl(m.Photo || m.photo || 'uploads/Crucifixion-of-Jesus_20251016163744.jpg', 160);
+      img.loading = 'lazy';
       img.alt = m.Name || m.name || 'Member photo';
       photo.appendChild(img);
 
@@ -1,9 +1,11 @@
 import os
 from dotenv import load_dotenv
-from app.app import create_app
 
+# Before create_app: the config reads the environment when it is created.
 load_dotenv()
 
+from app.app import create_app  # noqa: E402
+
 config=os.getenv('FLASK_ENV') or 'development'
 
 app = create_app(config)
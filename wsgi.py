@@ -1,3 +1,5 @@
 from app.app import create_app
+from app.initialize_functions import warm
 
-app = create_app('production')
+# Built once in the gunicorn master with preload_app (see gunicorn.conf.py) and shared with the workers.
+app = warm(create_app('production'))